@@ -32,7 +32,7 @@ target_metadata = Base.metadata
 
 def get_url():
     """Get database URL from settings."""
-    return settings.database_url
+    return settings.require("database_url")
 
 
 def run_migrations_offline() -> None:
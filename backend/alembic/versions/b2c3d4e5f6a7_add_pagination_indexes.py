@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2c3d4e5f6a7'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_conversations_updated_at_id', 'conversations', ['updated_at', 'id'])
+    op.create_index('ix_chats_created_at_id', 'chats', ['created_at', 'id'])
+    op.create_index('ix_chats_conversation_id_created_at', 'chats', ['conversation_id', 'created_at'])
+    op.create_index('ix_document_chunks_document_id_chunk_index', 'document_chunks', ['document_id', 'chunk_index'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_chunks_document_id_chunk_index', table_name='document_chunks')
+    op.drop_index('ix_chats_conversation_id_created_at', table_name='chats')
+    op.drop_index('ix_chats_created_at_id', table_name='chats')
+    op.drop_index('ix_conversations_updated_at_id', table_name='conversations')
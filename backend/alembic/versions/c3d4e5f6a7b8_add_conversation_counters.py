@@ -0,0 +1,37 @@
+"""Add denormalized conversation counters
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-19 00:00:01.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+
+    # Backfill from existing chats
+    op.execute("""
+        UPDATE conversations SET
+            message_count = (
+                SELECT COUNT(*) FROM chats WHERE chats.conversation_id = conversations.id
+            ),
+            last_message_at = (
+                SELECT MAX(chats.created_at) FROM chats WHERE chats.conversation_id = conversations.id
+            )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'message_count')
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import Optional
+import hmac
+import os
+
+from app.core.config import settings
+from app.core.profiling import format_profile, ingest_sampler, request_profiler
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(default=None)):
+    """Admin endpoints exist only when PROFILING_TOKEN is set, and require it."""
+    if not settings.profiling_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_profile_token or not hmac.compare_digest(x_profile_token, settings.profiling_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_profiling_token)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """List stored request profiles, newest first."""
+    return {"profiles": request_profiler.list(), "ingest_sampler": ingest_sampler.running}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "text", sort: str = "cumulative", limit: int = 50):
+    """Return a stored profile as a pstats report (`text`) or the raw pstats file (`raw`)."""
+    path = request_profiler.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "raw":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+    try:
+        return PlainTextResponse(format_profile(path, sort=sort, limit=limit))
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key: {sort}")
+
+
+@router.get("/stacks/ingest")
+async def get_ingest_stacks():
+    """Folded ingestion stacks sampled so far in this process (flamegraph.pl / speedscope input)."""
+    if not ingest_sampler.running:
+        raise HTTPException(status_code=404, detail="Ingestion sampler is not running")
+    ingest_sampler.flush()
+    if not os.path.exists(ingest_sampler.path):
+        return PlainTextResponse("")
+    return FileResponse(ingest_sampler.path, media_type="text/plain")
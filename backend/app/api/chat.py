@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
 import time
 from datetime import datetime
 import logging
-import traceback
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -11,86 +12,142 @@ logger = logging.getLogger(__name__)
 
 from app.db.database import get_db
 from app.db.models import Chat, ChatCitation, DocumentChunk, Conversation
-from app.schemas.chat import ChatRequest, ChatResponse, Citation, ChatHistoryResponse, ChatHistoryItem
+from app.schemas.chat import CacheStatsResponse, ChatRequest, ChatResponse, Citation, ChatHistoryResponse, CitationMode
+from app.api.citations import citation_load_options, build_chat_history_items
 from app.rag.chain import rag_chain
+from app.core.pagination import encode_cursor, decode_datetime_cursor
+from app.core.admission import admission_slot
+from app.core.circuit_breaker import CircuitOpen
+from app.core.config import settings
+from app.core.deadlines import DeadlineExceeded, request_deadline
+from app.core.metrics import StageTimer, merge_breakdowns, track
+from app.core.profiling import profiled_in_thread
+from app.services.answer_cache import get_answer_cache
+from app.services.embedding_cache import get_query_embedding_cache
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-@router.post("/", response_model=ChatResponse)
+@router.post("/", response_model=ChatResponse, dependencies=[Depends(admission_slot("chat"))])
 async def chat(request: ChatRequest, db: Session = Depends(get_db)):
-    """Process a chat query and return a response with citations."""
+    """Process a chat query and return a response with citations.
+
+    Runs under admission control: when the worker is saturated the request
+    waits briefly for a slot, or gets 429/503 with Retry-After. Once admitted,
+    the pipeline has CHAT_REQUEST_BUDGET_SECONDS to answer (504 otherwise).
+    While OpenAI is unavailable, a cached answer to a similar question is
+    served (`degraded`), or 503 with Retry-After when there is none.
+
+    The per-stage breakdown (pipeline stages plus database time, in
+    milliseconds) is stored on the chat and returned as `timings`.
+    """
     start_time = time.time()
+    timer = StageTimer("chat")
     
     try:
-        # Process query through RAG chain
-        result = rag_chain.process_query(request.query)
-        
-        # Calculate response time
-        response_time = time.time() - start_time
-        
-        # Handle conversation
-        if request.conversation_id and request.conversation_id.strip():
-            conversation = db.query(Conversation).filter(
-                Conversation.id == request.conversation_id
-            ).first()
-            if not conversation:
-                raise HTTPException(status_code=404, detail="Conversation not found")
-            conversation.updated_at = datetime.utcnow()
-            conversation_id = conversation.id
-        else:
-            conversation = Conversation(title=request.query[:80])
-            db.add(conversation)
-            db.flush()
-            conversation_id = conversation.id
-
-        # Create chat record
-        chat = Chat(
-            user_query=request.query,
-            ai_response=result["response"],
-            response_time=response_time,
-            document_id=request.document_id,
-            conversation_id=conversation_id
-        )
+        with track(timer):
+            # Process query through RAG chain off the event loop, so identical
+            # concurrent queries can be coalesced inside the chain; the worker
+            # thread inherits the deadline
+            with request_deadline(settings.chat_request_budget_seconds):
+                result = await run_in_threadpool(
+                    profiled_in_thread(rag_chain.process_query), request.query, document_id=request.document_id
+                )
+            
+            # Calculate response time
+            response_time = time.time() - start_time
+            
+            # Handle conversation
+            if request.conversation_id and request.conversation_id.strip():
+                conversation = db.query(Conversation).filter(
+                    Conversation.id == request.conversation_id
+                ).first()
+                if not conversation:
+                    raise HTTPException(status_code=404, detail="Conversation not found")
+                conversation_id = conversation.id
+            else:
+                conversation = Conversation(title=request.query[:80], message_count=0)
+                db.add(conversation)
+                db.flush()
+                conversation_id = conversation.id
+
+            # Keep the denormalized listing columns in step with the new chat;
+            # the increment runs in SQL so concurrent chats don't lose updates
+            now = datetime.utcnow()
+            conversation.updated_at = now
+            conversation.last_message_at = now
+            conversation.message_count = Conversation.message_count + 1
+
+            # Create chat record
+            chat = Chat(
+                user_query=request.query,
+                ai_response=result["response"],
+                response_time=response_time,
+                document_id=request.document_id,
+                conversation_id=conversation_id,
+                created_at=now  # matches last_message_at, as the backfill computes it
+            )
 
-        db.add(chat)
-        db.flush()  # Get the chat ID
-        
-        # Create citation records
-        citations = []
-        for chunk_data in result["relevant_chunks"]:
-            # Find the corresponding chunk in database
-            chunk = db.query(DocumentChunk).filter(
-                DocumentChunk.embedding_id == chunk_data["id"]
-            ).first()
+            db.add(chat)
+            db.flush()  # Get the chat ID
             
-            if chunk:
-                citation = ChatCitation(
-                    chat_id=chat.id,
-                    chunk_id=chunk.id,
-                    relevance_score=chunk_data["score"]
-                )
-                db.add(citation)
+            # Create citation records; resolve every cited point in one query
+            embedding_ids = [str(chunk_data["id"]) for chunk_data in result["relevant_chunks"]]
+            chunks_by_embedding = {
+                chunk.embedding_id: chunk for chunk in
+                db.query(DocumentChunk).filter(DocumentChunk.embedding_id.in_(embedding_ids)).all()
+            } if embedding_ids else {}
+
+            citations = []
+            for chunk_data in result["relevant_chunks"]:
+                chunk = chunks_by_embedding.get(str(chunk_data["id"]))
+            
+                if chunk:
+                    citation = ChatCitation(
+                        chat_id=chat.id,
+                        chunk_id=chunk.id,
+                        relevance_score=chunk_data["score"]
+                    )
+                    db.add(citation)
                 
-                # Add to response citations
-                citations.append(Citation(
-                    chunk_id=str(chunk.id),
-                    content=str(chunk.content),
-                    page_number=int(chunk.page_number),  # type: ignore
-                    relevance_score=chunk_data["score"]
-                ))
-        
-        db.commit()
-        
-        return ChatResponse(
-            response=result["response"],
-            citations=citations,
-            response_time=response_time,
-            conversation_id=str(conversation_id)
-        )
-        
+                    # Add to response citations
+                    citations.append(Citation(
+                        chunk_id=str(chunk.id),
+                        content=str(chunk.content),
+                        page_number=int(chunk.page_number),  # type: ignore
+                        relevance_score=chunk_data["score"]
+                    ))
+            
+            # Coalesced callers report the shared execution's pipeline stages
+            timings = merge_breakdowns(
+                result.get("timings", {}), timer.breakdown(), {"total": round(response_time * 1000, 3)}
+            )
+            chat.timings = timings
+            db.commit()
+            
+            return ChatResponse(
+                response=result["response"],
+                citations=citations,
+                response_time=response_time,
+                conversation_id=str(conversation_id),
+                cached=bool(result.get("cache_hit", False)),
+                degraded=bool(result.get("degraded", False)),
+                timings=timings
+            )
+            
+    except HTTPException:
+        db.rollback()
+        raise
+    except DeadlineExceeded as e:
+        logger.warning(f"Chat timed out: {e}")
+        db.rollback()
+        raise HTTPException(status_code=504, detail=str(e))
+    except CircuitOpen as e:
+        logger.warning(f"Chat unavailable: {e}")
+        db.rollback()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": e.retry_after_header})
     except Exception as e:
-        logger.error(f"[CHAT ERROR] {str(e)}\n{traceback.format_exc()}")
+        logger.exception(f"Error processing chat: {e}")
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
@@ -99,50 +156,78 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
 async def get_chat_history(
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     document_id: Optional[str] = None,
     conversation_id: Optional[str] = None,
+    citations: CitationMode = "full",
+    include_chunks: bool = True,
     db: Session = Depends(get_db)
 ):
-    """Get chat history with optional filtering by document or conversation."""
+    """Get chat history, newest first, with optional filtering by document or conversation.
+
+    Pass the `next_cursor` of a response as `cursor` to fetch the following page;
+    `skip` is only honoured when no cursor is given. `citations` selects how cited
+    chunks are rendered (see CitationMode); with `include_chunks=false` in `ref`
+    mode, chunk content is left to `GET /chunks/{chunk_id}`.
+    """
     try:
-        query = db.query(Chat).options(
-            joinedload(Chat.citations).joinedload(ChatCitation.chunk)
-        )
+        query = db.query(Chat).options(*citation_load_options(citations))
 
         if document_id:
             query = query.filter(Chat.document_id == document_id)
         if conversation_id:
             query = query.filter(Chat.conversation_id == conversation_id)
 
-        total = query.count()
-        chats = query.offset(skip).limit(limit).all()
+        total = None
+        if include_total:
+            if conversation_id and not document_id:
+                # Served from the conversation's cached counter instead of count()
+                total = db.query(Conversation.message_count).filter(
+                    Conversation.id == conversation_id
+                ).scalar() or 0
+            else:
+                total = query.count()
 
-        chat_items = []
-        for chat in chats:
-            citations = []
-            for c in chat.citations:
-                if c.chunk:
-                    citations.append(Citation(
-                        chunk_id=str(c.chunk_id),
-                        content=str(c.chunk.content),
-                        page_number=int(c.chunk.page_number),
-                        relevance_score=c.relevance_score
-                    ))
-            chat_items.append(ChatHistoryItem(
-                id=str(chat.id),
-                user_query=str(chat.user_query),
-                ai_response=str(chat.ai_response),
-                created_at=chat.created_at,  # type: ignore
-                response_time=chat.response_time,  # type: ignore
-                document_id=str(chat.document_id) if chat.document_id else None,
-                conversation_id=str(chat.conversation_id) if chat.conversation_id else None,
-                citations=citations
-            ))
+        if cursor:
+            try:
+                created_at, chat_id = decode_datetime_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            query = query.filter(tuple_(Chat.created_at, Chat.id) < tuple_(created_at, chat_id))
+        elif skip:
+            query = query.offset(skip)
+
+        # Fetch one extra row to know whether another page exists
+        chats = query.order_by(Chat.created_at.desc(), Chat.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(chats) > limit:
+            chats = chats[:limit]
+            next_cursor = encode_cursor(chats[-1].created_at, chats[-1].id)
+
+        chat_items, chunk_table = build_chat_history_items(db, chats, citations, include_chunks)
 
         return ChatHistoryResponse(
             chats=chat_items,
-            total=total
+            total=total,
+            next_cursor=next_cursor,
+            chunks=chunk_table
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving chat history: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error retrieving chat history: {str(e)}")
+
+
+@router.get("/cache/stats", response_model=CacheStatsResponse)
+def get_cache_stats():
+    """Get answer cache, query embedding cache and request coalescing statistics.
+
+    A plain function, like /metrics: reading the stats may query a cache backend.
+    """
+    return CacheStatsResponse(
+        answers=get_answer_cache().stats(),
+        single_flight=rag_chain.inflight.stats(),
+        query_embeddings=get_query_embedding_cache().stats()
+    )
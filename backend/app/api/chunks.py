@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+import hashlib
+
+from app.db.database import get_db
+from app.db.models import DocumentChunk
+from app.schemas.chat import CitedChunk
+
+router = APIRouter(prefix="/chunks", tags=["chunks"])
+
+# A chunk's content never changes once ingested (re-uploading creates new chunks),
+# so clients and proxies may cache it for a long time
+CHUNK_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _chunk_etag(chunk: DocumentChunk) -> str:
+    """Strong ETag over every field served for a chunk."""
+    digest = hashlib.sha256()
+    for value in (chunk.id, chunk.document_id, chunk.chunk_index, chunk.page_number, chunk.content):
+        digest.update(str(value).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _matches_etag(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag`.
+
+    The header is a comma-separated list of tags, or `*`. If-None-Match uses
+    weak comparison, so a `W/` prefix (added e.g. by proxies that compress the
+    response) is ignored.
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag or tag == "*":
+            return True
+    return False
+
+
+@router.get("/{chunk_id}", response_model=CitedChunk)
+async def get_chunk(chunk_id: str, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Get a single document chunk, honouring If-None-Match."""
+    try:
+        chunk = db.query(DocumentChunk).filter(DocumentChunk.id == chunk_id).first()
+        if not chunk:
+            raise HTTPException(status_code=404, detail="Chunk not found")
+
+        etag = _chunk_etag(chunk)
+        headers = {"ETag": etag, "Cache-Control": CHUNK_CACHE_CONTROL}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches_etag(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return CitedChunk(
+            id=str(chunk.id),
+            document_id=str(chunk.document_id),
+            chunk_index=int(chunk.chunk_index),  # type: ignore
+            page_number=int(chunk.page_number),  # type: ignore
+            content=str(chunk.content)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving chunk: {str(e)}")
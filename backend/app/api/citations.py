@@ -0,0 +1,116 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.models import Chat, ChatCitation, DocumentChunk
+from app.schemas.chat import Citation, CitedChunk, ChatHistoryItem, CitationMode
+
+
+def citation_load_options(mode: CitationMode) -> list:
+    """Loader options for a Chat query rendered in the given citation mode."""
+    if mode == "full":
+        return [joinedload(Chat.citations).joinedload(ChatCitation.chunk)]
+
+    # Lean modes never pull chunk content through the per-citation join;
+    # it is fetched once per distinct chunk afterwards
+    return [
+        selectinload(Chat.citations).selectinload(ChatCitation.chunk).load_only(
+            DocumentChunk.id,
+            DocumentChunk.document_id,
+            DocumentChunk.chunk_index,
+            DocumentChunk.page_number,
+        )
+    ]
+
+
+def _load_chunk_table(db: Session, chunk_ids: List[str]) -> Dict[str, CitedChunk]:
+    """Load the full content of each distinct cited chunk once."""
+    if not chunk_ids:
+        return {}
+    chunks = db.query(DocumentChunk).filter(DocumentChunk.id.in_(chunk_ids)).all()
+    return {
+        str(chunk.id): CitedChunk(
+            id=str(chunk.id),
+            document_id=str(chunk.document_id),
+            chunk_index=int(chunk.chunk_index),  # type: ignore
+            page_number=int(chunk.page_number),  # type: ignore
+            content=str(chunk.content)
+        )
+        for chunk in chunks
+    }
+
+
+def _load_snippets(db: Session, chunk_ids: List[str]) -> Dict[str, str]:
+    """Load a truncated copy of each distinct cited chunk, cut in the database."""
+    if not chunk_ids:
+        return {}
+    size = settings.citation_snippet_chars
+    rows = (
+        db.query(
+            DocumentChunk.id,
+            func.substr(DocumentChunk.content, 1, size),
+            func.length(DocumentChunk.content)
+        )
+        .filter(DocumentChunk.id.in_(chunk_ids))
+        .all()
+    )
+    return {
+        str(chunk_id): snippet + "…" if length > size else snippet
+        for chunk_id, snippet, length in rows
+    }
+
+
+def build_chat_history_items(
+    db: Session,
+    chats: List[Chat],
+    mode: CitationMode = "full",
+    include_chunks: bool = True
+) -> Tuple[List[ChatHistoryItem], Optional[Dict[str, CitedChunk]]]:
+    """Render chats and their citations in the given citation mode.
+
+    Returns the history items and, in `ref` mode with include_chunks, the table of
+    cited chunks keyed by chunk ID.
+    """
+    cited_ids = sorted({
+        str(c.chunk_id) for chat in chats for c in chat.citations if c.chunk
+    })
+
+    chunk_table = None
+    snippets: Dict[str, str] = {}
+    if mode == "ref" and include_chunks:
+        chunk_table = _load_chunk_table(db, cited_ids)
+    elif mode == "snippet":
+        snippets = _load_snippets(db, cited_ids)
+
+    chat_items = []
+    for chat in chats:
+        citations = []
+        for c in chat.citations:
+            if not c.chunk:
+                continue
+            if mode == "full":
+                content = str(c.chunk.content)
+            elif mode == "snippet":
+                content = snippets.get(str(c.chunk_id))
+            else:
+                content = None
+            citations.append(Citation(
+                chunk_id=str(c.chunk_id),
+                content=content,
+                page_number=int(c.chunk.page_number),
+                relevance_score=c.relevance_score
+            ))
+        chat_items.append(ChatHistoryItem(
+            id=str(chat.id),
+            user_query=str(chat.user_query),
+            ai_response=str(chat.ai_response),
+            created_at=chat.created_at,  # type: ignore
+            response_time=chat.response_time,  # type: ignore
+            document_id=str(chat.document_id) if chat.document_id else None,
+            conversation_id=str(chat.conversation_id) if chat.conversation_id else None,
+            timings=chat.timings,  # type: ignore
+            citations=citations
+        ))
+
+    return chat_items, chunk_table
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 from app.db.database import get_db
-from app.db.models import Conversation, Chat, ChatCitation
-from app.schemas.chat import Citation
+from app.db.models import Conversation, Chat
+from app.core.pagination import encode_cursor, decode_datetime_cursor
+from app.schemas.chat import CitationMode
 from app.schemas.conversation import (
     ConversationCreate, ConversationSummary, ConversationListResponse, ConversationDetail
 )
-from app.schemas.chat import ChatHistoryItem
+from app.api.citations import citation_load_options, build_chat_history_items
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
@@ -20,7 +22,7 @@ router = APIRouter(prefix="/conversations", tags=["conversations"])
 async def create_conversation(request: ConversationCreate, db: Session = Depends(get_db)):
     """Create a new conversation."""
     try:
-        conversation = Conversation(title=request.title)
+        conversation = Conversation(title=request.title, message_count=0)
         db.add(conversation)
         db.commit()
         db.refresh(conversation)
@@ -30,7 +32,8 @@ async def create_conversation(request: ConversationCreate, db: Session = Depends
             title=conversation.title,
             created_at=conversation.created_at,  # type: ignore
             updated_at=conversation.updated_at,  # type: ignore
-            message_count=0
+            message_count=0,
+            last_message_at=None
         )
 
     except Exception as e:
@@ -42,44 +45,78 @@ async def create_conversation(request: ConversationCreate, db: Session = Depends
 async def list_conversations(
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: Session = Depends(get_db)
 ):
-    """List conversations ordered by most recently updated."""
-    try:
-        total = db.query(Conversation).count()
+    """List conversations ordered by most recently updated.
 
+    Pass the `next_cursor` of a response as `cursor` to fetch the following page;
+    `skip` is only honoured when no cursor is given.
+    """
+    try:
+        total = db.query(Conversation).count() if include_total else None
+
+        query = db.query(Conversation)
+
+        if cursor:
+            try:
+                updated_at, conv_id = decode_datetime_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            query = query.filter(
+                tuple_(Conversation.updated_at, Conversation.id) < tuple_(updated_at, conv_id)
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        # Fetch one extra row to know whether another page exists
         results = (
-            db.query(Conversation, func.count(Chat.id).label("message_count"))
-            .outerjoin(Chat, Conversation.id == Chat.conversation_id)
-            .group_by(Conversation.id)
-            .order_by(Conversation.updated_at.desc())
-            .offset(skip)
-            .limit(limit)
+            query.order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+            .limit(limit + 1)
             .all()
         )
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = encode_cursor(last.updated_at, last.id)
 
         conversations = []
-        for conv, message_count in results:
+        for conv in results:
             conversations.append(ConversationSummary(
                 id=str(conv.id),
                 title=conv.title,
                 created_at=conv.created_at,  # type: ignore
                 updated_at=conv.updated_at,  # type: ignore
-                message_count=message_count
+                message_count=int(conv.message_count or 0),
+                last_message_at=conv.last_message_at  # type: ignore
             ))
 
         return ConversationListResponse(
             conversations=conversations,
-            total=total
+            total=total,
+            next_cursor=next_cursor
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing conversations: {str(e)}")
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetail)
-async def get_conversation(conversation_id: str, db: Session = Depends(get_db)):
-    """Get a conversation with all its chats and citations."""
+async def get_conversation(
+    conversation_id: str,
+    citations: CitationMode = "full",
+    include_chunks: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Get a conversation with all its chats and citations.
+
+    `citations` selects how cited chunks are rendered (see CitationMode); with
+    `include_chunks=false` in `ref` mode, chunk content is left to `GET /chunks/{chunk_id}`.
+    """
     try:
         conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
         if not conversation:
@@ -88,39 +125,20 @@ async def get_conversation(conversation_id: str, db: Session = Depends(get_db)):
         chats = (
             db.query(Chat)
             .filter(Chat.conversation_id == conversation_id)
-            .options(joinedload(Chat.citations).joinedload(ChatCitation.chunk))
+            .options(*citation_load_options(citations))
             .order_by(Chat.created_at.asc())
             .all()
         )
 
-        chat_items = []
-        for chat in chats:
-            citations = []
-            for c in chat.citations:
-                if c.chunk:
-                    citations.append(Citation(
-                        chunk_id=str(c.chunk_id),
-                        content=str(c.chunk.content),
-                        page_number=int(c.chunk.page_number),
-                        relevance_score=c.relevance_score
-                    ))
-            chat_items.append(ChatHistoryItem(
-                id=str(chat.id),
-                user_query=str(chat.user_query),
-                ai_response=str(chat.ai_response),
-                created_at=chat.created_at,  # type: ignore
-                response_time=chat.response_time,  # type: ignore
-                document_id=str(chat.document_id) if chat.document_id else None,
-                conversation_id=str(chat.conversation_id) if chat.conversation_id else None,
-                citations=citations
-            ))
+        chat_items, chunk_table = build_chat_history_items(db, chats, citations, include_chunks)
 
         return ConversationDetail(
             id=str(conversation.id),
             title=conversation.title,
             created_at=conversation.created_at,  # type: ignore
             updated_at=conversation.updated_at,  # type: ignore
-            chats=chat_items
+            chats=chat_items,
+            chunks=chunk_table
         )
 
     except HTTPException:
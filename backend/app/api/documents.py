@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import os
 import shutil
 import logging
-from typing import List
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -14,18 +15,28 @@ from app.schemas.document import (
     DocumentChunkInfo, DocumentChunksResponse
 )
 from app.ingest.document_processor import document_processor
+from app.core.admission import admission_slot
 from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.profiling import profiled_in_thread
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
-@router.post("/upload", response_model=DocumentUploadResponse)
+@router.post("/upload", response_model=DocumentUploadResponse, dependencies=[Depends(admission_slot("ingest"))])
 async def upload_document(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    """Upload and process a PDF document."""
-    logger.warning(f"[UPLOAD DEBUG] filename={file.filename}, content_type={file.content_type}, size={file.size}")
+    """Upload and process a PDF document.
+
+    Ingestion is a lower admission class than chat and may only hold a few
+    slots, so uploads never crowd out interactive queries.
+    """
+    logger.info(
+        "Upload received",
+        extra={"upload_filename": file.filename, "content_type": file.content_type, "size": file.size}
+    )
     # Validate file type
     if not file.filename or not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
@@ -39,12 +50,15 @@ async def upload_document(
     
     try:
         # Save file temporarily
+        os.makedirs(settings.upload_dir, exist_ok=True)
         file_path = os.path.join(settings.upload_dir, f"{file.filename}")
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
-        # Process document
-        document: Document = document_processor.process_document(file_path, file.filename, db)
+        # Process document off the event loop
+        document: Document = await run_in_threadpool(
+            profiled_in_thread(document_processor.process_document), file_path, file.filename, db
+        )
         
         # Clean up temporary file
         os.remove(file_path)
@@ -128,20 +142,39 @@ async def get_document_chunks(
     document_id: str,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get chunks for a specific document."""
+    """Get chunks for a specific document in chunk order.
+
+    Pass the `next_cursor` of a response as `cursor` to fetch the following page;
+    `skip` is only honoured when no cursor is given.
+    """
     try:
         # Verify document exists
         document: Document = db.query(Document).filter(Document.id == document_id).first()
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
-        
-        total = db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).count()
-        chunks: List[DocumentChunk] = db.query(DocumentChunk).filter(
-            DocumentChunk.document_id == document_id
-        ).offset(skip).limit(limit).all()
-        
+
+        query = db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id)
+
+        if cursor:
+            try:
+                (after_index,) = decode_cursor(cursor, 1)
+                after_index = int(after_index)
+            except (TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+            query = query.filter(DocumentChunk.chunk_index > after_index)
+        elif skip:
+            query = query.offset(skip)
+
+        # Fetch one extra row to know whether another page exists
+        chunks: List[DocumentChunk] = query.order_by(DocumentChunk.chunk_index).limit(limit + 1).all()
+        next_cursor = None
+        if len(chunks) > limit:
+            chunks = chunks[:limit]
+            next_cursor = encode_cursor(chunks[-1].chunk_index)
+
         chunk_list = []
         for chunk in chunks:
             chunk_list.append(DocumentChunkInfo(
@@ -151,13 +184,15 @@ async def get_document_chunks(
                 page_number=int(chunk.page_number),  # type: ignore
                 embedding_id=str(chunk.embedding_id)
             ))
-        
+
+        # The chunk count is kept on the document row, so no count() is needed
         return DocumentChunksResponse(
             document_id=document_id,
             chunks=chunk_list,
-            total=total
+            total=int(document.num_chunks),  # type: ignore
+            next_cursor=next_cursor
         )
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,198 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUED, ADMISSION_REJECTED
+from app.core.providers import Provider
+
+# Priority class of the work being done, for schedulers further down (OpenAI calls)
+current_priority: ContextVar[Optional[str]] = ContextVar("current_priority", default=None)
+
+# Retry-After bounds, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; maps to 429 (queue full) or 503 (waited too long)."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class PriorityClass:
+    """Limits for one class of work.
+
+    `priority` orders classes when a slot frees up (lower goes first);
+    `max_active` caps the slots the class may hold, so lower-priority work can
+    never occupy every slot.
+    """
+
+    def __init__(self, name: str, priority: int, max_active: int, max_queue: int):
+        self.name = name
+        self.priority = priority
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        # Smoothed slot hold time, for Retry-After estimates
+        self.hold_seconds = 1.0
+
+
+class AdmissionController:
+    """Concurrency limiter with bounded, prioritized wait queues.
+
+    At most `limit` requests hold a slot at once. Further requests wait in
+    their class's queue for up to `max_wait` seconds; when a slot frees up it
+    goes to the oldest waiter of the highest-priority class that may take it.
+    A request finding its queue full is rejected at once (429), one that waits
+    too long gives up (503); both carry a Retry-After estimated from recent
+    hold times, so a burst is shed quickly instead of piling up behind OpenAI.
+
+    Runs on the event loop; all state changes happen on that thread.
+    """
+
+    def __init__(self, limit: int, classes: Dict[str, PriorityClass], max_wait: float = 10.0):
+        self.limit = limit
+        self.classes = classes
+        self.max_wait = max_wait
+        self.active = 0
+
+    def _can_start(self, cls: PriorityClass) -> bool:
+        return self.active < self.limit and cls.active < cls.max_active
+
+    def _retry_after(self, cls: PriorityClass) -> int:
+        slots = max(min(self.limit, cls.max_active), 1)
+        estimate = cls.hold_seconds * (len(cls.waiters) + 1) / slots
+        return int(min(max(math.ceil(estimate), MIN_RETRY_AFTER), MAX_RETRY_AFTER))
+
+    def _start(self, cls: PriorityClass):
+        self.active += 1
+        cls.active += 1
+        ADMISSION_ACTIVE.labels(cls.name).set(cls.active)
+
+    def _dispatch(self):
+        """Hand free slots to waiters, highest priority first."""
+        for cls in sorted(self.classes.values(), key=lambda c: c.priority):
+            while cls.waiters and self._can_start(cls):
+                waiter = cls.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._start(cls)
+                waiter.set_result(None)
+            ADMISSION_QUEUED.labels(cls.name).set(len(cls.waiters))
+
+    def _reject(self, cls: PriorityClass, status_code: int, reason: str, detail: str) -> Overloaded:
+        ADMISSION_REJECTED.labels(cls.name, reason).inc()
+        return Overloaded(status_code, self._retry_after(cls), detail)
+
+    async def acquire(self, name: str):
+        cls = self.classes[name]
+        higher_waiting = any(
+            other.waiters for other in self.classes.values() if other.priority <= cls.priority
+        )
+        if self._can_start(cls) and not higher_waiting:
+            self._start(cls)
+            return
+        if len(cls.waiters) >= cls.max_queue:
+            raise self._reject(cls, 429, "queue_full", f"Too many {name} requests queued")
+
+        waiter = asyncio.get_running_loop().create_future()
+        cls.waiters.append(waiter)
+        ADMISSION_QUEUED.labels(cls.name).set(len(cls.waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we gave up; hand the slot on
+                self.release(name, 0.0)
+            else:
+                waiter.cancel()
+                try:
+                    cls.waiters.remove(waiter)
+                except ValueError:
+                    pass
+                ADMISSION_QUEUED.labels(cls.name).set(len(cls.waiters))
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(cls, 503, "timeout", f"Timed out waiting for a {name} slot") from None
+
+    def release(self, name: str, held_seconds: float):
+        cls = self.classes[name]
+        self.active -= 1
+        cls.active -= 1
+        if held_seconds > 0:
+            cls.hold_seconds = 0.8 * cls.hold_seconds + 0.2 * held_seconds
+        ADMISSION_ACTIVE.labels(cls.name).set(cls.active)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        """Hold a slot of class `name` for the duration of the block."""
+        await self.acquire(name)
+        started = time.monotonic()
+        token = current_priority.set(name)
+        try:
+            yield
+        finally:
+            current_priority.reset(token)
+            self.release(name, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"active": cls.active, "queued": len(cls.waiters), "max_active": cls.max_active}
+            for name, cls in self.classes.items()
+        }
+
+
+def admission_slot(name: str) -> Callable:
+    """FastAPI dependency holding an admission slot of class `name` for the request.
+
+    Disabled (a no-op) when ADMISSION_MAX_CONCURRENT is 0.
+    """
+
+    async def dependency() -> AsyncIterator[None]:
+        admission = get_admission()
+        if admission.limit <= 0:
+            yield
+            return
+        try:
+            async with admission.slot(name):
+                yield
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)}
+            )
+
+    return dependency
+
+
+def _build_admission() -> AdmissionController:
+    return AdmissionController(
+        limit=settings.admission_max_concurrent,
+        classes={
+            "chat": PriorityClass(
+                "chat", priority=0, max_active=settings.admission_max_concurrent,
+                max_queue=settings.admission_chat_queue
+            ),
+            "ingest": PriorityClass(
+                "ingest", priority=1, max_active=settings.admission_ingest_max_concurrent,
+                max_queue=settings.admission_ingest_queue
+            ),
+        },
+        max_wait=settings.admission_max_wait_seconds
+    )
+
+
+# Global admission controller, built on first use; chat outranks ingestion
+get_admission = Provider(_build_admission)
@@ -0,0 +1,140 @@
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, TypeVar
+
+from app.core.deadlines import DeadlineExceeded
+from app.core.metrics import CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency that is failing; `retry_after` is when it will be tried again."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(int(math.ceil(self.retry_after)), 1))
+
+
+def is_failure(error: BaseException) -> bool:
+    """Whether `error` says the dependency is unhealthy, as opposed to a bad request.
+
+    4xx responses other than timeouts (408) and rate limits (429) are the
+    caller's fault and leave the circuit alone. So do our own deadline running
+    out, which says nothing about the upstream, and interruptions such as
+    KeyboardInterrupt or a cancelled task (BaseExceptions that are not
+    Exceptions).
+    """
+    if isinstance(error, DeadlineExceeded) or not isinstance(error, Exception):
+        return False
+    status = getattr(error, "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+
+class CircuitBreaker:
+    """Stop calling a dependency after repeated failures, then probe it again.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail at once with CircuitOpen for `reset_seconds`. Then one trial call is
+    let through (half-open): success closes the circuit, failure opens it for
+    another period. Failing fast keeps request threads and the rate-limit
+    budget free while the upstream is down, and lets callers fall back.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.rejected = 0
+        CIRCUIT_STATE.labels(name).set(0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            log = logger.info if state == CLOSED else logger.warning
+            log(f"Circuit {self.name} is now {state}", extra={"circuit": self.name, "state": state})
+        self._state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self._state == OPEN and elapsed >= self.reset_seconds:
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+            retry_after = max(self.reset_seconds - elapsed, 0.0)
+        raise CircuitOpen(self.name, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._set_state(CLOSED)
+
+    def _release_trial(self):
+        # The call ended without telling whether the upstream is healthy; let another trial through
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` through the breaker, raising CircuitOpen while the circuit is open."""
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            if is_failure(e):
+                self.record_failure()
+            elif getattr(e, "status_code", None) is not None:
+                # The upstream answered, if only to reject the request
+                self.record_success()
+            else:
+                self._release_trial()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures, "rejected": self.rejected}
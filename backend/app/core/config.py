@@ -1,41 +1,155 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
-import os
+from typing import Any, Optional
+
+from app.core.providers import Provider
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
     # OpenAI Configuration
-    openai_api_key: str
+    openai_api_key: Optional[str] = None  # required to call OpenAI
+    openai_base_url: Optional[str] = None  # OpenAI-compatible endpoint (e.g. a local stand-in); None: api.openai.com
+
+    # OpenAI rate limits (account-wide, per model; split between workers)
+    openai_rpm_limit: int = 3000  # requests per minute; 0 disables request pacing
+    openai_tpm_limit: int = 1000000  # tokens per minute; 0 disables token pacing
+    openai_background_reserve: float = 0.2  # share of each budget kept for chat
+    openai_completion_tokens_estimate: int = 512  # completion tokens reserved when a request sets no max_tokens
+
+    # OpenAI timeouts, hedging and circuit breaking
+    openai_timeout_seconds: float = 60  # per attempt; calls inside a request deadline get less
+    openai_max_retries: int = 2
+    chat_request_budget_seconds: float = 30  # chat pipeline deadline, shared out between stages; 0 disables
+    hedge_query_embeddings: bool = True  # send a backup for query embeddings slower than usual
+    hedge_quantile: float = 0.95  # recent-latency quantile after which the backup is sent
+    hedge_min_delay_ms: float = 50
+    hedge_max_workers: int = 32  # threads running query embedding attempts
+    circuit_breaker_failures: int = 5  # consecutive failures that open a circuit; 0 disables circuit breaking
+    circuit_breaker_reset_seconds: float = 30  # how long an open circuit fails fast before a trial call
+    degraded_cache_threshold: float = 0.85  # similarity for serving a cached answer when the LLM is unavailable
+
+    # Embeddings
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: int = 1536  # text-embedding-3 models accept shortened sizes
 
     # Qdrant Vector Database
-    qdrant_api_url: str = "http://localhost:6333"
+    qdrant_api_url: str = "http://localhost:6333"  # ":memory:" runs Qdrant in-process
     qdrant_api_key: Optional[str] = None
+    qdrant_prefer_grpc: bool = False  # use the gRPC port for data calls instead of REST
+    qdrant_grpc_port: int = 6334
+    qdrant_timeout_seconds: int = 10  # per-request timeout
+    qdrant_pool_size: Optional[int] = None  # connections (REST) or channels (gRPC); None: client default
+    qdrant_collection: str = "synthesizer_manuals"  # alias the app reads and writes through
+    qdrant_quantization: str = "none"  # none, scalar (int8) or binary
+    qdrant_quantization_always_ram: bool = True  # keep quantized vectors in RAM
+    qdrant_on_disk_vectors: bool = False  # keep original vectors on disk (mmap)
+    qdrant_search_rescore: bool = True  # rescore quantized hits with original vectors
+    qdrant_search_oversampling: float = 2.0  # candidates fetched per result before rescoring
+    qdrant_payload_mode: str = "full"  # full, or slim (content fetched from Postgres after ranking)
+    qdrant_hnsw_m: int = 16  # graph degree; higher improves recall at the cost of RAM
+    qdrant_hnsw_ef_construct: int = 100  # build-time beam width
+    qdrant_search_hnsw_ef: Optional[int] = None  # search beam width (None: server default)
+    qdrant_search_exact: bool = False  # bypass the index and scan every vector
+    qdrant_indexing_threshold: int = 20000  # KB of vectors a segment holds before it is indexed (Qdrant's default)
 
     # PostgreSQL Database
-    database_url: str
+    database_url: Optional[str] = None  # required to use the database
+    # Connection totals for the deployment: each worker pools max(1, pool_size // workers)
+    # plus max_overflow // workers, so all workers together stay within pool_size + max_overflow
+    database_pool_size: int = 40  # connections kept open; with one worker, matches the request threadpool
+    database_max_overflow: int = 10  # extra connections opened under bursts
 
     # Application Settings
     app_name: str = "Synthesizer Chatbot API"
     debug: bool = True
     log_level: str = "INFO"
+    log_format: str = "json"  # json, or text for local development
     # Safety: Disable embeddings
     disable_embeddings: bool = False
 
+    # Serving
+    workers: int = 1  # server worker processes; use a shared cache backend when > 1
+
+    # Admission control (per worker process)
+    admission_max_concurrent: int = 16  # chat and upload requests served at once; 0 disables admission control
+    admission_chat_queue: int = 64  # chat requests waiting for a slot before new ones get 429
+    admission_ingest_max_concurrent: int = 2  # slots uploads may hold, so chat always has room
+    admission_ingest_queue: int = 4  # uploads waiting for a slot before new ones get 429
+    admission_max_wait_seconds: float = 10  # a request queued longer than this gets 503
+
+    # Shared caches (query embeddings and semantic answers)
+    cache_backend: str = "memory"  # memory (per process), disk (shared by workers on a host) or redis
+    cache_dir: str = "cache"  # disk backend files; a tmpfs such as /dev/shm keeps them in memory
+    redis_url: Optional[str] = None  # redis backend, e.g. redis://localhost:6379/0
+    cache_key_prefix: str = "synthbot:"  # namespace for keys in a shared Redis
+
+    # Readiness and warm-up
+    warmup_enabled: bool = True  # open connections and run a search before reporting ready
+    readiness_check_interval_seconds: float = 10  # how often /ready's dependency checks run
+    readiness_check_timeout_seconds: float = 5  # a check slower than this counts as failed
+
+    # Profiling (off unless a token is set)
+    profiling_token: Optional[str] = None  # X-Profile-Token value that profiles a request; guards /admin
+    profile_dir: str = "profiles"
+    ingest_sampler_interval_ms: float = 0  # stack sampling period for ingestion; 0 disables
+    ingest_sampler_flush_seconds: float = 30  # how often sampled stacks are written out
+
+    # Query Embedding Cache
+    query_embedding_cache_size: int = 10000  # max cached query embeddings per process
+    query_embedding_cache_ttl_seconds: float = 3600
+
+    # Chunk Content Cache (slim payload mode)
+    chunk_content_cache_size: int = 5000  # max cached chunk texts per process
+
+    # Semantic Answer Cache
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.95  # minimum cosine similarity for a hit
+    semantic_cache_ttl_seconds: float = 3600
+    semantic_cache_max_entries: int = 1000
+
     # File Upload Settings
     max_file_size: int = 52428800  # 50MB
     upload_dir: str = "uploads"
 
+    # Response Settings
+    citation_snippet_chars: int = 240  # citation length in "snippet" mode
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
         "case_sensitive": False,
     }
 
+    def require(self, name: str) -> Any:
+        """The value of a setting the caller cannot work without; raises if it is unset."""
+        value = getattr(self, name)
+        if value is None:
+            raise RuntimeError(f"{name.upper()} is not set")
+        return value
 
-# Global settings instance
-settings = Settings()  # type: ignore[call-arg]
 
-# Ensure upload directory exists
-os.makedirs(settings.upload_dir, exist_ok=True)
+# Read from the environment on first use, so the app imports (tests, tools)
+# without a configured environment; kept by forked workers
+get_settings = Provider(Settings, share_after_fork=True)
+
+
+class _SettingsProxy:
+    """`settings` as a module attribute, resolved through get_settings() on each access.
+
+    Attribute writes (e.g. `patch.object(settings, ...)` in tests) go to the
+    shared instance.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(get_settings(), name)
+
+
+# Global settings instance
+settings: Settings = _SettingsProxy()  # type: ignore[assignment]
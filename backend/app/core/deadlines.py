@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from app.core.metrics import DEADLINE_EXCEEDED
+
+# Share of the request budget each stage may use at most; stages not listed
+# (the LLM call) get whatever is left
+STAGE_BUDGET_SHARES = {"embed": 0.15, "answer_cache": 0.05, "search": 0.15, "hydrate": 0.1}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request or one of its stages runs out of time."""
+
+    def __init__(self, stage: Optional[str] = None):
+        super().__init__(f"Deadline exceeded{f' in {stage}' if stage else ''}")
+        self.stage = stage
+
+
+class Deadline:
+    """A point in time a request (or one stage of it) must finish by."""
+
+    def __init__(self, seconds: float, stage: Optional[str] = None, budget: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds
+        self.stage = stage
+        # The whole request's budget, which stage deadlines are derived from
+        self.budget = budget if budget is not None else seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self):
+        """Raise DeadlineExceeded if no time is left."""
+        if self.expired:
+            DEADLINE_EXCEEDED.labels(self.stage or "request").inc()
+            raise DeadlineExceeded(self.stage)
+
+    def clamp(self, timeouts: Optional[Dict[str, Optional[float]]]) -> Dict[str, float]:
+        """httpx timeout settings capped at the time left (raising if none is)."""
+        self.check()
+        remaining = self.remaining()
+        return {
+            key: remaining if value is None else min(value, remaining)
+            for key, value in (timeouts or dict.fromkeys(("connect", "read", "write", "pool"))).items()
+        }
+
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[Optional[Deadline]]:
+    """Give the work in the block (and threads started with its context) `seconds` to finish.
+
+    A non-positive budget sets no deadline.
+    """
+    if seconds <= 0:
+        yield None
+        return
+    deadline = Deadline(seconds)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+
+@contextmanager
+def stage_deadline(stage: str) -> Iterator[Optional[Deadline]]:
+    """Bound `stage` by its share of the request budget and by the time the request has left.
+
+    Checked on entry, so a stage does not start once the request is out of
+    time; calls inside (OpenAI requests) are cut off when the stage expires.
+    A no-op outside a request deadline.
+    """
+    parent = current_deadline.get()
+    if parent is None:
+        yield None
+        return
+    parent.check()
+    seconds = parent.remaining()
+    share = STAGE_BUDGET_SHARES.get(stage)
+    if share is not None:
+        seconds = min(seconds, parent.budget * share)
+    deadline = Deadline(seconds, stage=stage, budget=parent.budget)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
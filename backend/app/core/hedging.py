@@ -0,0 +1,94 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Optional, TypeVar
+
+import numpy as np
+
+from app.core.metrics import HEDGED_REQUESTS
+from app.core.providers import Provider
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Recent latencies of one kind of call, for hedge delays."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The `q` quantile of the recent latencies, or None until there are enough."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = list(self._samples)
+        return float(np.quantile(samples, q))
+
+
+class Hedger:
+    """Send a second copy of a slow call and take whichever answers first.
+
+    The backup is sent once the first attempt has been running longer than the
+    `quantile` of recent latencies (at least `min_delay` seconds), so only the
+    slowest few percent of calls are duplicated. A failing attempt does not
+    decide the outcome while the other is still running. Calls run on a small
+    thread pool with the caller's context, so deadlines and priorities carry
+    over; the losing attempt is left to finish in the background.
+    """
+
+    def __init__(self, name: str, quantile: float = 0.95, min_delay: float = 0.05, max_workers: int = 8,
+                 tracker: Optional[LatencyTracker] = None):
+        self.name = name
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.tracker = tracker or LatencyTracker()
+        self._executor = Provider(
+            lambda: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"hedge-{name}")
+        )
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little history."""
+        quantile = self.tracker.quantile(self.quantile)
+        return None if quantile is None else max(quantile, self.min_delay)
+
+    def _attempt(self, fn: Callable[[], T]) -> T:
+        # Each attempt records its own latency, so hedging does not hide slow calls from the tracker
+        started = time.monotonic()
+        result = fn()
+        self.tracker.record(time.monotonic() - started)
+        return result
+
+    def _submit(self, fn: Callable[[], T]) -> "Future[T]":
+        return self._executor().submit(contextvars.copy_context().run, self._attempt, fn)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run `fn`, sending a second copy if the first outlives the hedge delay."""
+        delay = self.delay()
+        if delay is None:
+            return self._attempt(fn)
+
+        primary = self._submit(fn)
+        done, pending = wait({primary}, timeout=delay)
+        if not done:
+            HEDGED_REQUESTS.labels(self.name, "sent").inc()
+            pending.add(self._submit(fn))
+        error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        HEDGED_REQUESTS.labels(self.name, "won").inc()
+                    return future.result()
+                error = error or future.exception()
+            if not pending:
+                raise error  # type: ignore[misc]
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
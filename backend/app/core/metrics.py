@@ -0,0 +1,183 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Set
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Stage latencies span ~1 ms cache lookups to multi-second LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "synthbot_stage_duration_seconds", "Duration of a pipeline stage",
+    ["pipeline", "stage"], buckets=LATENCY_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    "synthbot_db_query_duration_seconds", "Duration of a single database statement", buckets=LATENCY_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "synthbot_http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("synthbot_http_requests_in_flight", "HTTP requests currently being served")
+RAG_IN_FLIGHT = Gauge("synthbot_rag_queries_in_flight", "RAG pipelines currently executing")
+ADMISSION_ACTIVE = Gauge("synthbot_admission_active", "Requests holding an admission slot", ["priority_class"])
+ADMISSION_QUEUED = Gauge("synthbot_admission_queued", "Requests waiting for an admission slot", ["priority_class"])
+ADMISSION_REJECTED = Counter(
+    "synthbot_admission_rejected", "Requests turned away by admission control", ["priority_class", "reason"]
+)
+OPENAI_TOKENS = Counter("synthbot_openai_tokens", "Tokens sent to and received from OpenAI", ["model", "kind"])
+CIRCUIT_STATE = Gauge("synthbot_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ["circuit"])
+DEADLINE_EXCEEDED = Counter("synthbot_deadline_exceeded", "Requests that ran out of time, by stage", ["stage"])
+HEDGED_REQUESTS = Counter(
+    "synthbot_hedged_requests", "Backup requests sent for slow calls, and those that answered first", ["call", "outcome"]
+)
+OPENAI_SCHEDULE_WAIT_SECONDS = Histogram(
+    "synthbot_openai_schedule_wait_seconds", "Time an OpenAI call waited for rate-limit budget",
+    ["priority_class"], buckets=LATENCY_BUCKETS
+)
+OPENAI_THROTTLED = Counter(
+    "synthbot_openai_throttled", "OpenAI calls delayed, rate limited or timed out by the rate-limit scheduler",
+    ["model", "reason"]
+)
+
+
+class StageTimer:
+    """Per-request breakdown of where time went.
+
+    Each `stage()` span is observed in the stage histogram and accumulated into
+    `stages`; repeated stages add up. Database statements run while the timer is
+    active (see `track`) accumulate under `db`, which is observed once per request
+    when tracking ends.
+    """
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.stages: Dict[str, float] = {}
+        self._deferred: Set[str] = set()
+
+    def add(self, stage: str, seconds: float, observe: bool = True):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        if observe:
+            STAGE_SECONDS.labels(self.pipeline, stage).observe(seconds)
+        else:
+            self._deferred.add(stage)
+
+    def finish(self):
+        """Observe the totals of stages that were accumulated without observation."""
+        for stage in self._deferred:
+            STAGE_SECONDS.labels(self.pipeline, stage).observe(self.stages[stage])
+        self._deferred.clear()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Stage durations in milliseconds."""
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()}
+
+
+_current_timer: ContextVar[Optional[StageTimer]] = ContextVar("current_timer", default=None)
+
+
+def current_timer() -> Optional[StageTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def track(timer: StageTimer) -> Iterator[StageTimer]:
+    """Make `timer` the one database statements in this context are charged to."""
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+        timer.finish()
+
+
+def merge_breakdowns(*breakdowns: Dict[str, float]) -> Dict[str, float]:
+    """Sum millisecond breakdowns stage by stage."""
+    merged: Dict[str, float] = {}
+    for breakdown in breakdowns:
+        for stage, ms in breakdown.items():
+            merged[stage] = round(merged.get(stage, 0.0) + ms, 3)
+    return merged
+
+
+def instrument_engine(engine: Engine):
+    """Time every statement executed on `engine`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        elapsed = time.perf_counter() - started
+        DB_QUERY_SECONDS.observe(elapsed)
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.add("db", elapsed, observe=False)
+
+
+class CacheStatsCollector:
+    """Expose the caches' own counters as gauges at scrape time."""
+
+    def __init__(self, sources: Dict[str, Callable[[], Dict]]):
+        self.sources = sources
+
+    @staticmethod
+    def _families():
+        return (
+            GaugeMetricFamily("synthbot_cache_hit_ratio", "Cache hit ratio since start", labels=["cache"]),
+            GaugeMetricFamily("synthbot_cache_entries", "Entries held by a cache", labels=["cache"]),
+        )
+
+    def describe(self):
+        # Lets the registry learn the metric names without calling collect(),
+        # which would build every cache at registration
+        return self._families()
+
+    def collect(self):
+        hit_ratio, entries = self._families()
+        for name, stats in self.sources.items():
+            # One unreachable cache must not fail the whole scrape
+            try:
+                values = stats()
+            except Exception as e:
+                logger.warning(f"Reading {name} cache stats failed: {e}")
+                continue
+            if "hit_ratio" in values:
+                hit_ratio.add_metric([name], values["hit_ratio"])
+            if "entries" in values:
+                entries.add_metric([name], values["entries"])
+        yield hit_ratio
+        yield entries
+
+
+_cache_stats_collector: Optional[CacheStatsCollector] = None
+
+
+def register_cache_stats(sources: Dict[str, Callable[[], Dict]]):
+    """Publish the caches' stats; a later call replaces the earlier sources.
+
+    `python -m app.main` with several workers imports the app module twice in
+    each worker (as `__mp_main__` and as `app.main`), so this must be idempotent.
+    """
+    global _cache_stats_collector
+    if _cache_stats_collector is not None:
+        REGISTRY.unregister(_cache_stats_collector)
+    _cache_stats_collector = CacheStatsCollector(sources)
+    REGISTRY.register(_cache_stats_collector)
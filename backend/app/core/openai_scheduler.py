@@ -0,0 +1,311 @@
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+
+from app.core.admission import current_priority
+from app.core.config import settings
+from app.core.deadlines import current_deadline
+from app.core.metrics import OPENAI_SCHEDULE_WAIT_SECONDS, OPENAI_THROTTLED
+from app.core.providers import Provider
+from app.core.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Lower ranks go first; work outside an admission class (scripts, warm-up) is background
+PRIORITY_RANKS = {"chat": 0, "ingest": 1}
+BACKGROUND_RANK = max(PRIORITY_RANKS.values())
+
+# Tokens added per chat message for role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Connection pool of the scheduled clients (the OpenAI SDK's defaults)
+CONNECTION_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds in an `x-ratelimit-reset-*` value such as "1s", "6m0s" or "20ms"."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+class TokenBucket:
+    """A per-minute budget refilled continuously; the level may go negative when estimates fall short."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` fits above `reserve`; 0 when it fits now."""
+        if not self.enabled:
+            return 0.0
+        needed = min(amount + reserve, self.capacity) - self.level
+        return max(needed, 0.0) * 60 / self.capacity
+
+    def take(self, amount: float):
+        if self.enabled:
+            self.level -= amount
+
+
+class ModelBudget:
+    """Request and token buckets for one model; OpenAI limits each model separately."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.waiting: Dict[int, int] = {}
+
+
+class OpenAIScheduler:
+    """Pace OpenAI calls within per-model RPM and TPM budgets, chat first.
+
+    Every call reserves one request and its estimated tokens (prompt plus the
+    completion it may produce) before it is sent, waiting for the buckets to
+    refill instead of being sent into a 429. While a higher-priority call is
+    waiting, lower-priority calls hold back, and background work may only use
+    the budget above `background_reserve`, so a large ingestion leaves room for
+    interactive queries. `x-ratelimit-*` response headers pull the local view
+    down to what the account has left (other workers and clients share it),
+    and a 429 pauses the model until the reported reset.
+
+    Budgets are per process; the configured account limits are split evenly
+    between server workers.
+    """
+
+    def __init__(self, rpm: float, tpm: float, background_reserve: float = 0.2):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.background_reserve = background_reserve
+        self._budgets: Dict[str, ModelBudget] = {}
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rpm > 0 or self.tpm > 0
+
+    def _budget(self, model: str) -> ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = self._budgets[model] = ModelBudget(self.rpm, self.tpm)
+        return budget
+
+    def _reserve(self, bucket: TokenBucket, rank: int) -> float:
+        return self.background_reserve * bucket.capacity if rank > 0 else 0.0
+
+    def _wait_time(self, budget: ModelBudget, tokens: int, rank: int, now: float) -> Optional[float]:
+        """Seconds to wait before a call may go, or None to wait for a higher-priority call."""
+        if any(count for other, count in budget.waiting.items() if other < rank):
+            return None
+        budget.requests.refill(now)
+        budget.tokens.refill(now)
+        return max(
+            budget.paused_until - now,
+            budget.requests.wait_time(1, self._reserve(budget.requests, rank)),
+            budget.tokens.wait_time(tokens, self._reserve(budget.tokens, rank)),
+        )
+
+    def acquire(self, model: str, tokens: int, priority: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """Reserve one request and `tokens` tokens of `model`'s budget; returns seconds waited.
+
+        `priority` defaults to the admission class of the current request.
+        Raises TimeoutError when the budget is not available within `timeout`.
+        """
+        if not self.enabled:
+            return 0.0
+        priority = priority or current_priority.get()
+        rank = PRIORITY_RANKS.get(priority, BACKGROUND_RANK)
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        with self._condition:
+            budget = self._budget(model)
+            budget.waiting[rank] = budget.waiting.get(rank, 0) + 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(budget, tokens, rank, now)
+                    if wait is not None and wait <= 0:
+                        break
+                    if deadline is not None and now >= deadline:
+                        OPENAI_THROTTLED.labels(model, "timeout").inc()
+                        raise TimeoutError(f"No {model} rate-limit budget within {timeout:g}s")
+                    # Re-check at least every second: releases and header updates notify, refills do not
+                    sleep = min(wait if wait is not None else 1.0, 1.0)
+                    if deadline is not None:
+                        sleep = min(sleep, deadline - now)
+                    self._condition.wait(sleep)
+                budget.requests.take(1)
+                budget.tokens.take(tokens)
+            finally:
+                budget.waiting[rank] -= 1
+                self._condition.notify_all()
+        waited = time.monotonic() - started
+        OPENAI_SCHEDULE_WAIT_SECONDS.labels(priority or "background").observe(waited)
+        if waited > 0.001:
+            OPENAI_THROTTLED.labels(model, "paced").inc()
+        return waited
+
+    def observe(self, model: str, status_code: int, headers: Mapping[str, str]):
+        """Align `model`'s budget with the limits OpenAI reported on a response."""
+        if not self.enabled:
+            return
+        workers = max(settings.workers, 1)
+        now = time.monotonic()
+        with self._condition:
+            budget = self._budget(model)
+            for kind, bucket in (("requests", budget.requests), ("tokens", budget.tokens)):
+                if not bucket.enabled:
+                    continue
+                limit = _header_number(headers, f"x-ratelimit-limit-{kind}")
+                if limit is not None and limit / workers < bucket.capacity:
+                    bucket.capacity = limit / workers
+                    bucket.level = min(bucket.level, bucket.capacity)
+                remaining = _header_number(headers, f"x-ratelimit-remaining-{kind}")
+                if remaining is not None:
+                    bucket.refill(now)
+                    bucket.level = min(bucket.level, remaining / workers)
+                    if remaining <= 0:
+                        reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+                        if reset:
+                            budget.paused_until = max(budget.paused_until, now + reset)
+            if status_code == 429:
+                OPENAI_THROTTLED.labels(model, "rate_limited").inc()
+                retry_after = _header_number(headers, "retry-after") or 1.0
+                budget.paused_until = max(budget.paused_until, now + retry_after)
+                logger.warning(f"OpenAI rate limit hit for {model}; pausing {retry_after:g}s")
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._condition:
+            return {
+                model: {
+                    "requests_available": round(budget.requests.level),
+                    "tokens_available": round(budget.tokens.level),
+                    "paused_seconds": round(max(budget.paused_until - now, 0.0), 1),
+                    "waiting": sum(budget.waiting.values()),
+                }
+                for model, budget in self._budgets.items()
+            }
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return parse_reset(value)
+
+
+def estimate_tokens(path: str, body: Dict[str, Any]) -> int:
+    """Tokens OpenAI will count against the TPM limit for a request body."""
+    model = body.get("model")
+    if path.endswith("/embeddings"):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        return sum(count_tokens(item, model) if isinstance(item, str) else len(item) for item in inputs)
+    prompt = sum(
+        MESSAGE_OVERHEAD_TOKENS + count_tokens(str(message.get("content") or ""), model)
+        for message in body.get("messages", [])
+    )
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or settings.openai_completion_tokens_estimate
+    return prompt + int(completion)
+
+
+class SchedulingTransport(httpx.BaseTransport):
+    """httpx transport that passes embedding and chat requests through the scheduler.
+
+    Sitting under the HTTP client, it also paces the SDK's own retries. Waiting
+    for budget counts against the request's pool timeout and ends in
+    `httpx.PoolTimeout`, which the SDK treats like any other timeout.
+
+    Inside a request deadline, every attempt's timeouts are cut to the time
+    left, and an attempt (a retry, typically) that would start after the
+    deadline raises DeadlineExceeded, which the SDK does not retry.
+    """
+
+    def __init__(self, scheduler: OpenAIScheduler, transport: Optional[httpx.BaseTransport] = None):
+        self.scheduler = scheduler
+        self.transport = transport or httpx.HTTPTransport(limits=CONNECTION_LIMITS)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        deadline = current_deadline.get()
+        if deadline is None:
+            return self._send(request)
+        request.extensions["timeout"] = deadline.clamp(request.extensions.get("timeout"))
+        try:
+            return self._send(request)
+        except httpx.TimeoutException:
+            # Cut short by the deadline rather than by a slow upstream: not worth a retry
+            deadline.check()
+            raise
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.rstrip("/")
+        if not self.scheduler.enabled or not path.endswith(("/embeddings", "/chat/completions")):
+            return self.transport.handle_request(request)
+        try:
+            body = json.loads(request.content or b"{}")
+        except ValueError:
+            return self.transport.handle_request(request)
+
+        model = str(body.get("model") or "unknown")
+        timeout = (request.extensions.get("timeout") or {}).get("pool")
+        try:
+            self.scheduler.acquire(model, estimate_tokens(path, body), timeout=timeout)
+        except TimeoutError as e:
+            raise httpx.PoolTimeout(str(e), request=request) from None
+        response = self.transport.handle_request(request)
+        self.scheduler.observe(model, response.status_code, response.headers)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+def scheduled_http_client() -> httpx.Client:
+    """HTTP client for OpenAI SDK clients, paced by the shared scheduler.
+
+    The SDK sets timeouts per request, so the client needs none of its own.
+    """
+    return httpx.Client(transport=SchedulingTransport(get_openai_scheduler()), follow_redirects=True)
+
+
+def _build_openai_scheduler() -> OpenAIScheduler:
+    return OpenAIScheduler(
+        rpm=settings.openai_rpm_limit / max(settings.workers, 1),
+        tpm=settings.openai_tpm_limit / max(settings.workers, 1),
+        background_reserve=settings.openai_background_reserve
+    )
+
+
+# Shared by every OpenAI client in the process, built on first use; a forked
+# child starts with a fresh budget (and a lock nobody holds)
+get_openai_scheduler = Provider(_build_openai_scheduler)
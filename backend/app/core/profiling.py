@@ -0,0 +1,241 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from app.core.config import settings
+
+
+class RequestProfile:
+    """cProfile data for one request, collected from every thread it ran on."""
+
+    def __init__(self, profile_id: str):
+        self.id = profile_id
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile the calling thread for the duration of the block."""
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            if not self._profiles:
+                return None
+            stats = pstats.Stats(self._profiles[0])
+            for profile in self._profiles[1:]:
+                stats.add(profile)
+            return stats
+
+
+_active_profile: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
+
+
+def profiled_in_thread(fn: Callable) -> Callable:
+    """Wrap a function that is handed to a worker thread so it is profiled too.
+
+    Only a contextvar lookup when no profile is active.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        with profile.thread():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class RequestProfiler:
+    """Runs single requests under cProfile and keeps the results on disk.
+
+    Only the request's own thread work is profiled: functions handed to worker
+    threads through `profiled_in_thread` (the RAG pipeline, ingestion). The
+    event loop thread is shared by every request's coroutines, so profiling it
+    would mix other requests into the report; code a request runs on the loop
+    itself does not show up. Only one request is profiled at a time, since
+    profiled threads slow down several-fold and would distort each other's
+    timings. Profiles are written as `<id>.prof` (loadable with pstats,
+    snakeviz, etc.) in `directory`.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._busy = threading.Lock()
+
+    def start(self) -> Optional[RequestProfile]:
+        """Begin a profile, or return None if another request is being profiled."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        return RequestProfile(time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8])
+
+    @contextmanager
+    def activate(self, profile: RequestProfile) -> Iterator[None]:
+        """Mark the context so that work it hands to worker threads is profiled."""
+        token = _active_profile.set(profile)
+        try:
+            yield
+        finally:
+            _active_profile.reset(token)
+
+    def finish(self, profile: RequestProfile) -> Optional[str]:
+        """Write the profile to disk and release the profiler.
+
+        Returns its path, or None when the request did no profiled thread work.
+        """
+        try:
+            stats = profile.stats()
+            if stats is None:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{profile.id}.prof")
+            stats.dump_stats(path)
+            return path
+        finally:
+            self._busy.release()
+
+    def path(self, profile_id: str) -> Optional[str]:
+        """Path of a stored profile, or None if it does not exist or the ID is malformed."""
+        if not profile_id or os.path.basename(profile_id) != profile_id:
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.prof")
+        return path if os.path.exists(path) else None
+
+    def list(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (name[:-len(".prof")] for name in os.listdir(self.directory) if name.endswith(".prof")),
+            reverse=True
+        )
+
+
+def format_profile(path: str, sort: str = "cumulative", limit: int = 50) -> str:
+    """Render a stored profile as a pstats text report."""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class StackSampler:
+    """Periodic stack sampler for a set of watched threads.
+
+    Samples are kept as folded stacks (`frame;frame;frame count` per line), the
+    input format of flamegraph.pl and speedscope, and rewritten to `path` every
+    `flush_seconds`; `{pid}` in the path is filled in when sampling starts, so
+    each worker process writes its own file. Threads opt in through
+    `watching()`; with no watched thread the sampler only wakes up and goes back
+    to sleep.
+    """
+
+    def __init__(self, path: str, interval: float, flush_seconds: float = 30.0, max_depth: int = 64):
+        self.path_template = path
+        self.path = path
+        self.interval = interval
+        self.flush_seconds = flush_seconds
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._watched: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @contextmanager
+    def watching(self) -> Iterator[None]:
+        """Sample the calling thread while the block runs (no-op when not running)."""
+        if self._thread is None:
+            yield
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            self._watched.add(ident)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._watched.discard(ident)
+
+    def _fold(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def sample(self):
+        """Take one sample of every watched thread."""
+        with self._lock:
+            watched = set(self._watched)
+        if not watched:
+            return
+        frames: Dict[int, object] = sys._current_frames()
+        folded = [self._fold(frames[ident]) for ident in watched if ident in frames]
+        with self._lock:
+            self.samples.update(folded)
+
+    def flush(self):
+        with self._lock:
+            lines = [f"{stack} {count}\n" for stack, count in self.samples.items()]
+        if not lines:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_seconds
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_seconds
+
+    def start(self):
+        if self._thread is None:
+            self.path = self.path_template.format(pid=os.getpid())
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.flush()
+
+
+# Global profiling instances; the sampler only runs when an interval is configured
+request_profiler = RequestProfiler(settings.profile_dir)
+ingest_sampler = StackSampler(
+    os.path.join(settings.profile_dir, "ingest-{pid}.folded"),
+    interval=settings.ingest_sampler_interval_ms / 1000,
+    flush_seconds=settings.ingest_sampler_flush_seconds
+)
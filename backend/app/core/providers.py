@@ -0,0 +1,70 @@
+import os
+import threading
+import weakref
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+_providers: "weakref.WeakSet[Provider]" = weakref.WeakSet()
+
+
+class Provider(Generic[T]):
+    """A shared object built by `factory` on first use.
+
+    Network clients and other expensive objects sit behind providers so that
+    importing the app (tests, scripts, worker start-up) neither pays for them
+    nor fails when a service is unreachable. Concurrent first callers share
+    one instance. Providers take no arguments, so they also work as FastAPI
+    dependencies, and `override` swaps in a stand-in for tests and tools.
+
+    Providers are fork-safe: a forked child (e.g. a pre-forked server worker)
+    builds its own instances instead of sharing the parent's sockets. Objects
+    holding no connections, or resetting their own at fork, can be kept with
+    `share_after_fork`.
+    """
+
+    def __init__(self, factory: Callable[[], T], share_after_fork: bool = False):
+        self.factory = factory
+        self.share_after_fork = share_after_fork
+        self._lock = threading.Lock()
+        self._instance: Optional[T] = None
+        _providers.add(self)
+
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self.factory()
+                instance = self._instance
+        return instance
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def override(self, instance: T):
+        """Serve `instance` instead of building one."""
+        with self._lock:
+            self._instance = instance
+
+    def reset(self):
+        """Drop the current instance; the next call builds a fresh one."""
+        with self._lock:
+            self._instance = None
+
+    def _after_fork(self):
+        # The parent's lock may have been held at fork time, and its instance
+        # wraps connections the child must not use; the instance is dropped,
+        # not closed, so the parent's sockets stay open
+        self._lock = threading.Lock()
+        if not self.share_after_fork:
+            self._instance = None
+
+
+def _reset_after_fork():
+    for provider in list(_providers):
+        provider._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyCheck:
+    """A named probe of one dependency; `probe` raises when it is unusable.
+
+    Non-critical dependencies are reported but do not make the service unready.
+    """
+
+    def __init__(self, name: str, probe: Callable[[], Any], critical: bool = True):
+        self.name = name
+        self.probe = probe
+        self.critical = critical
+
+
+class ReadinessMonitor:
+    """Run dependency checks in the background and serve their last results.
+
+    Readiness requests only read the cached results, so a slow or hanging
+    dependency never ties up request handlers. `warm_up` runs first, on the
+    checker thread, so the server can start accepting (and failing readiness
+    probes) while connections are being opened. The service is ready once
+    warm-up has finished and every critical check has passed recently; results
+    older than `stale_after` seconds count as failures, so a stuck checker
+    takes the instance out of rotation instead of freezing it as ready.
+    """
+
+    def __init__(
+        self,
+        checks: List[DependencyCheck],
+        warm_up: Optional[Callable[[], None]] = None,
+        interval: float = 10.0,
+        timeout: float = 5.0,
+        stale_after: Optional[float] = None
+    ):
+        self.checks = checks
+        self.warm_up = warm_up
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after if stale_after is not None else interval * 3 + timeout
+        self.warmed_up = False
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _probe(self, check: DependencyCheck) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=max(len(self.checks), 1), thread_name_prefix="readiness")
+            pool = self._pool
+        future = pool.submit(check.probe)
+        try:
+            future.result(timeout=self.timeout)
+            result: Dict[str, Any] = {"status": "ok"}
+        except FutureTimeout:
+            result = {"status": "error", "error": f"timed out after {self.timeout:g}s"}
+        except Exception as e:
+            result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["critical"] = check.critical
+        return result
+
+    def run_checks(self):
+        """Probe every dependency once and record the results."""
+        for check in self.checks:
+            result = self._probe(check)
+            with self._lock:
+                previous = self._results.get(check.name, {}).get("status")
+                self._results[check.name] = result
+                self._checked_at[check.name] = time.monotonic()
+            if result["status"] != previous and previous is not None:
+                log = logger.info if result["status"] == "ok" else logger.warning
+                log(f"Dependency {check.name} is now {result['status']}", extra={"dependency": check.name, **result})
+
+    def snapshot(self) -> Tuple[bool, Dict[str, Any]]:
+        """Return (ready, per-dependency status) from the cached results."""
+        now = time.monotonic()
+        with self._lock:
+            checks: Dict[str, Dict[str, Any]] = {}
+            for check in self.checks:
+                result = dict(self._results.get(check.name) or {"status": "pending", "critical": check.critical})
+                checked_at = self._checked_at.get(check.name)
+                if checked_at is not None:
+                    age = now - checked_at
+                    result["age_seconds"] = round(age, 1)
+                    if age > self.stale_after:
+                        result["status"] = "stale"
+                checks[check.name] = result
+        ready = self.warmed_up and all(
+            result["status"] == "ok" for result in checks.values() if result["critical"]
+        )
+        return ready, checks
+
+    def _run(self):
+        if self.warm_up is not None and not self.warmed_up:
+            try:
+                self.warm_up()
+            except Exception:
+                logger.exception("Warm-up failed")
+        self.warmed_up = True
+        while not self._stop.is_set():
+            try:
+                self.run_checks()
+            except Exception:
+                logger.exception("Readiness checks failed")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Warm up (once) and then check dependencies every `interval` seconds, in the background."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="readiness", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
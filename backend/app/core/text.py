@@ -0,0 +1,6 @@
+def normalize_query(query: str) -> str:
+    """Normalize a user query for use as a cache or deduplication key.
+
+    Case and runs of whitespace are ignored; everything else is significant.
+    """
+    return " ".join(query.lower().split())
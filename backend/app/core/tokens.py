@@ -0,0 +1,51 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Encoding used when a model name is unknown to tiktoken
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def _named_encoding(name: str):
+    """tiktoken encoding `name`, or None when tiktoken cannot load it.
+
+    tiktoken downloads encodings on first use, so offline hosts without a
+    populated cache fall back to the character estimate. Failures are cached
+    like encodings: the download is tried once per process, not once per call.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]):
+    """tiktoken encoding for `model`, or None when tiktoken cannot load one."""
+    name = DEFAULT_ENCODING
+    if model:
+        try:
+            import tiktoken
+            name = tiktoken.encoding_name_for_model(model)
+        except Exception:
+            pass
+    return _named_encoding(name)
+
+
+def warm_encodings(*models: Optional[str]):
+    """Load the encodings for `models` ahead of the first request that counts tokens."""
+    for model in models:
+        _encoding(model)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens `text` encodes to for `model` (about 4 characters per token as a fallback)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
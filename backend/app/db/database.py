@@ -1,18 +1,70 @@
-from sqlalchemy import create_engine
+import os
+import time
+from typing import Any, Dict
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from app.core.config import settings
+from app.core.providers import Provider
+from app.core.metrics import instrument_engine
 from app.db.models import Base
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    poolclass=StaticPool,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+# Tries at create_tables while other workers may be creating the same tables
+CREATE_TABLES_ATTEMPTS = 5
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Connection pool options for `database_url`.
+
+    Request handlers, uploads, RAG worker threads and readiness checks use the
+    engine at the same time, so each session checks out a connection of its
+    own: returning a connection rolls back whatever transaction is open on it.
+    Only an in-memory SQLite database, which lives inside its one connection,
+    keeps a single shared connection. Pool sizes are deployment totals split
+    between the worker processes, each of which has its own pool.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        workers = max(settings.workers, 1)
+        return {
+            "pool_pre_ping": True,
+            "pool_size": max(1, settings.database_pool_size // workers),
+            "max_overflow": settings.database_max_overflow // workers,
+        }
+    options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if url.database in (None, "", ":memory:"):
+        options["poolclass"] = StaticPool
+    return options
+
+
+def _build_engine() -> Engine:
+    database_url = settings.require("database_url")
+    engine = create_engine(database_url, **engine_options(database_url))
+    instrument_engine(engine)
+    return engine
+
+
+# Database engine and session factory, built on first use
+get_engine = Provider(_build_engine, share_after_fork=True)
+_session_factory = Provider(
+    lambda: sessionmaker(autocommit=False, autoflush=False, bind=get_engine()), share_after_fork=True
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _dispose_after_fork():
+    # Forked workers open their own connections; close=False leaves the parent's alone
+    if get_engine.built:
+        get_engine().dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def SessionLocal() -> Session:
+    """Open a new session on the app's engine."""
+    return _session_factory()()
 
 
 def get_db() -> Session:
@@ -25,10 +77,21 @@ def get_db() -> Session:
 
 
 def create_tables():
-    """Create all database tables."""
-    Base.metadata.create_all(bind=engine)
+    """Create all database tables.
+
+    Workers starting together race to create them; a worker that loses the race
+    fails on an existing table and checks again.
+    """
+    for attempt in range(CREATE_TABLES_ATTEMPTS):
+        try:
+            Base.metadata.create_all(bind=get_engine())
+            return
+        except (OperationalError, ProgrammingError):
+            if attempt == CREATE_TABLES_ATTEMPTS - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
 
 
 def drop_tables():
     """Drop all database tables."""
-    Base.metadata.drop_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.drop_all(bind=get_engine()) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index, JSON
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -29,6 +29,9 @@ class DocumentChunk(Base):
     """Model for storing document chunks with their embeddings."""
     
     __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index("ix_document_chunks_document_id_chunk_index", "document_id", "chunk_index"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     document_id = Column(String, ForeignKey("documents.id"), nullable=False)
@@ -45,11 +48,17 @@ class Conversation(Base):
     """Model for grouping chats into conversation sessions."""
 
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(100), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized from chats, maintained in the same transaction as chat inserts
+    message_count = Column(Integer, nullable=False, default=0)
+    last_message_at = Column(DateTime, nullable=True)
 
     # Relationships
     chats = relationship("Chat", back_populates="conversation", cascade="all, delete-orphan")
@@ -59,6 +68,10 @@ class Chat(Base):
     """Model for storing chat history."""
 
     __tablename__ = "chats"
+    __table_args__ = (
+        Index("ix_chats_created_at_id", "created_at", "id"),
+        Index("ix_chats_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     document_id = Column(String, ForeignKey("documents.id"), nullable=True)
@@ -67,6 +80,7 @@ class Chat(Base):
     ai_response = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     response_time = Column(Float, nullable=True)  # Response time in seconds
+    timings = Column(JSON, nullable=True)  # Per-stage breakdown in milliseconds
 
     # Relationships
     document = relationship("Document", back_populates="chats")
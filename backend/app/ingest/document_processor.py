@@ -1,76 +1,117 @@
+import logging
 import os
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.db.models import Document, DocumentChunk
 from app.services.pdf_processor import pdf_processor
 from app.services.embeddings import embedding_service
 from app.services.vector_store import vector_store
+from app.services.answer_cache import get_answer_cache
 from app.core.config import settings
+from app.core.metrics import StageTimer, track
+from app.core.profiling import ingest_sampler
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_payload(
+    content: str,
+    chunk_index: int,
+    page_number: int,
+    filename: str,
+    document_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the vector store payload for a document chunk.
+
+    In "slim" payload mode the content is left out; it lives in document_chunks
+    and is fetched after ranking (see ChunkContentStore).
+    """
+    payload: Dict[str, Any] = {
+        "chunk_index": chunk_index,
+        "page_number": page_number,
+        "filename": filename
+    }
+    if document_id is not None:
+        payload["document_id"] = document_id
+    if settings.qdrant_payload_mode != "slim":
+        payload["content"] = content
+    return payload
 
 
 class DocumentProcessor:
     """Service for processing and ingesting PDF documents."""
     
     def process_document(self, file_path: str, original_filename: str, db: Session) -> Document:
-        """Process a PDF document and store it in the database and vector store."""
+        """Process a PDF document and store it in the database and vector store.
+
+        Each stage is observed under the `ingest` pipeline of the stage histogram,
+        and the thread is stack-sampled when the ingestion sampler is running.
+        """
+        timer = StageTimer("ingest")
         try:
-            # Get PDF info
-            pdf_info = pdf_processor.get_pdf_info(file_path)
-            
-            # Extract text chunks
-            text_chunks, num_pages = pdf_processor.extract_text_from_pdf(file_path)
-            
-            # Generate embeddings for chunks
-            embeddings = embedding_service.get_embeddings(text_chunks)
-            
-            # Prepare metadata for vector store
-            metadata_list = []
-            for i, chunk in enumerate(text_chunks):
-                metadata = {
-                    "content": chunk,
-                    "chunk_index": i,
-                    "page_number": self._estimate_page_number(i, len(text_chunks), num_pages),
-                    "filename": original_filename
-                }
-                metadata_list.append(metadata)
-            
-            # Store embeddings in vector store
-            embedding_ids = vector_store.add_embeddings(embeddings, metadata_list)
-            
-            # Create document record
-            document = Document(
-                filename=os.path.basename(file_path),
-                original_filename=original_filename,
-                file_size=pdf_info["num_pages"],
-                num_pages=num_pages,
-                num_chunks=len(text_chunks)
-            )
-            
-            db.add(document)
-            db.flush()  # Get the document ID
-            
-            # Create chunk records
-            for i, (chunk, embedding_id) in enumerate(zip(text_chunks, embedding_ids)):
-                document_chunk = DocumentChunk(
-                    document_id=document.id,
-                    chunk_index=i,
-                    content=chunk,
-                    page_number=self._estimate_page_number(i, len(text_chunks), num_pages),
-                    embedding_id=embedding_id
+            with track(timer), ingest_sampler.watching():
+                with timer.stage("extract"):
+                    # Get PDF info
+                    pdf_info = pdf_processor.get_pdf_info(file_path)
+                    
+                    # Extract text chunks
+                    text_chunks, num_pages = pdf_processor.extract_text_from_pdf(file_path)
+                
+                # Generate embeddings for chunks
+                with timer.stage("embed"):
+                    embeddings = embedding_service.get_embeddings(text_chunks)
+                
+                # Create document record first so points can carry its ID
+                document = Document(
+                    filename=os.path.basename(file_path),
+                    original_filename=original_filename,
+                    file_size=pdf_info["num_pages"],
+                    num_pages=num_pages,
+                    num_chunks=len(text_chunks)
                 )
-                db.add(document_chunk)
-            
-            # Update document with chunk count
-            document.num_chunks = len(text_chunks)
-            
-            db.commit()
+                
+                db.add(document)
+                db.flush()  # Get the document ID
+                
+                # Prepare metadata for vector store
+                metadata_list = []
+                for i, chunk in enumerate(text_chunks):
+                    metadata = chunk_payload(
+                        chunk, i, self._estimate_page_number(i, len(text_chunks), num_pages),
+                        original_filename, str(document.id)
+                    )
+                    metadata_list.append(metadata)
+                
+                # Store embeddings in vector store
+                with timer.stage("upsert"):
+                    embedding_ids = vector_store.add_embeddings(embeddings, metadata_list)
+                
+                # Create chunk records
+                for i, (chunk, embedding_id) in enumerate(zip(text_chunks, embedding_ids)):
+                    document_chunk = DocumentChunk(
+                        document_id=document.id,
+                        chunk_index=i,
+                        content=chunk,
+                        page_number=self._estimate_page_number(i, len(text_chunks), num_pages),
+                        embedding_id=embedding_id
+                    )
+                    db.add(document_chunk)
+                
+                # Update document with chunk count
+                document.num_chunks = len(text_chunks)
+                
+                with timer.stage("commit"):
+                    db.commit()
+
+            # Retrieval ignores the answer scope, so any cached answer may now be stale
+            get_answer_cache().invalidate_upload()
             
             return document
             
         except Exception as e:
             db.rollback()
-            print(f"Error processing document {file_path}: {e}")
+            logger.error(f"Error processing document {file_path}: {e}")
             raise
     
     def _estimate_page_number(self, chunk_index: int, total_chunks: int, total_pages: int) -> int:
@@ -99,12 +140,15 @@ class DocumentProcessor:
             # Delete from database (cascade will handle chunks)
             db.delete(document)
             db.commit()
+
+            # Drop cached answers that cite the deleted chunks
+            get_answer_cache().invalidate_embeddings(chunk_embedding_ids)
             
             return True
             
         except Exception as e:
             db.rollback()
-            print(f"Error deleting document {document_id}: {e}")
+            logger.error(f"Error deleting document {document_id}: {e}")
             raise
 
 
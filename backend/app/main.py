@@ -1,37 +1,60 @@
-from fastapi import FastAPI, HTTPException
+import hmac
+import time
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
+import logging
+import uuid
 from app.core.config import settings
-print(f"[DEBUG] DISABLE_EMBEDDINGS = {settings.disable_embeddings}")
-
-
-from app.core.config import settings
+from app.core.logging_config import configure_logging, request_id_var, shutdown_logging
 from app.db.database import create_tables
 from app.services.vector_store import vector_store
-from app.api import chat, conversations, documents
+from app.api import admin, chat, chunks, conversations, documents
+from app.core.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, register_cache_stats
+from app.core.profiling import ingest_sampler, request_profiler
+from app.rag.chain import rag_chain
+from app.services.answer_cache import get_answer_cache
+from app.services.chunk_content import get_chunk_content_store
+from app.services.embedding_cache import get_query_embedding_cache
+from app.services.warmup import readiness
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup
-    print("Starting up Synthesizer Chatbot API...")
+    # Startup; logging is configured here rather than at import so that
+    # importing the app (tests, tools) starts no listener thread
+    configure_logging(settings.log_level, settings.log_format)
+    logger.info("Starting up Synthesizer Chatbot API", extra={"disable_embeddings": settings.disable_embeddings})
     
     # Initialize database tables
     create_tables()
-    print("Database tables created/verified")
+    logger.info("Database tables created/verified")
     
     # Initialize vector store
     try:
         vector_store.initialize_collection()
-        print("Vector store initialized")
+        logger.info("Vector store initialized")
     except Exception as e:
-        print(f"Warning: Could not initialize vector store: {e}")
+        logger.warning(f"Could not initialize vector store: {e}")
+    
+    if settings.ingest_sampler_interval_ms > 0:
+        ingest_sampler.start()
+    
+    # Warm up and check dependencies in the background; /ready reports the result
+    readiness.start()
     
     yield
     
     # Shutdown
-    print("Shutting down Synthesizer Chatbot API...")
+    readiness.stop()
+    ingest_sampler.stop()
+    logger.info("Shutting down Synthesizer Chatbot API")
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -51,8 +74,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cache counters are read from the caches themselves at scrape time
+register_cache_stats({
+    "answers": lambda: get_answer_cache().stats(),
+    "query_embeddings": lambda: get_query_embedding_cache().stats(),
+    "chunk_contents": lambda: get_chunk_content_store().cache.stats(),
+    "single_flight": rag_chain.inflight.stats,
+})
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Track in-flight requests and latency per route template."""
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status)
+        ).observe(time.perf_counter() - started)
+
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag the request (and every log line it produces) with an ID, echoed in X-Request-ID."""
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Profile a request's worker-thread work when it carries the profiling token.
+
+    Disabled unless PROFILING_TOKEN is set. Work the request runs on the event
+    loop is not profiled (see RequestProfiler). When there is a profile, its
+    ID comes back in the X-Profile-Id header; fetch the report from
+    /admin/profiles/{id}.
+    """
+    token = request.headers.get("x-profile-token")
+    if token is None or not settings.profiling_token or request.url.path.startswith("/admin"):
+        return await call_next(request)
+    if not hmac.compare_digest(token, settings.profiling_token):
+        return JSONResponse({"detail": "Invalid profiling token"}, status_code=403)
+
+    profile = request_profiler.start()
+    if profile is None:
+        return JSONResponse({"detail": "Another request is being profiled"}, status_code=409)
+    try:
+        with request_profiler.activate(profile):
+            response = await call_next(request)
+    finally:
+        path = request_profiler.finish(profile)
+    if path is not None:
+        response.headers["X-Profile-Id"] = profile.id
+    return response
+
+
 # Include routers
+app.include_router(admin.router)
 app.include_router(chat.router)
+app.include_router(chunks.router)
 app.include_router(conversations.router)
 app.include_router(documents.router)
 
@@ -67,7 +160,10 @@ async def root():
         "endpoints": {
             "chat": "/chat",
             "documents": "/documents",
-            "upload": "/documents/upload"
+            "chunks": "/chunks",
+            "upload": "/documents/upload",
+            "ready": "/ready",
+            "metrics": "/metrics"
         }
     }
 
@@ -78,11 +174,41 @@ async def health_check():
     return {"status": "healthy", "message": "API is running"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: per-dependency status from the background checks.
+
+    Returns 503 until warm-up has finished and while a critical dependency is
+    failing, so load balancers only route to warm, connected instances.
+    """
+    ready, checks = readiness.snapshot()
+    return JSONResponse(
+        {"status": "ready" if ready else "not_ready", "warmed_up": readiness.warmed_up, "checks": checks},
+        status_code=200 if ready else 503
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics in the text exposition format.
+
+    A plain function, so FastAPI runs it in the threadpool: collecting cache
+    stats may query a cache backend and must not block the event loop.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
+    configure_logging(settings.log_level, settings.log_format)
+    # Each worker is a separate process with its own clients; set
+    # CACHE_BACKEND=disk or redis so they share the embedding and answer caches
+    if settings.workers > 1 and settings.cache_backend == "memory":
+        logger.warning(f"Running {settings.workers} workers with per-process caches")
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug
+        workers=settings.workers,
+        reload=settings.debug and settings.workers == 1
     )
@@ -1,23 +1,25 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.documents import Document
-from typing import List, Dict, Any
+import logging
+import sys
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from app.core.config import settings
+from app.core.providers import Provider
 from app.services.embeddings import embedding_service
 from app.services.vector_store import vector_store
+from app.services.chunk_content import get_chunk_content_store
+from app.services.answer_cache import get_answer_cache
+from app.services.single_flight import SingleFlight
+from app.core.text import normalize_query
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpen, is_failure
+from app.core.deadlines import DeadlineExceeded, stage_deadline
+from app.core.metrics import OPENAI_TOKENS, RAG_IN_FLIGHT, StageTimer, track
 
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
 
-class RAGChain:
-    """RAG chain for question answering with document retrieval."""
-    
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=settings.openai_api_key,
-            model="gpt-3.5-turbo",
-            temperature=0.1
-        )
-        
-        self.prompt_template = ChatPromptTemplate.from_template("""
+logger = logging.getLogger(__name__)
+
+PROMPT_TEMPLATE = """
 You are a helpful AI assistant that answers questions about synthesizer manuals and technical documentation. 
 Use the following context to answer the user's question. If you cannot answer the question based on the context, 
 say so clearly.
@@ -31,20 +33,72 @@ Answer the question based on the context provided. Be accurate and cite specific
 If the context doesn't contain enough information to answer the question, say "I don't have enough information to answer this question based on the available documentation."
 
 Answer:
-""")
+"""
+
+
+def is_upstream_error(error: Exception) -> bool:
+    """Whether `error` means OpenAI could not answer, as opposed to a bad request or a bug of ours."""
+    if isinstance(error, (CircuitOpen, DeadlineExceeded)):
+        return True
+    # Without the SDK imported the error cannot be one of its own
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, openai.APIError) and is_failure(error)
+
+
+class RAGChain:
+    """RAG chain for question answering with document retrieval."""
+    
+    def __init__(self):
+        self.inflight = SingleFlight()
+        self.model = "gpt-3.5-turbo"
+        self.breaker = CircuitBreaker(
+            "openai_chat", settings.circuit_breaker_failures, settings.circuit_breaker_reset_seconds
+        )
+        # LangChain is slow to import; both are built on first use
+        self._llm = Provider(self._build_llm)
+        self._prompt_template = Provider(self._build_prompt_template)
+    
+    def _build_llm(self) -> "ChatOpenAI":
+        from langchain_openai import ChatOpenAI
+        from app.core.openai_scheduler import scheduled_http_client
+
+        return ChatOpenAI(
+            api_key=settings.require("openai_api_key"),
+            base_url=settings.openai_base_url,
+            http_client=scheduled_http_client(),
+            model=self.model,
+            temperature=0.1,
+            request_timeout=settings.openai_timeout_seconds,
+            max_retries=settings.openai_max_retries
+        )
+    
+    @staticmethod
+    def _build_prompt_template() -> "ChatPromptTemplate":
+        from langchain_core.prompts import ChatPromptTemplate
+
+        return ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
+    
+    @property
+    def llm(self) -> "ChatOpenAI":
+        return self._llm()
+    
+    @property
+    def prompt_template(self) -> "ChatPromptTemplate":
+        return self._prompt_template()
     
     def retrieve_relevant_chunks(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Retrieve relevant document chunks for a query."""
         # Generate query embedding
-        query_embedding = embedding_service.get_embedding(query)
+        query_embedding = embedding_service.get_query_embedding(query)
         
         # Search for similar chunks
         results = vector_store.search_similar(query_embedding, limit=limit)
         
-        return results
+        # Slim payloads carry no content; fetch it for the ranked hits only
+        return get_chunk_content_store().hydrate(results)
     
-    def generate_response(self, query: str, context_chunks: List[Dict[str, Any]]) -> str:
-        """Generate a response using the LLM with retrieved context."""
+    def build_prompt(self, query: str, context_chunks: List[Dict[str, Any]]) -> str:
+        """Render the LLM prompt for a query and its retrieved chunks."""
         # Prepare context from chunks
         context_text = "\n\n".join([
             f"Chunk {i+1} (Page {chunk['payload'].get('page_number', 'Unknown')}): {chunk['payload'].get('content', '')}"
@@ -52,28 +106,97 @@ Answer:
         ])
         
         # Create the prompt
-        prompt = self.prompt_template.format(
+        return self.prompt_template.format(
             context=context_text,
             question=query
         )
+    
+    def generate_response(self, query: str, context_chunks: List[Dict[str, Any]]) -> str:
+        """Generate a response using the LLM with retrieved context."""
+        prompt = self.build_prompt(query, context_chunks)
         
-        # Generate response
-        response = self.llm.invoke(prompt)
+        # Generate response; fails fast with CircuitOpen while OpenAI is failing
+        response = self.breaker.call(self.llm.invoke, prompt)
+        
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage:
+            OPENAI_TOKENS.labels(self.model, "prompt").inc(usage.get("input_tokens", 0))
+            OPENAI_TOKENS.labels(self.model, "completion").inc(usage.get("output_tokens", 0))
         
         return response.content
     
-    def process_query(self, query: str, limit: int = 5) -> Dict[str, Any]:
-        """Process a query through the complete RAG pipeline."""
-        # Retrieve relevant chunks
-        relevant_chunks = self.retrieve_relevant_chunks(query, limit)
+    def process_query(self, query: str, limit: int = 5, document_id: Optional[str] = None) -> Dict[str, Any]:
+        """Process a query through the complete RAG pipeline.
+
+        Concurrent calls with the same normalized query and scope share a single
+        execution; `coalesced` in the result says whether this call piggybacked on
+        another. Answers to sufficiently similar earlier queries in the same scope are
+        served from the semantic answer cache; `cache_hit` says which happened.
+        `timings` holds the per-stage breakdown in milliseconds of the execution
+        that produced the result.
+        """
+        key = (normalize_query(query), document_id, limit)
+        result, coalesced = self.inflight.do(
+            key, lambda: self._run_pipeline(query, limit, document_id)
+        )
+        # Each caller gets its own dict so per-request annotations don't leak
+        return {**result, "coalesced": coalesced}
+
+    def _run_pipeline(self, query: str, limit: int, document_id: Optional[str]) -> Dict[str, Any]:
+        """Embed, retrieve and generate for a single query."""
+        timer = StageTimer("rag")
+        with track(timer), RAG_IN_FLIGHT.track_inprogress():
+            result = self._run_stages(timer, query, limit, document_id)
+        return {**result, "timings": timer.breakdown()}
+
+    def _run_stages(self, timer: StageTimer, query: str, limit: int, document_id: Optional[str]) -> Dict[str, Any]:
+        # Inside a request deadline each stage gets its share of the budget
+        with timer.stage("embed"), stage_deadline("embed"):
+            query_embedding = embedding_service.get_query_embedding(query)
+        scope = f"{document_id or '*'}:{limit}"
+
+        if settings.semantic_cache_enabled:
+            with timer.stage("answer_cache"), stage_deadline("answer_cache"):
+                cached = get_answer_cache().lookup(query_embedding, scope)
+            if cached is not None:
+                return {**cached, "cache_hit": True}
+
+        # Retrieve relevant chunks; slim payloads get their content after ranking
+        with timer.stage("search"), stage_deadline("search"):
+            relevant_chunks = vector_store.search_similar(query_embedding, limit=limit)
+        with timer.stage("hydrate"), stage_deadline("hydrate"):
+            relevant_chunks = get_chunk_content_store().hydrate(relevant_chunks)
         
         # Generate response
-        response = self.generate_response(query, relevant_chunks)
+        try:
+            with timer.stage("llm"), stage_deadline("llm"):
+                response = self.generate_response(query, relevant_chunks)
+        except Exception as e:
+            # Upstream trouble (open circuit, deadline, timeout, 5xx): fall back to a looser cache match
+            degraded = self._degraded_answer(query_embedding, scope) if is_upstream_error(e) else None
+            if degraded is None:
+                raise
+            logger.warning(f"Serving a cached answer: {e}")
+            return degraded
         
-        return {
+        result = {
             "response": response,
             "relevant_chunks": relevant_chunks
         }
+        if settings.semantic_cache_enabled:
+            get_answer_cache().store(query_embedding, scope, result)
+
+        return {**result, "cache_hit": False}
+
+    @staticmethod
+    def _degraded_answer(query_embedding: List[float], scope: str) -> Optional[Dict[str, Any]]:
+        """A cached answer to a looser match, for when no fresh one can be generated."""
+        if not settings.semantic_cache_enabled:
+            return None
+        cached = get_answer_cache().lookup(query_embedding, scope, threshold=settings.degraded_cache_threshold)
+        if cached is None:
+            return None
+        return {**cached, "cache_hit": True, "degraded": True}
 
 
 # Global RAG chain instance
@@ -1,8 +1,15 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 
+# How citations are rendered in history payloads:
+#   full    - every citation carries the full chunk content
+#   ref     - citations carry no content; each cited chunk appears once in `chunks`
+#   snippet - every citation carries a truncated copy of the chunk content
+CitationMode = Literal["full", "ref", "snippet"]
+
+
 class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
     query: str
@@ -13,17 +20,29 @@ class ChatRequest(BaseModel):
 class Citation(BaseModel):
     """Model for a citation from a document chunk."""
     chunk_id: str
-    content: str
+    content: Optional[str] = None
     page_number: int
     relevance_score: Optional[float] = None
 
 
+class CitedChunk(BaseModel):
+    """Model for a cited chunk, listed once per response in `ref` mode."""
+    id: str
+    document_id: str
+    chunk_index: int
+    page_number: int
+    content: str
+
+
 class ChatResponse(BaseModel):
     """Response model for chat endpoint."""
     response: str
     citations: List[Citation]
     response_time: float
     conversation_id: Optional[str] = None
+    cached: bool = False
+    degraded: bool = False  # a cached answer to a similar question, served while the LLM is unavailable
+    timings: Optional[Dict[str, float]] = None
 
 
 class ChatHistoryItem(BaseModel):
@@ -35,10 +54,47 @@ class ChatHistoryItem(BaseModel):
     response_time: Optional[float] = None
     document_id: Optional[str] = None
     conversation_id: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
     citations: List[Citation] = []
 
 
 class ChatHistoryResponse(BaseModel):
     """Response model for chat history."""
     chats: List[ChatHistoryItem]
-    total: int 
\ No newline at end of file
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+    chunks: Optional[Dict[str, CitedChunk]] = None 
+
+
+class AnswerCacheStats(BaseModel):
+    """Counters of the semantic answer cache."""
+    entries: int
+    hits: int
+    shared_hits: int
+    misses: int
+    hit_ratio: float
+    invalidations: int
+
+
+class SingleFlightStats(BaseModel):
+    """Counters of identical in-flight chat queries collapsed into one pipeline run."""
+    in_flight: int
+    executions: int
+    coalesced: int
+
+
+class QueryEmbeddingCacheStats(BaseModel):
+    """Counters of the query embedding cache; sizes are None while its backend is unavailable."""
+    hits: int
+    misses: int
+    hit_ratio: float
+    entries: Optional[int] = None
+    bytes: Optional[int] = None
+    coalesced: int
+
+
+class CacheStatsResponse(BaseModel):
+    """Response model for the cache statistics endpoint."""
+    answers: AnswerCacheStats
+    single_flight: SingleFlightStats
+    query_embeddings: QueryEmbeddingCacheStats
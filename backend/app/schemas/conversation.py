@@ -1,8 +1,8 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
-from app.schemas.chat import ChatHistoryItem
+from app.schemas.chat import ChatHistoryItem, CitedChunk
 
 
 class ConversationCreate(BaseModel):
@@ -17,12 +17,14 @@ class ConversationSummary(BaseModel):
     created_at: datetime
     updated_at: datetime
     message_count: int
+    last_message_at: Optional[datetime] = None
 
 
 class ConversationListResponse(BaseModel):
     """Response model for listing conversations."""
     conversations: List[ConversationSummary]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class ConversationDetail(BaseModel):
@@ -32,3 +34,4 @@ class ConversationDetail(BaseModel):
     created_at: datetime
     updated_at: datetime
     chats: List[ChatHistoryItem]
+    chunks: Optional[Dict[str, CitedChunk]] = None
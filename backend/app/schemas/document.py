@@ -45,4 +45,5 @@ class DocumentChunksResponse(BaseModel):
     """Response model for document chunks."""
     document_id: str
     chunks: List[DocumentChunkInfo]
-    total: int 
\ No newline at end of file
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None 
\ No newline at end of file
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.providers import Provider
+from app.services.cache_backends import CacheBackend, make_cache_backend
+
+# Shared-backend key whose value changes whenever any worker invalidates answers
+GENERATION_KEY = "generation"
+
+
+class _CacheEntry:
+    """A cached answer together with what it depends on."""
+
+    __slots__ = ("id", "scope", "vector", "result", "embedding_ids", "filenames", "created_at")
+
+    def __init__(self, scope: str, vector: np.ndarray, result: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.scope = scope
+        self.vector = vector
+        self.result = result
+        chunks = result.get("relevant_chunks", [])
+        self.embedding_ids = {str(chunk["id"]) for chunk in chunks}
+        self.filenames = {
+            chunk["payload"].get("filename") for chunk in chunks
+            if chunk.get("payload") and chunk["payload"].get("filename")
+        }
+        self.created_at = time.monotonic()
+
+
+class SemanticAnswerCache:
+    """In-memory cache of RAG answers keyed on query embedding similarity.
+
+    A lookup returns the stored answer of the most similar earlier query in the same
+    scope if its cosine similarity reaches the threshold. Entries are dropped when
+    they expire, when the cache is full (least recently used first), or when a
+    document they cite is deleted or replaced.
+
+    With a `shared` backend, answers are also written there keyed on the exact
+    query embedding, so a repeated query is answered from the cache whichever
+    worker serves it (query embeddings come from the shared embedding cache, so
+    they are bit-identical across workers). Invalidations change a generation
+    value in the shared backend: entries written under older generations are
+    no longer looked up, and every worker drops its local entries when it sees
+    the change. Cross-worker invalidation is therefore coarse (any document
+    change clears all answers), which is acceptable because documents change
+    rarely compared with queries.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 1000,
+                 shared: Optional[CacheBackend] = None):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.shared = shared
+        self._generation: Optional[bytes] = None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        # Per-scope stacked vectors, rebuilt lazily after the scope changes
+        self._matrices: Dict[str, Any] = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _scope_matrix(self, scope: str):
+        cached = self._matrices.get(scope)
+        if cached is None:
+            entries = [e for e in self._entries.values() if e.scope == scope]
+            matrix = np.stack([e.vector for e in entries]) if entries else None
+            cached = (entries, matrix)
+            self._matrices[scope] = cached
+        return cached
+
+    def _remove(self, entry_ids: Iterable[str]) -> int:
+        removed = 0
+        for entry_id in list(entry_ids):
+            entry = self._entries.pop(entry_id, None)
+            if entry is not None:
+                self._matrices.pop(entry.scope, None)
+                removed += 1
+        return removed
+
+    def _expire(self):
+        if self.ttl_seconds <= 0:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        self._remove([e.id for e in self._entries.values() if e.created_at < cutoff])
+
+    def _sync_generation(self) -> bytes:
+        """Read the shared generation, dropping local entries if another worker invalidated."""
+        generation = self.shared.get(GENERATION_KEY) or b"0"  # type: ignore[union-attr]
+        with self._lock:
+            if generation != self._generation:
+                if self._generation is not None:
+                    self._entries.clear()
+                    self._matrices.clear()
+                self._generation = generation
+        return generation
+
+    @staticmethod
+    def _shared_key(generation: bytes, scope: str, vector: np.ndarray) -> str:
+        digest = hashlib.sha256(vector.tobytes()).hexdigest()
+        return f"{generation.decode()}:{scope}:{digest}"
+
+    def _bump_generation(self):
+        if self.shared is not None:
+            self.shared.set(GENERATION_KEY, uuid.uuid4().hex.encode())
+
+    def lookup(self, embedding: List[float], scope: str, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a similar query in `scope`, or None.
+
+        `threshold` overrides the configured similarity, e.g. to accept a looser
+        match when no fresh answer can be generated.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        vector = self._normalize(embedding)
+        generation = self._sync_generation() if self.shared is not None else None
+        with self._lock:
+            self._expire()
+            if vector is None:
+                self.misses += 1
+                return None
+
+            entries, matrix = self._scope_matrix(scope)
+            if matrix is not None and matrix.shape[1] == vector.shape[0]:
+                similarities = matrix @ vector
+                best = int(np.argmax(similarities))
+                if float(similarities[best]) >= threshold:
+                    entry = entries[best]
+                    self._entries.move_to_end(entry.id)
+                    self.hits += 1
+                    return entry.result
+
+        if generation is not None:
+            value = self.shared.get(self._shared_key(generation, scope, vector))  # type: ignore[union-attr]
+            if value is not None:
+                result = json.loads(value)
+                self._store_local(vector, scope, result)
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store_local(self, vector: np.ndarray, scope: str, result: Dict[str, Any]):
+        entry = _CacheEntry(scope, vector, result)
+        with self._lock:
+            self._entries[entry.id] = entry
+            self._matrices.pop(scope, None)
+            while len(self._entries) > self.max_entries:
+                self._remove([next(iter(self._entries))])
+
+    def store(self, embedding: List[float], scope: str, result: Dict[str, Any]):
+        """Cache a result for a query embedding in `scope`."""
+        vector = self._normalize(embedding)
+        if vector is None or self.max_entries <= 0:
+            return
+
+        self._store_local(vector, scope, result)
+        if self.shared is not None:
+            generation = self._sync_generation()
+            self.shared.set(self._shared_key(generation, scope, vector), json.dumps(result, default=str).encode())
+
+    def invalidate_embeddings(self, embedding_ids: Iterable[str]) -> int:
+        """Drop every entry citing any of the given vector IDs."""
+        ids = {str(i) for i in embedding_ids}
+        self._bump_generation()
+        with self._lock:
+            removed = self._remove([e.id for e in self._entries.values() if e.embedding_ids & ids])
+            self.invalidations += removed
+            return removed
+
+    def invalidate_filename(self, filename: str) -> int:
+        """Drop every entry citing a document uploaded under `filename`."""
+        self._bump_generation()
+        with self._lock:
+            removed = self._remove([e.id for e in self._entries.values() if filename in e.filenames])
+            self.invalidations += removed
+            return removed
+
+    def invalidate_upload(self) -> int:
+        """Drop every entry after a document upload.
+
+        Retrieval searches every document whatever the scope (the document ID
+        only keys the cache), so a new document may change any answer, including
+        answers that found nothing to cite.
+        """
+        self._bump_generation()
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._matrices.clear()
+            self.invalidations += removed
+            return removed
+
+    def clear(self):
+        """Drop all entries."""
+        self._bump_generation()
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+def _build_answer_cache() -> SemanticAnswerCache:
+    return SemanticAnswerCache(
+        threshold=settings.semantic_cache_threshold,
+        ttl_seconds=settings.semantic_cache_ttl_seconds,
+        max_entries=settings.semantic_cache_max_entries,
+        # Shared with the other workers unless every process keeps its own caches
+        shared=None if settings.cache_backend == "memory" else make_cache_backend(
+            "answers", max_entries=settings.semantic_cache_max_entries, ttl_seconds=settings.semantic_cache_ttl_seconds
+        )
+    )
+
+
+# Global answer cache, built on first use
+get_answer_cache = Provider(_build_answer_cache)
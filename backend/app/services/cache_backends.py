@@ -0,0 +1,291 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fraction of cache backend errors that are logged; a down cache fails every lookup
+ERROR_LOG_SAMPLE_RATE = 0.01
+
+# SQLite backends evict down to their size limit once per this many writes
+EVICT_EVERY_SETS = 100
+
+
+class CacheBackend(ABC):
+    """Storage interface for the query embedding cache.
+
+    Values are opaque bytes so that a backend can live outside the process
+    (e.g. shared between workers); keys are strings.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Return at least `entries` and `bytes` for the stored values, or {} if unavailable."""
+
+
+class InMemoryLRUBackend(CacheBackend):
+    """Bounded per-process LRU with a time-to-live."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+
+    def _drop(self, key: str):
+        _, value = self._data.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic(), value)
+            self._bytes += len(key) + len(value)
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._data)))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes}
+
+
+# Entry and byte totals are kept in `cache_stats` by triggers, so stats() (read
+# on every metrics scrape) need not scan the table; an existing file gets its
+# totals counted once when the table is added
+SQLITE_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at);
+CREATE TABLE IF NOT EXISTS cache_stats (id INTEGER PRIMARY KEY CHECK (id = 1), entries INTEGER NOT NULL, bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO cache_stats (id, entries, bytes)
+    SELECT 1, count(*), coalesce(sum(length(key) + length(value)), 0) FROM cache;
+CREATE TRIGGER IF NOT EXISTS cache_stats_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats SET entries = entries + 1, bytes = bytes + length(NEW.key) + length(NEW.value);
+END;
+CREATE TRIGGER IF NOT EXISTS cache_stats_update AFTER UPDATE ON cache BEGIN
+    UPDATE cache_stats SET bytes = bytes + length(NEW.value) - length(OLD.value);
+END;
+CREATE TRIGGER IF NOT EXISTS cache_stats_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats SET entries = entries - 1, bytes = bytes - length(OLD.key) - length(OLD.value);
+END;
+COMMIT;
+"""
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache in a SQLite file that every worker process on the host shares.
+
+    Each process and thread opens its own connection (WAL mode, so readers do
+    not block the writer), which also makes the backend safe to use after a
+    fork. Entries expire after `ttl_seconds`; beyond `max_entries` the oldest
+    writes are evicted first. Put the file on a tmpfs such as /dev/shm to keep
+    it in shared memory. Errors are treated as misses so a broken cache file
+    degrades to uncached serving.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._sets = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            try:
+                connection.executescript(SQLITE_SCHEMA)
+            except sqlite3.Error:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            row = self._connection().execute(
+                "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed: {e}", extra={"sample_rate": ERROR_LOG_SAMPLE_RATE})
+            return None
+        if row is None or self._expired(row[1]):
+            return None
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes):
+        if self.max_entries <= 0:
+            return
+        try:
+            connection = self._connection()
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete fires no trigger
+            connection.execute(
+                "INSERT INTO cache (key, value, stored_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at",
+                (key, value, time.time())
+            )
+            self._sets += 1
+            if self._sets % EVICT_EVERY_SETS == 0:
+                self._evict(connection)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed: {e}", extra={"sample_rate": ERROR_LOG_SAMPLE_RATE})
+
+    def _evict(self, connection: sqlite3.Connection):
+        if self.ttl_seconds > 0:
+            connection.execute("DELETE FROM cache WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+        connection.execute(
+            "DELETE FROM cache WHERE key IN "
+            "(SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM cache")
+        except sqlite3.Error as e:
+            logger.warning(f"Cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        try:
+            entries, size = self._connection().execute("SELECT entries, bytes FROM cache_stats").fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache stats failed: {e}", extra={"sample_rate": ERROR_LOG_SAMPLE_RATE})
+            return {}
+        return {"entries": entries, "bytes": size}
+
+
+class RedisBackend(CacheBackend):
+    """Cache in Redis, or any server speaking its protocol, shared across hosts.
+
+    `client` is a redis-py client (or anything with the same get/set/delete/
+    scan_iter/dbsize methods). Keys are namespaced with `prefix` and expire after
+    `ttl_seconds`; the size limit is the server's maxmemory policy. Errors are
+    treated as misses so an unreachable server degrades to uncached serving.
+    """
+
+    def __init__(self, client: Any, prefix: str, ttl_seconds: float = 3600):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str, ttl_seconds: float = 3600) -> "RedisBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)") from e
+        # redis-py's pool reconnects in forked children on its own
+        return cls(redis.Redis.from_url(url), prefix, ttl_seconds)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {e}", extra={"sample_rate": ERROR_LOG_SAMPLE_RATE})
+            return None
+
+    def set(self, key: str, value: bytes):
+        try:
+            if self.ttl_seconds > 0:
+                self.client.set(self.prefix + key, value, ex=max(1, math.ceil(self.ttl_seconds)))
+            else:
+                self.client.set(self.prefix + key, value)
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}", extra={"sample_rate": ERROR_LOG_SAMPLE_RATE})
+
+    def _keys(self):
+        return self.client.scan_iter(match=self.prefix + "*", count=1000)
+
+    def clear(self):
+        batch = []
+        try:
+            for key in self._keys():
+                batch.append(key)
+                if len(batch) >= 1000:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+        except Exception as e:
+            logger.warning(f"Cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        # Counting a namespace's keys takes a full SCAN, too slow for every
+        # scrape; DBSIZE is constant-time but counts every key in the database,
+        # so give each deployment its own database for exact figures
+        try:
+            return {"entries": self.client.dbsize(), "bytes": 0}
+        except Exception as e:
+            logger.warning(f"Cache stats failed: {e}", extra={"sample_rate": ERROR_LOG_SAMPLE_RATE})
+            return {}
+
+
+def make_cache_backend(namespace: str, max_entries: int, ttl_seconds: float) -> CacheBackend:
+    """Backend for one cache, as selected by CACHE_BACKEND.
+
+    `memory` keeps a private LRU per process; `disk` and `redis` are shared by
+    every worker, so multi-worker deployments fill and hit one cache.
+    """
+    if settings.cache_backend == "memory":
+        return InMemoryLRUBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if settings.cache_backend == "disk":
+        return SQLiteBackend(
+            os.path.join(settings.cache_dir, f"{namespace}.sqlite3"), max_entries=max_entries, ttl_seconds=ttl_seconds
+        )
+    if settings.cache_backend == "redis":
+        if not settings.redis_url:
+            raise ValueError("CACHE_BACKEND=redis needs REDIS_URL")
+        return RedisBackend.from_url(settings.redis_url, f"{settings.cache_key_prefix}{namespace}:", ttl_seconds)
+    raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
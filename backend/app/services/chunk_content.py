@@ -0,0 +1,75 @@
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.providers import Provider
+from app.db.database import SessionLocal
+from app.db.models import DocumentChunk
+from app.services.cache_backends import CacheBackend, InMemoryLRUBackend
+
+
+class ChunkContentStore:
+    """Fetch chunk text by embedding ID for search results with slim payloads.
+
+    Chunk content never changes for a given embedding ID, so lookups go through a
+    bounded local cache first and then a single batched query for the rest.
+    The query runs in a short-lived session on the calling (RAG worker) thread,
+    which relies on the engine's pool giving it a connection of its own.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], cache: CacheBackend):
+        self.session_factory = session_factory
+        self.cache = cache
+
+    def get_contents(self, embedding_ids: List[str]) -> Dict[str, str]:
+        """Return content keyed by embedding ID; unknown IDs are left out."""
+        contents: Dict[str, str] = {}
+        missing = []
+        for embedding_id in embedding_ids:
+            cached = self.cache.get(embedding_id)
+            if cached is not None:
+                contents[embedding_id] = cached.decode("utf-8")
+            else:
+                missing.append(embedding_id)
+
+        if missing:
+            db = self.session_factory()
+            try:
+                rows = (
+                    db.query(DocumentChunk.embedding_id, DocumentChunk.content)
+                    .filter(DocumentChunk.embedding_id.in_(missing))
+                    .all()
+                )
+            finally:
+                db.close()
+            for embedding_id, content in rows:
+                contents[embedding_id] = content
+                self.cache.set(embedding_id, content.encode("utf-8"))
+
+        return contents
+
+    def hydrate(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill in `payload["content"]` for search results that lack it, in place."""
+        ids = [
+            str(result["id"]) for result in results
+            if "content" not in (result.get("payload") or {})
+        ]
+        if not ids:
+            return results
+
+        contents = self.get_contents(ids)
+        for result in results:
+            payload = result.get("payload")
+            if payload is None:
+                payload = result["payload"] = {}
+            if "content" not in payload:
+                payload["content"] = contents.get(str(result["id"]), "")
+        return results
+
+
+# Global chunk content store, built on first use
+get_chunk_content_store = Provider(lambda: ChunkContentStore(
+    SessionLocal,
+    InMemoryLRUBackend(max_entries=settings.chunk_content_cache_size, ttl_seconds=0)
+))
@@ -0,0 +1,200 @@
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    PointStruct, CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation
+)
+
+from app.services.vector_store import collection_config, fit_vector, physical_collection_name
+
+# Catch-up passes after the bulk copy; each one should find fewer writes to carry over
+MAX_CATCH_UP_PASSES = 5
+
+
+class CollectionMigrator:
+    """Rebuild the collection behind an alias with a new vector size, then switch over.
+
+    Points are copied into a fresh collection while the old one keeps serving.
+    Vectors are either truncated and renormalized (`truncate`, no API calls, valid
+    for text-embedding-3 models) or recomputed from the payload content
+    (`reembed`). Catch-up passes then compare both collections page by page,
+    re-copying points added or changed in place during the bulk copy and
+    dropping points deleted meanwhile, until a pass finds nothing to fix; the
+    alias is then repointed in a single aliases update, so readers never see a
+    missing collection.
+
+    Writes that reach the old collection between the last catch-up pass and
+    the alias switch (usually well under a second) are not carried over; run
+    migrations while uploads and deletions are paused, or repair afterwards
+    with `scripts.reconcile_vectors`.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        alias: str,
+        embed: Optional[Callable[[List[str], int], List[List[float]]]] = None,
+        contents: Optional[Callable[[List[str]], Dict[str, str]]] = None,
+        log: Callable[[str], None] = print
+    ):
+        self.client = client
+        self.alias = alias
+        self.embed = embed
+        self.contents = contents
+        self.log = log
+
+    def resolve_alias(self) -> Optional[str]:
+        """Return the collection the alias points to, if the alias exists."""
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.alias:
+                return alias.collection_name
+        return None
+
+    def _scroll(self, collection: str, batch_size: int, with_vectors: bool) -> Iterator[List]:
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=with_vectors
+            )
+            if points:
+                yield points
+            if offset is None:
+                break
+
+    def _convert(self, points: List, dimensions: int, mode: str) -> List[PointStruct]:
+        if mode == "reembed":
+            if self.embed is None:
+                raise ValueError("reembed mode needs an embedding function")
+            texts = [(point.payload or {}).get("content") for point in points]
+            missing = [str(point.id) for point, text in zip(points, texts) if text is None]
+            if missing:
+                if self.contents is None:
+                    raise ValueError("Points without payload content need a content lookup to re-embed")
+                found = self.contents(missing)
+                texts = [
+                    found.get(str(point.id), "") if text is None else text
+                    for point, text in zip(points, texts)
+                ]
+            vectors = self.embed(texts, dimensions)
+        else:
+            vectors = [fit_vector(list(point.vector), dimensions) for point in points]
+
+        return [
+            PointStruct(id=point.id, vector=vector, payload=point.payload)
+            for point, vector in zip(points, vectors)
+        ]
+
+    def _copy(self, source: str, target: str, dimensions: int, mode: str, batch_size: int) -> int:
+        copied = 0
+        started = time.monotonic()
+        for points in self._scroll(source, batch_size, with_vectors=(mode != "reembed")):
+            self.client.upsert(collection_name=target, points=self._convert(points, dimensions, mode))
+            copied += len(points)
+            rate = copied / max(time.monotonic() - started, 1e-9)
+            self.log(f"Copied {copied} points into {target} ({rate:.0f} points/s)")
+        return copied
+
+    @staticmethod
+    def _outdated(point, copy, dimensions: int, mode: str) -> bool:
+        """Whether `copy` (None if missing) no longer matches the source `point`."""
+        if copy is None or (point.payload or {}) != (copy.payload or {}):
+            return True
+        # Re-embedded vectors follow the content, which never changes for a point ID
+        if mode == "reembed":
+            return False
+        expected = fit_vector(list(point.vector), dimensions)
+        return len(expected) != len(copy.vector) or not np.allclose(expected, copy.vector, atol=1e-5)
+
+    def _catch_up(self, source: str, target: str, dimensions: int, mode: str, batch_size: int) -> int:
+        """Carry writes made to `source` since the copy over to `target`; returns the points fixed.
+
+        Works a page at a time, so no full set of IDs is held in memory.
+        """
+        with_vectors = mode != "reembed"
+        fixed = 0
+        for points in self._scroll(source, batch_size, with_vectors=with_vectors):
+            copies = {
+                str(copy.id): copy for copy in self.client.retrieve(
+                    collection_name=target, ids=[p.id for p in points], with_payload=True, with_vectors=with_vectors
+                )
+            }
+            outdated = [p for p in points if self._outdated(p, copies.get(str(p.id)), dimensions, mode)]
+            if outdated:
+                self.client.upsert(collection_name=target, points=self._convert(outdated, dimensions, mode))
+                fixed += len(outdated)
+
+        for points in self._scroll(target, batch_size, with_vectors=False):
+            kept = {
+                str(p.id) for p in self.client.retrieve(
+                    collection_name=source, ids=[p.id for p in points], with_payload=False, with_vectors=False
+                )
+            }
+            deleted = [p.id for p in points if str(p.id) not in kept]
+            if deleted:
+                self.client.delete(collection_name=target, points_selector=deleted)  # type: ignore
+                fixed += len(deleted)
+        return fixed
+
+    def migrate(self, dimensions: int, mode: str = "truncate", batch_size: int = 256,
+                drop_legacy: bool = False) -> str:
+        """Build a `dimensions`-sized copy of the current collection and switch the alias to it.
+
+        Returns the name of the new collection. The previous collection is left in
+        place for rollback unless it was a pre-alias collection named like the
+        alias, which has to be dropped (with `drop_legacy`) to free the name.
+        """
+        if mode not in ("truncate", "reembed"):
+            raise ValueError(f"Unknown migration mode: {mode}")
+
+        source = self.resolve_alias()
+        legacy = source is None
+        if legacy:
+            names = [c.name for c in self.client.get_collections().collections]
+            if self.alias not in names:
+                raise ValueError(f"Neither an alias nor a collection named {self.alias} exists")
+            if not drop_legacy:
+                raise ValueError(
+                    f"{self.alias} is a plain collection; pass drop_legacy to replace it with an alias"
+                )
+            source = self.alias
+
+        source_info = self.client.get_collection(source)
+        distance = source_info.config.params.vectors.distance  # type: ignore
+        target = physical_collection_name(self.alias, dimensions, time.strftime("%Y%m%d%H%M%S"))
+
+        self.client.create_collection(collection_name=target, **collection_config(dimensions, distance))
+        self.log(f"Created collection {target} ({mode}, {dimensions} dimensions) from {source}")
+
+        self._copy(source, target, dimensions, mode, batch_size)
+
+        # Catch up with writes that landed on the source during the bulk copy
+        for _ in range(MAX_CATCH_UP_PASSES):
+            fixed = self._catch_up(source, target, dimensions, mode, batch_size)
+            self.log(f"Caught up with {fixed} points written during the copy")
+            if not fixed:
+                break
+
+        if legacy:
+            # The alias name is taken by the old collection itself, so this switch
+            # has a brief window where the name does not resolve
+            self.client.delete_collection(source)
+        self.switch_alias(target)
+
+        return target
+
+    def switch_alias(self, target: str):
+        """Point the alias at `target` in a single aliases update."""
+        operations = []
+        if self.resolve_alias() is not None:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.alias)))
+        operations.append(
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=self.alias))
+        )
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        self.log(f"Switched alias {self.alias} -> {target}")
@@ -0,0 +1,87 @@
+import threading
+from array import array
+from typing import Callable, Dict, List
+
+from app.core.config import settings
+from app.core.providers import Provider
+from app.core.text import normalize_query
+from app.services.cache_backends import CacheBackend, InMemoryLRUBackend, make_cache_backend
+from app.services.single_flight import SingleFlight
+
+
+class QueryEmbeddingCache:
+    """Cache of query embeddings keyed by model and normalized query text.
+
+    Only user queries go through this cache; document embeddings are always
+    computed fresh during ingestion. Concurrent misses for the same key share a
+    single upstream call.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.inflight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return f"{model}\x1f{normalize_query(text)}"
+
+    @staticmethod
+    def _pack(embedding: List[float]) -> bytes:
+        return array("f", embedding).tobytes()
+
+    @staticmethod
+    def _unpack(value: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(value)
+        return vector.tolist()
+
+    def get_or_compute(self, model: str, text: str, compute: Callable[[str], List[float]]) -> List[float]:
+        """Return the cached embedding for `text`, computing it on a miss."""
+        key = self.make_key(model, text)
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return self._unpack(value)
+
+        with self._lock:
+            self.misses += 1
+
+        def load() -> List[float]:
+            embedding = compute(text)
+            self.backend.set(key, self._pack(embedding))
+            return embedding
+
+        embedding, _ = self.inflight.do(key, load)
+        return list(embedding)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and backend size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+        return {**counters, **self.backend.stats(), "coalesced": self.inflight.stats()["coalesced"]}
+
+
+def _build_query_embedding_cache() -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(
+        make_cache_backend(
+            "query_embeddings",
+            max_entries=settings.query_embedding_cache_size,
+            ttl_seconds=settings.query_embedding_cache_ttl_seconds
+        )
+    )
+
+
+# Global query embedding cache, built on first use
+get_query_embedding_cache = Provider(_build_query_embedding_cache)
@@ -1,50 +1,133 @@
-from openai import OpenAI
-from typing import List
+import logging
+from typing import TYPE_CHECKING, List, Optional
 from app.core.config import settings
+from app.services.embedding_cache import get_query_embedding_cache
+from app.core.admission import current_priority
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.hedging import Hedger
+from app.core.metrics import OPENAI_TOKENS
+from app.core.providers import Provider
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+# Fraction of embedding calls that log their cost estimate at DEBUG level
+COST_LOG_SAMPLE_RATE = 0.01
 
 
 class EmbeddingService:
-    """Service for generating text embeddings using OpenAI."""
+    """Service for generating text embeddings using OpenAI.
+
+    Calls go through a circuit breaker, so while OpenAI is failing they fail
+    fast with CircuitOpen instead of each waiting out its timeouts. Each
+    admission class has its own circuit, so failing ingestion batches do not
+    cut chat queries off. Query embeddings, on the interactive path, are hedged.
+    """
 
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
-        self.model = "text-embedding-3-small"
+        self._client = Provider(self._build_client)
+        self.model = settings.embedding_model
+        self.dimensions = settings.embedding_dimensions
+        self.breakers = {
+            name: CircuitBreaker(
+                f"openai_embeddings_{name}", settings.circuit_breaker_failures, settings.circuit_breaker_reset_seconds
+            )
+            for name in ("chat", "ingest", "background")
+        }
+        self.hedger = Hedger(
+            "query_embedding",
+            quantile=settings.hedge_quantile,
+            min_delay=settings.hedge_min_delay_ms / 1000,
+            max_workers=settings.hedge_max_workers
+        )
+        if settings.disable_embeddings:
+            logger.warning("Embeddings are disabled; zero vectors will be returned")
+
+    @staticmethod
+    def _build_client() -> "OpenAI":
+        from openai import OpenAI
+        from app.core.openai_scheduler import scheduled_http_client
+
+        return OpenAI(
+            api_key=settings.require("openai_api_key"),
+            base_url=settings.openai_base_url,
+            timeout=settings.openai_timeout_seconds,
+            max_retries=settings.openai_max_retries,
+            http_client=scheduled_http_client()
+        )
+
+    @property
+    def client(self) -> "OpenAI":
+        return self._client()
 
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """The circuit of the current admission class; work outside one (scripts, warm-up) is background."""
+        return self.breakers.get(current_priority.get() or "background", self.breakers["background"])
 
     def estimate_embedding_cost(self, texts: List[str]) -> float:
         """Rough cost estimation for embeddings based on token count."""
         token_count = sum(len(text.split()) for text in texts)  # Simple approximation
         cost = token_count / 1000 * 0.0001
-        print(f"[INFO] Estimated embedding cost: ${cost:.6f}")
         return cost
 
-    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts."""
-        print(f"[DEBUG] get_embeddings called. DISABLE_EMBEDDINGS = {settings.disable_embeddings}")
+    def _supports_dimensions(self) -> bool:
+        """Only the text-embedding-3 family accepts a `dimensions` parameter."""
+        return self.model.startswith("text-embedding-3")
+
+    def get_embeddings(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        """Generate embeddings for a list of texts.
+
+        `dimensions` overrides the configured size, e.g. while migrating collections.
+        """
+        dimensions = dimensions or self.dimensions
         if settings.disable_embeddings:
-            print("[WARN] Embeddings are disabled. Returning empty vectors.")
-            return [[0.0] * 1536 for _ in texts]  
+            return [[0.0] * dimensions for _ in texts]
 
-        self.estimate_embedding_cost(texts)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Embedding request",
+                extra={
+                    "texts": len(texts),
+                    "estimated_cost": self.estimate_embedding_cost(texts),
+                    "sample_rate": COST_LOG_SAMPLE_RATE,
+                }
+            )
 
         try:
-            print("[DEBUG] Calling OpenAI API for embeddings...")
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=texts
-            )
+            params = {"model": self.model, "input": texts}
+            if self._supports_dimensions():
+                params["dimensions"] = dimensions
+            response = self.breaker.call(self.client.embeddings.create, **params)
+            if response.usage is not None:
+                OPENAI_TOKENS.labels(self.model, "embedding").inc(response.usage.prompt_tokens)
             embeddings = [embedding.embedding for embedding in response.data]
             return embeddings
         except Exception as e:
-            print(f"[ERROR] Error generating embeddings: {e}")
+            logger.error(f"Error generating embeddings: {e}")
             raise
 
     def get_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        print(f"[DEBUG] get_embedding called. DISABLE_EMBEDDINGS = {settings.disable_embeddings}")
         embeddings = self.get_embeddings([text])
         return embeddings[0]
 
+    def _get_hedged_embedding(self, text: str) -> List[float]:
+        return self.hedger.call(lambda: self.get_embedding(text))
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        """Generate embedding for a user query, served from the query embedding cache.
+
+        Cache misses are hedged: a second request is sent when the first is
+        slower than HEDGE_QUANTILE of recent ones, and the first answer wins.
+        """
+        if settings.disable_embeddings:
+            return self.get_embedding(query)
+        compute = self._get_hedged_embedding if settings.hedge_query_embeddings else self.get_embedding
+        return get_query_embedding_cache().get_or_compute(f"{self.model}@{self.dimensions}", query, compute)
+
 
 # Global embedding service instance
 embedding_service = EmbeddingService()
@@ -0,0 +1,77 @@
+import time
+from typing import Any, Callable, Dict, List
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import DeletePayload, DeletePayloadOperation, SetPayload, SetPayloadOperation
+from sqlalchemy.orm import Session
+
+from app.db.models import DocumentChunk
+
+
+def rewrite_payloads(
+    client: QdrantClient,
+    collection: str,
+    db: Session,
+    mode: str = "slim",
+    batch_size: int = 500,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """Convert existing points between the full and slim payload layouts in place.
+
+    `slim` drops the `content` key and stamps `document_id` from the chunk rows;
+    `full` writes the content back. Vectors are untouched, so no re-embedding or
+    reindexing is needed, and each scroll page is rewritten in one batch update.
+    Points without a chunk row are counted and left alone.
+    """
+    if mode not in ("slim", "full"):
+        raise ValueError(f"Unknown payload mode: {mode}")
+
+    stats = {"updated": 0, "unknown": 0}
+    started = time.monotonic()
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        ids = [str(point.id) for point in points]
+        rows = {
+            embedding_id: (document_id, content) for embedding_id, document_id, content in
+            db.query(DocumentChunk.embedding_id, DocumentChunk.document_id, DocumentChunk.content)
+            .filter(DocumentChunk.embedding_id.in_(ids)).all()
+        } if ids else {}
+
+        operations: List[Any] = []
+        for point_id in ids:
+            row = rows.get(point_id)
+            if row is None:
+                stats["unknown"] += 1
+                continue
+            document_id, content = row
+            payload: Dict[str, Any] = {"document_id": str(document_id)}
+            if mode == "full":
+                payload["content"] = content
+            operations.append(SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[point_id])))
+
+        if mode == "slim":
+            known = [point_id for point_id in ids if point_id in rows]
+            if known:
+                operations.append(DeletePayloadOperation(delete_payload=DeletePayload(keys=["content"], points=known)))
+
+        if operations:
+            client.batch_update_points(collection_name=collection, update_operations=operations)
+            stats["updated"] += len(rows)
+            rate = stats["updated"] / max(time.monotonic() - started, 1e-9)
+            log(f"Rewrote {stats['updated']} payloads ({rate:.0f} points/s)")
+        if offset is None:
+            break
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    log(
+        f"Rewrote {stats['updated']} payloads in {collection} to {mode} in {stats['seconds']:.1f}s; "
+        f"{stats['unknown']} points without a chunk left unchanged"
+    )
+    return stats
@@ -1,8 +1,10 @@
-import fitz  # PyMuPDF
+import logging
 import os
 from typing import List, Tuple
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class PDFProcessor:
     """Service for processing PDF documents."""
@@ -13,6 +15,8 @@ class PDFProcessor:
     
     def extract_text_from_pdf(self, file_path: str) -> Tuple[List[str], int]:
         """Extract text from PDF and return chunks with page numbers."""
+        import fitz  # PyMuPDF, imported on first use to keep app start-up fast
+
         try:
             doc = fitz.open(file_path)
             chunks = []
@@ -31,7 +35,7 @@ class PDFProcessor:
             return chunks, total_pages
             
         except Exception as e:
-            print(f"Error processing PDF {file_path}: {e}")
+            logger.error(f"Error processing PDF {file_path}: {e}")
             raise
     
     def _split_text_into_chunks(self, text: str, page_number: int) -> List[str]:
@@ -63,6 +67,8 @@ class PDFProcessor:
     
     def get_pdf_info(self, file_path: str) -> dict:
         """Get basic information about a PDF file."""
+        import fitz  # PyMuPDF, imported on first use to keep app start-up fast
+
         try:
             doc = fitz.open(file_path)
             info = {
@@ -76,7 +82,7 @@ class PDFProcessor:
             return info
             
         except Exception as e:
-            print(f"Error getting PDF info for {file_path}: {e}")
+            logger.error(f"Error getting PDF info for {file_path}: {e}")
             raise
 
 
@@ -0,0 +1,196 @@
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from sqlalchemy.orm import Session
+
+from app.db.models import Document, DocumentChunk
+from app.ingest.document_processor import chunk_payload
+from app.services.vector_store import fit_vector
+
+
+class VectorReconciler:
+    """Find and repair drift between Qdrant points and `document_chunks` rows.
+
+    Both sides are streamed in ID order (Qdrant scroll pages and a server-side
+    cursor over `DocumentChunk.embedding_id`) and merge-joined, so memory stays
+    bounded by the batch size however large the collection is.
+
+    - Orphaned points (no chunk row) are left behind when ingestion fails between
+      the Qdrant upsert and the database commit. They are deleted only after
+      `grace_seconds` and a final database re-check, so documents that are being
+      ingested while the reconciler runs are not touched.
+    - Dangling chunks (no point) are left behind by failed deletes or lost
+      volumes. They can be re-embedded from their stored content.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection: str,
+        db: Session,
+        batch_size: int = 1000,
+        grace_seconds: float = 60.0,
+        embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        log: Callable[[str], None] = print
+    ):
+        self.client = client
+        self.collection = collection
+        self.db = db
+        self.batch_size = batch_size
+        self.grace_seconds = grace_seconds
+        self.embed = embed
+        self.log = log
+
+    def _point_ids(self) -> Iterator[str]:
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+            for point in points:
+                yield str(point.id)
+            if offset is None:
+                break
+
+    def _chunk_ids(self) -> Iterator[str]:
+        column = DocumentChunk.embedding_id
+        # Compare bytewise so the order matches Qdrant's UUID order
+        if self.db.get_bind().dialect.name == "postgresql":
+            column = column.collate("C")
+        query = (
+            self.db.query(DocumentChunk.embedding_id)
+            .order_by(column)
+            .execution_options(stream_results=True)
+            .yield_per(self.batch_size)
+        )
+        for (embedding_id,) in query:
+            yield str(embedding_id)
+
+    @staticmethod
+    def _ordered(ids: Iterator[str], source: str) -> Iterator[str]:
+        """Pass IDs through, failing loudly if the stream is not sorted."""
+        previous = None
+        for value in ids:
+            if previous is not None and value < previous:
+                raise RuntimeError(f"{source} IDs are not in ascending order ({previous} > {value})")
+            if value != previous:
+                yield value
+            previous = value
+
+    def diff(self) -> Iterator[Tuple[str, str]]:
+        """Yield ("orphan", point_id) and ("dangling", embedding_id) differences."""
+        points = self._ordered(self._point_ids(), "Qdrant")
+        chunks = self._ordered(self._chunk_ids(), "Database")
+        point = next(points, None)
+        chunk = next(chunks, None)
+        while point is not None or chunk is not None:
+            if chunk is None or (point is not None and point < chunk):
+                yield "orphan", point  # type: ignore[misc]
+                point = next(points, None)
+            elif point is None or chunk < point:
+                yield "dangling", chunk
+                chunk = next(chunks, None)
+            else:
+                point = next(points, None)
+                chunk = next(chunks, None)
+
+    def _still_orphaned(self, ids: List[str]) -> List[str]:
+        known = {
+            row[0] for row in
+            self.db.query(DocumentChunk.embedding_id).filter(DocumentChunk.embedding_id.in_(ids)).all()
+        }
+        return [i for i in ids if i not in known]
+
+    def _delete_orphans(self, ids: List[str]) -> int:
+        orphans = self._still_orphaned(ids)
+        if orphans:
+            self.client.delete(collection_name=self.collection, points_selector=orphans)  # type: ignore
+        return len(orphans)
+
+    def _restore_points(self, embedding_ids: List[str]) -> int:
+        rows = (
+            self.db.query(DocumentChunk, Document.original_filename)
+            .join(Document, Document.id == DocumentChunk.document_id)
+            .filter(DocumentChunk.embedding_id.in_(embedding_ids))
+            .all()
+        )
+        if not rows:
+            return 0
+        vectors = self.embed([str(chunk.content) for chunk, _ in rows])  # type: ignore[misc]
+        size = self.client.get_collection(self.collection).config.params.vectors.size  # type: ignore
+        self.client.upsert(
+            collection_name=self.collection,
+            points=[
+                PointStruct(
+                    id=str(chunk.embedding_id),
+                    vector=fit_vector(vector, size),
+                    payload=chunk_payload(
+                        str(chunk.content), int(chunk.chunk_index), int(chunk.page_number),
+                        str(filename), str(chunk.document_id)
+                    )
+                )
+                for (chunk, filename), vector in zip(rows, vectors)
+            ]
+        )
+        return len(rows)
+
+    def run(self, delete_orphans: bool = False, reembed_dangling: bool = False) -> Dict[str, Any]:
+        """Diff both stores and optionally repair them; returns counts of what was found and fixed."""
+        if reembed_dangling and self.embed is None:
+            raise ValueError("reembed_dangling needs an embedding function")
+
+        stats = {"orphans": 0, "dangling": 0, "deleted": 0, "restored": 0}
+        started = time.monotonic()
+        orphan_batch: List[str] = []
+        dangling_batch: List[str] = []
+        # Orphan batches wait here until they are older than the grace period
+        waiting: Deque[Tuple[float, List[str]]] = deque()
+
+        def flush_waiting(force: bool = False):
+            while waiting:
+                seen_at, ids = waiting[0]
+                remaining = self.grace_seconds - (time.monotonic() - seen_at)
+                if remaining > 0:
+                    if not force:
+                        return
+                    time.sleep(remaining)
+                waiting.popleft()
+                stats["deleted"] += self._delete_orphans(ids)
+
+        for kind, value in self.diff():
+            if kind == "orphan":
+                stats["orphans"] += 1
+                if delete_orphans:
+                    orphan_batch.append(value)
+                    if len(orphan_batch) >= self.batch_size:
+                        waiting.append((time.monotonic(), orphan_batch))
+                        orphan_batch = []
+                    flush_waiting()
+            else:
+                stats["dangling"] += 1
+                if reembed_dangling:
+                    dangling_batch.append(value)
+                    if len(dangling_batch) >= self.batch_size:
+                        stats["restored"] += self._restore_points(dangling_batch)
+                        dangling_batch = []
+
+        if orphan_batch:
+            waiting.append((time.monotonic(), orphan_batch))
+        flush_waiting(force=True)
+        if dangling_batch:
+            stats["restored"] += self._restore_points(dangling_batch)
+
+        stats["seconds"] = round(time.monotonic() - started, 3)
+        self.log(
+            f"Reconciled {self.collection}: {stats['orphans']} orphaned points "
+            f"({stats['deleted']} deleted), {stats['dangling']} chunks without a point "
+            f"({stats['restored']} re-embedded) in {stats['seconds']:.1f}s"
+        )
+        return stats
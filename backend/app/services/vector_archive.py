@@ -0,0 +1,214 @@
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, OptimizersConfigDiff, PointStruct
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import DocumentChunk
+from app.services.reconciler import VectorReconciler
+from app.services.vector_store import collection_config
+
+
+# Archive layout: a directory holding
+#   manifest.json  - collection name, vector size, distance, indexing threshold, point count
+#   vectors.npy    - float32 array of shape (count, size), row i belongs to line i below
+#   points.jsonl   - one {"id": ..., "payload": {...}} object per line
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+POINTS_FILE = "points.jsonl"
+ARCHIVE_VERSION = 1
+
+def export_collection(
+    client: QdrantClient,
+    collection: str,
+    path: str,
+    batch_size: int = 1000,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """Stream every point of `collection` into an archive directory at `path`.
+
+    Memory use is bounded by one scroll batch: vectors are appended to a raw
+    float32 file that is given its .npy header once the final count is known.
+    """
+    os.makedirs(path, exist_ok=True)
+    info = client.get_collection(collection)
+    vectors_config = info.config.params.vectors
+    size = vectors_config.size  # type: ignore
+    distance = vectors_config.distance  # type: ignore
+
+    raw_path = os.path.join(path, VECTORS_FILE + ".raw")
+    count = 0
+    started = time.monotonic()
+    offset = None
+    with open(raw_path, "wb") as raw, open(os.path.join(path, POINTS_FILE), "w") as points_file:
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            if points:
+                raw.write(np.asarray([p.vector for p in points], dtype=np.float32).tobytes())
+                for point in points:
+                    points_file.write(json.dumps({"id": str(point.id), "payload": point.payload}) + "\n")
+                count += len(points)
+                rate = count / max(time.monotonic() - started, 1e-9)
+                log(f"Exported {count} points ({rate:.0f} points/s)")
+            if offset is None:
+                break
+
+    # Prepend the .npy header now that the shape is known
+    with open(os.path.join(path, VECTORS_FILE), "wb") as out, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_1_0(
+            out, {"descr": "<f4", "fortran_order": False, "shape": (count, size)}
+        )
+        shutil.copyfileobj(raw, out, length=16 * 1024 * 1024)
+    os.remove(raw_path)
+
+    elapsed = time.monotonic() - started
+    manifest = {
+        "version": ARCHIVE_VERSION,
+        "collection": collection,
+        "vector_size": size,
+        "distance": str(getattr(distance, "value", distance)),
+        "indexing_threshold": getattr(info.config.optimizer_config, "indexing_threshold", None),
+        "count": count,
+        "exported_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "seconds": round(elapsed, 3),
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    log(f"Exported {count} points from {collection} in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} points/s)")
+    return manifest
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version: {manifest.get('version')}")
+    return manifest
+
+
+def iter_archive(path: str, batch_size: int) -> Iterator[Tuple[List[str], List[Dict[str, Any]], np.ndarray]]:
+    """Yield (ids, payloads, vectors) batches from an archive without loading it whole."""
+    vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+    ids: List[str] = []
+    payloads: List[Dict[str, Any]] = []
+    start = 0
+    with open(os.path.join(path, POINTS_FILE)) as points_file:
+        for line in points_file:
+            record = json.loads(line)
+            ids.append(record["id"])
+            payloads.append(record["payload"] or {})
+            if len(ids) == batch_size:
+                yield ids, payloads, np.asarray(vectors[start:start + len(ids)])
+                start += len(ids)
+                ids, payloads = [], []
+    if ids:
+        yield ids, payloads, np.asarray(vectors[start:start + len(ids)])
+
+
+def _known_embedding_ids(db: Session, ids: List[str]) -> Set[str]:
+    rows = db.query(DocumentChunk.embedding_id).filter(DocumentChunk.embedding_id.in_(ids)).all()
+    return {row[0] for row in rows}
+
+
+def import_collection(
+    client: QdrantClient,
+    path: str,
+    collection: str,
+    db: Optional[Session] = None,
+    skip_orphans: bool = False,
+    batch_size: int = 1000,
+    workers: int = 4,
+    log: Callable[[str], None] = print
+) -> Dict[str, Any]:
+    """Bulk-load an archive into a new collection.
+
+    Batches are upserted from a thread pool with indexing disabled; once loading
+    finishes, the source collection's indexing threshold from the manifest (or
+    QDRANT_INDEXING_THRESHOLD) is restored. With a database session, each batch
+    is checked against `DocumentChunk.embedding_id`: points without a chunk are
+    counted (and dropped with `skip_orphans`). Chunks whose point is missing are
+    counted afterwards by merge-joining the new collection with the table (see
+    VectorReconciler), so memory stays bounded by the batch size. Qdrant's local
+    mode is not thread-safe, so use `workers=1` against it.
+    """
+    manifest = read_manifest(path)
+    if client.collection_exists(collection):
+        raise ValueError(f"Collection {collection} already exists; import needs a fresh collection")
+
+    config = collection_config(manifest["vector_size"], Distance(manifest["distance"]))
+    client.create_collection(
+        collection_name=collection,
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
+        **config
+    )
+    log(f"Created collection {collection}; loading {manifest['count']} points")
+
+    stats = {"imported": 0, "orphans": 0, "skipped": 0, "missing": 0}
+    started = time.monotonic()
+
+    def upsert(points: List[PointStruct]) -> int:
+        client.upsert(collection_name=collection, points=points, wait=True)
+        return len(points)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for ids, payloads, vectors in iter_archive(path, batch_size):
+            keep = list(range(len(ids)))
+            if db is not None:
+                known = _known_embedding_ids(db, ids)
+                orphans = [i for i in keep if ids[i] not in known]
+                stats["orphans"] += len(orphans)
+                if skip_orphans and orphans:
+                    orphan_set = set(orphans)
+                    keep = [i for i in keep if i not in orphan_set]
+                    stats["skipped"] += len(orphans)
+
+            points = [PointStruct(id=ids[i], vector=vectors[i].tolist(), payload=payloads[i]) for i in keep]
+            if points:
+                pending.append(pool.submit(upsert, points))
+
+            # Keep a bounded number of batches in flight
+            while len(pending) >= workers * 2:
+                stats["imported"] += pending.pop(0).result()
+                rate = stats["imported"] / max(time.monotonic() - started, 1e-9)
+                log(f"Imported {stats['imported']} points ({rate:.0f} points/s)")
+
+        for future in pending:
+            stats["imported"] += future.result()
+
+    # Re-enable indexing now that the bulk load is done
+    indexing_threshold = manifest.get("indexing_threshold")
+    if indexing_threshold is None:
+        indexing_threshold = settings.qdrant_indexing_threshold
+    client.update_collection(
+        collection_name=collection,
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+    )
+
+    if db is not None:
+        reconciler = VectorReconciler(client, collection, db, batch_size=batch_size, log=log)
+        stats["missing"] = sum(1 for kind, _ in reconciler.diff() if kind == "dangling")
+
+    elapsed = time.monotonic() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["points_per_second"] = round(stats["imported"] / max(elapsed, 1e-9), 1)
+    log(
+        f"Imported {stats['imported']} points into {collection} in {elapsed:.1f}s "
+        f"({stats['points_per_second']:.0f} points/s); {stats['orphans']} without a chunk "
+        f"({stats['skipped']} skipped), {stats['missing']} chunks missing a point"
+    )
+    return stats
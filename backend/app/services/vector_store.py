@@ -1,74 +1,310 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+import logging
+import math
+import time
 import uuid
 from app.core.config import settings
+from app.core.providers import Provider
+
+# qdrant_client takes about a second to import, so it is only imported where
+# it is used; the app imports this module at start-up
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, SearchParams
+
+logger = logging.getLogger(__name__)
+
+
+# How long the vector size of the collection behind the alias is trusted before re-reading it
+VECTOR_SIZE_REFRESH_SECONDS = 30.0
+
+
+def fit_vector(vector: List[float], size: int) -> List[float]:
+    """Shorten an embedding to `size` dimensions and renormalize it.
+
+    text-embedding-3 embeddings keep their meaning when truncated, which is what
+    the API's `dimensions` parameter does server-side. Shorter vectors are
+    returned unchanged.
+    """
+    if len(vector) <= size:
+        return vector
+    head = vector[:size]
+    norm = math.sqrt(sum(x * x for x in head))
+    if norm == 0.0:
+        return head
+    return [x / norm for x in head]
+
+
+def client_options() -> Dict[str, Any]:
+    """QdrantClient keyword arguments for the configured transport and connection limits."""
+    if settings.qdrant_api_url == ":memory:":
+        # In-process local mode, for benchmarks and offline runs
+        return {"location": ":memory:"}
+    options: Dict[str, Any] = {
+        "url": settings.qdrant_api_url,
+        "api_key": settings.qdrant_api_key,
+        "prefer_grpc": settings.qdrant_prefer_grpc,
+        "grpc_port": settings.qdrant_grpc_port,
+        "timeout": settings.qdrant_timeout_seconds,
+    }
+    if settings.qdrant_pool_size is not None:
+        options["pool_size"] = settings.qdrant_pool_size
+    return options
+
+
+def build_client() -> "QdrantClient":
+    """A QdrantClient for the configured server."""
+    from qdrant_client import QdrantClient
+
+    return QdrantClient(**client_options())
+
+
+def physical_collection_name(alias: str, dimensions: int, suffix: Optional[str] = None) -> str:
+    """Name of a concrete collection served through `alias`."""
+    name = f"{alias}_{dimensions}d"
+    return f"{name}_{suffix}" if suffix else name
+
+
+def quantization_config(mode: str, always_ram: bool = True):
+    """Qdrant quantization config for `mode` (none, scalar or binary)."""
+    from qdrant_client.models import (
+        BinaryQuantization, BinaryQuantizationConfig, ScalarQuantization, ScalarQuantizationConfig, ScalarType
+    )
+
+    if mode == "none":
+        return None
+    if mode == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8,
+            quantile=0.99,
+            always_ram=always_ram
+        ))
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=always_ram))
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def quantization_state(config: Any) -> Optional[Tuple[str, Optional[str], bool]]:
+    """(method, scalar type, always_ram) of a quantization config, or None when it is off.
+
+    Used to compare the configured quantization with what the server reports,
+    which fills in defaults and leaves unset flags as None.
+    """
+    if config is None:
+        return None
+    for method in ("scalar", "product", "binary"):
+        params = getattr(config, method, None)
+        if params is not None:
+            scalar_type = getattr(params, "type", None)
+            return method, getattr(scalar_type, "value", scalar_type), bool(getattr(params, "always_ram", None))
+    return None
+
+
+def collection_config(size: int, distance: Optional["Distance"] = None) -> Dict[str, Any]:
+    """create_collection keyword arguments for the configured storage layout (cosine by default)."""
+    from qdrant_client.models import Distance, HnswConfigDiff, VectorParams
+
+    return {
+        "vectors_config": VectorParams(
+            size=size,
+            distance=distance or Distance.COSINE,
+            on_disk=settings.qdrant_on_disk_vectors
+        ),
+        "quantization_config": quantization_config(
+            settings.qdrant_quantization, settings.qdrant_quantization_always_ram
+        ),
+        "hnsw_config": HnswConfigDiff(
+            m=settings.qdrant_hnsw_m,
+            ef_construct=settings.qdrant_hnsw_ef_construct
+        ),
+    }
 
 
 class VectorStore:
     """Service for managing vector storage with Qdrant."""
-    
+
     def __init__(self):
-        self.client = QdrantClient(
-            url=settings.qdrant_api_url,
-            api_key=settings.qdrant_api_key
-        )
-        self.collection_name = "synthesizer_manuals"
-        self.vector_size = 1536  # OpenAI text-embedding-ada-002 dimension
-        
+        self._client = Provider(build_client)
+        # The app always addresses the collection through this alias, so a
+        # migrated collection can be swapped in atomically
+        self.collection_name = settings.qdrant_collection
+        self.vector_size = settings.embedding_dimensions
+        self._active_size: Optional[int] = None
+        self._active_size_checked = 0.0
+
+    @property
+    def client(self) -> "QdrantClient":
+        return self._client()
+
     def initialize_collection(self):
-        """Initialize the vector collection if it doesn't exist."""
+        """Initialize the vector collection and its alias if they don't exist."""
+        from qdrant_client.models import CreateAlias, CreateAliasOperation
+
         try:
             # Check if collection exists
             collections = self.client.get_collections()
             collection_names = [col.name for col in collections.collections]
-            
-            if self.collection_name not in collection_names:
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.vector_size,
-                        distance=Distance.COSINE
+            aliases = self.client.get_aliases()
+            alias_names = [alias.alias_name for alias in aliases.aliases]
+
+            if self.collection_name in alias_names:
+                logger.info(f"Collection alias {self.collection_name} already exists")
+                self.sync_collection_config()
+            elif self.collection_name in collection_names:
+                # Created before aliases were used; migrate_collection converts it
+                logger.info(f"Collection {self.collection_name} already exists")
+                self.sync_collection_config()
+            else:
+                physical_name = physical_collection_name(self.collection_name, self.vector_size)
+                if physical_name not in collection_names:
+                    self.client.create_collection(
+                        collection_name=physical_name,
+                        **collection_config(self.vector_size)
                     )
+                    logger.info(f"Created collection: {physical_name}")
+                self.client.update_collection_aliases(
+                    change_aliases_operations=[
+                        CreateAliasOperation(create_alias=CreateAlias(
+                            collection_name=physical_name,
+                            alias_name=self.collection_name
+                        ))
+                    ]
                 )
-                print(f"Created collection: {self.collection_name}")
-            else:
-                print(f"Collection {self.collection_name} already exists")
-                
+                logger.info(f"Created alias: {self.collection_name} -> {physical_name}")
+
         except Exception as e:
-            print(f"Error initializing collection: {e}")
+            logger.error(f"Error initializing collection: {e}")
             raise
-    
+
+    def sync_collection_config(self):
+        """Bring an existing collection's storage and index settings in line with the configuration.
+
+        Qdrant rebuilds quantized vectors and the HNSW graph in the background after
+        an update, so the collection keeps serving while the change is applied.
+        """
+        from qdrant_client.models import Disabled, HnswConfigDiff, VectorParamsDiff
+
+        info = self.client.get_collection(self.collection_name)
+        vectors = info.config.params.vectors
+        wanted = quantization_config(settings.qdrant_quantization, settings.qdrant_quantization_always_ram)
+        current = info.config.quantization_config
+
+        # Only the fields set here are compared: the server's configs carry
+        # defaults and unset flags that would never equal ours
+        changes: Dict[str, Any] = {}
+        if bool(getattr(vectors, "on_disk", None)) != settings.qdrant_on_disk_vectors:
+            changes["vectors_config"] = {"": VectorParamsDiff(on_disk=settings.qdrant_on_disk_vectors)}
+        if quantization_state(current) != quantization_state(wanted):
+            changes["quantization_config"] = wanted if wanted is not None else Disabled.DISABLED
+        hnsw = info.config.hnsw_config
+        if (getattr(hnsw, "m", None), getattr(hnsw, "ef_construct", None)) != (
+            settings.qdrant_hnsw_m, settings.qdrant_hnsw_ef_construct
+        ):
+            changes["hnsw_config"] = HnswConfigDiff(
+                m=settings.qdrant_hnsw_m,
+                ef_construct=settings.qdrant_hnsw_ef_construct
+            )
+
+        if changes:
+            self.client.update_collection(collection_name=self.collection_name, **changes)
+            logger.info(f"Updated collection {self.collection_name}: {', '.join(changes)}")
+
+    def _search_params(
+        self,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None
+    ) -> Optional["SearchParams"]:
+        """Search parameters for a query; None when the server defaults apply."""
+        from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+        params: Dict[str, Any] = {}
+
+        hnsw_ef = settings.qdrant_search_hnsw_ef if hnsw_ef is None else hnsw_ef
+        if hnsw_ef is not None:
+            params["hnsw_ef"] = hnsw_ef
+        exact = settings.qdrant_search_exact if exact is None else exact
+        if exact:
+            params["exact"] = True
+        if settings.qdrant_quantization != "none" or rescore is not None or oversampling is not None:
+            params["quantization"] = QuantizationSearchParams(
+                rescore=settings.qdrant_search_rescore if rescore is None else rescore,
+                oversampling=settings.qdrant_search_oversampling if oversampling is None else oversampling
+            )
+
+        return SearchParams(**params) if params else None
+
+    def _collection_vector_size(self) -> int:
+        """Vector size of the collection currently behind the alias.
+
+        Re-read periodically so that workers keep working across an alias switch to
+        a collection with fewer dimensions.
+        """
+        now = time.monotonic()
+        if self._active_size is None or now - self._active_size_checked > VECTOR_SIZE_REFRESH_SECONDS:
+            self._active_size_checked = now
+            try:
+                vectors = self.client.get_collection(self.collection_name).config.params.vectors
+                size = getattr(vectors, "size", None)
+                # Named-vector collections report a dict; fall back to the configured size
+                self._active_size = size if isinstance(size, int) else self.vector_size
+            except Exception:
+                self._active_size = self._active_size or self.vector_size
+        return self._active_size
+
     def add_embeddings(self, embeddings: List[List[float]], metadata: List[Dict[str, Any]]) -> List[str]:
         """Add embeddings to the vector store."""
+        from qdrant_client.models import PointStruct
+
         points = []
         embedding_ids = []
-        
+        size = self._collection_vector_size() if embeddings else self.vector_size
+
         for i, (embedding, meta) in enumerate(zip(embeddings, metadata)):
             embedding_id = str(uuid.uuid4())
             embedding_ids.append(embedding_id)
-            
+
             point = PointStruct(
                 id=embedding_id,
-                vector=embedding,
+                vector=fit_vector(embedding, size),
                 payload=meta
             )
             points.append(point)
-        
+
         self.client.upsert(
             collection_name=self.collection_name,
             points=points
         )
-        
+
         return embedding_ids
-    
-    def search_similar(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for similar embeddings."""
+
+    def search_similar(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for similar embeddings.
+
+        The keyword arguments override the configured search parameters for this
+        query: quantization `rescore`/`oversampling`, the HNSW beam width `hnsw_ef`
+        and `exact` brute-force search.
+        """
+        kwargs: Dict[str, Any] = {}
+        search_params = self._search_params(rescore, oversampling, hnsw_ef, exact)
+        if search_params is not None:
+            kwargs["search_params"] = search_params
+
         search_result = self.client.query_points(
             collection_name=self.collection_name,
-            query=query_embedding,
+            query=fit_vector(query_embedding, self._collection_vector_size()),
             limit=limit,
-            with_payload=True
+            with_payload=True,
+            **kwargs
         )
 
         results = []
@@ -80,14 +316,14 @@ class VectorStore:
             })
 
         return results
-    
+
     def delete_embeddings(self, embedding_ids: List[str]):
         """Delete embeddings by their IDs."""
         self.client.delete(
             collection_name=self.collection_name,
             points_selector=embedding_ids  # type: ignore
         )
-    
+
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection."""
         info = self.client.get_collection(self.collection_name)
@@ -99,4 +335,4 @@ class VectorStore:
 
 
 # Global vector store instance
-vector_store = VectorStore() 
\ No newline at end of file
+vector_store = VectorStore()
@@ -0,0 +1,113 @@
+import logging
+import time
+from typing import Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.readiness import DependencyCheck, ReadinessMonitor
+from app.core.tokens import warm_encodings
+from app.db.database import get_engine
+from app.rag.chain import rag_chain
+from app.services.embeddings import embedding_service
+from app.services.vector_store import vector_store
+
+logger = logging.getLogger(__name__)
+
+
+def check_database():
+    # The probe checks out a pooled connection of its own; with the single
+    # shared connection of in-memory SQLite, returning it would roll back the
+    # transaction of whichever request is using it
+    engine = get_engine()
+    if isinstance(engine.pool, StaticPool):
+        return
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def check_qdrant():
+    vector_store.client.get_collection(vector_store.collection_name)
+
+
+def check_openai():
+    # No retries: a check must finish within the readiness timeout
+    client = embedding_service.client.with_options(timeout=settings.readiness_check_timeout_seconds, max_retries=0)
+    client.models.retrieve(embedding_service.model)
+
+
+def dependency_checks() -> List[DependencyCheck]:
+    """The checks behind /ready.
+
+    OpenAI is reported but not required: when it is down, cached answers and
+    the document endpoints still work, and pulling every worker out of the load
+    balancer would only turn a partial outage into a full one.
+    """
+    checks = [
+        DependencyCheck("database", check_database),
+        DependencyCheck("qdrant", check_qdrant),
+    ]
+    if not settings.disable_embeddings:
+        checks.append(DependencyCheck("openai", check_openai, critical=False))
+    return checks
+
+
+def _step(name: str, fn: Callable[[], object]):
+    started = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        logger.warning(f"Warm-up step {name} failed: {e}")
+        return
+    logger.info(f"Warm-up step {name} done", extra={"step": name, "ms": round((time.perf_counter() - started) * 1000, 1)})
+
+
+def _warm_search():
+    # Any unit vector will do; the point is to page in the HNSW graph and vectors
+    size = vector_store.vector_size
+    vector_store.search_similar([size ** -0.5] * size, limit=5)
+
+
+def _warm_llm():
+    # Building the model imports LangChain; the root client holds its HTTP pool
+    llm = rag_chain.llm
+    rag_chain.prompt_template
+    root_client = getattr(llm, "root_client", None)
+    if root_client is not None:
+        root_client.with_options(timeout=settings.readiness_check_timeout_seconds, max_retries=0).models.retrieve(
+            rag_chain.model
+        )
+
+
+def _warm_tokenizer():
+    # The OpenAI scheduler counts tokens before every call; tiktoken loads (and
+    # may download) its encodings on first use, which must not eat into a
+    # request's deadline
+    warm_encodings(rag_chain.model, embedding_service.model)
+
+
+def warm_up():
+    """Open the connections a request needs, touch the search index and load the tokenizer.
+
+    Each step is best effort: a failing dependency is logged and left to the
+    readiness checks, which keep the instance out of rotation until it recovers.
+    """
+    started = time.perf_counter()
+    _step("database", check_database)
+    _step("qdrant", check_qdrant)
+    _step("search", _warm_search)
+    if not settings.disable_embeddings:
+        _step("tokenizer", _warm_tokenizer)
+        _step("openai_embeddings", check_openai)
+        _step("openai_chat", _warm_llm)
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+
+# Global readiness monitor; started from the app lifespan
+readiness = ReadinessMonitor(
+    dependency_checks(),
+    warm_up=warm_up if settings.warmup_enabled else None,
+    interval=settings.readiness_check_interval_seconds,
+    timeout=settings.readiness_check_timeout_seconds
+)
@@ -0,0 +1,10 @@
+"""Offline benchmarks for the backend.
+
+Run modules from the backend directory, e.g. `python -m benchmarks.quantization`.
+Benchmarks never call OpenAI; placeholder credentials are set so that the app's
+settings load without a .env file.
+"""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
@@ -0,0 +1,51 @@
+"""Time PDFProcessor._split_text_into_chunks on synthetic page text.
+
+    python -m benchmarks.chunking --sizes 10000 100000 1000000 --json results/chunking.json
+
+Reports per-call latency, throughput in MB/s and the number of chunks produced
+for each input size (characters).
+"""
+import argparse
+
+from benchmarks.common import latency_summary, synthetic_text, timed, write_results
+from app.services.pdf_processor import PDFProcessor
+
+
+def run(args) -> list:
+    processor = PDFProcessor()
+    results = []
+    for size in args.sizes:
+        text = synthetic_text(size, seed=size)
+        latencies = []
+        chunks = []
+        for _ in range(args.repeats):
+            chunks, elapsed = timed(processor._split_text_into_chunks, text, 1)
+            latencies.append(elapsed)
+        summary = latency_summary(latencies)
+        row = {
+            "chars": size,
+            "chunks": len(chunks),
+            **summary,
+            "mb_per_s": size / 1e6 / (summary["p50_ms"] / 1000) if summary["p50_ms"] else 0.0,
+        }
+        results.append(row)
+        print(
+            f"{size:>9} chars  {row['chunks']:>6} chunks  "
+            f"p50 {row['p50_ms']:9.3f} ms  p99 {row['p99_ms']:9.3f} ms  {row['mb_per_s']:8.1f} MB/s"
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    write_results(args.json, "chunking", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
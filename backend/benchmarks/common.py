@@ -0,0 +1,161 @@
+import json
+import math
+import os
+import subprocess
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+
+def synthetic_corpus(num_points: int, dim: int, num_clusters: int = 64, seed: int = 42) -> np.ndarray:
+    """Unit vectors drawn around random cluster centres, like embeddings of related manuals."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(num_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, num_clusters, size=num_points)
+    vectors = centres[labels] + 0.6 * rng.normal(size=(num_points, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_queries(corpus: np.ndarray, num_queries: int, seed: int = 7) -> np.ndarray:
+    """Perturbed corpus vectors, so every query has genuine near neighbours."""
+    rng = np.random.default_rng(seed)
+    picks = corpus[rng.integers(0, len(corpus), size=num_queries)]
+    queries = picks + 0.3 * rng.normal(size=picks.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int, ids: List[str]) -> List[List[str]]:
+    """Ground-truth neighbours by brute-force cosine similarity."""
+    truth = []
+    for start in range(0, len(queries), 256):
+        scores = queries[start:start + 256] @ corpus.T
+        top = np.argsort(-scores, axis=1)[:, :k]
+        truth.extend([[ids[i] for i in row] for row in top])
+    return truth
+
+
+def recall_at_k(found: List[List[str]], truth: List[List[str]]) -> float:
+    """Mean fraction of the true top-k present in the returned top-k."""
+    if not truth:
+        return 0.0
+    return sum(len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)) / len(truth)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples`."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean in milliseconds for samples given in seconds."""
+    return {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": (sum(samples) / len(samples) * 1000) if samples else 0.0,
+    }
+
+
+def make_client(url: Optional[str] = None, prefer_grpc: bool = False, grpc_port: int = 6334,
+                timeout: Optional[int] = None, pool_size: Optional[int] = None) -> QdrantClient:
+    """Client for a Qdrant server at `url`, or Qdrant's in-process local mode."""
+    if url:
+        return QdrantClient(
+            url=url, prefer_grpc=prefer_grpc, grpc_port=grpc_port, timeout=timeout, pool_size=pool_size
+        )
+    return QdrantClient(":memory:")
+
+
+def upload_corpus(client: QdrantClient, collection: str, corpus: np.ndarray,
+                  batch_size: int = 512) -> List[str]:
+    """Upsert the corpus in batches and return the point IDs in corpus order."""
+    ids = [str(uuid.uuid4()) for _ in range(len(corpus))]
+    for start in range(0, len(corpus), batch_size):
+        client.upsert(
+            collection_name=collection,
+            points=[
+                PointStruct(id=ids[i], vector=corpus[i].tolist(), payload={"chunk_index": i})
+                for i in range(start, min(start + batch_size, len(corpus)))
+            ]
+        )
+    return ids
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, elapsed seconds)."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def git_commit() -> Optional[str]:
+    """Commit the working tree is at, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: Optional[str], name: str, params: Dict[str, Any], results: Any):
+    """Write benchmark results as JSON, tagged with the benchmark name, parameters and commit."""
+    if not path:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "benchmark": name,
+            "commit": git_commit(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "params": params,
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {path}")
+
+
+_WORDS = (
+    "oscillator filter envelope cutoff resonance attack decay sustain release lfo rate depth "
+    "patch preset voice polyphony midi channel velocity aftertouch sequencer arpeggiator tempo "
+    "clock sync waveform saw square triangle sine noise mixer level output input knob slider "
+    "menu parameter bank program modulation matrix destination source amount pitch bend wheel"
+).split()
+
+
+def synthetic_text(num_chars: int, seed: int = 0) -> str:
+    """Manual-like prose: sentences of synthesizer vocabulary with paragraph breaks."""
+    rng = np.random.default_rng(seed)
+    parts: List[str] = []
+    length = 0
+    while length < num_chars:
+        words = rng.choice(_WORDS, size=int(rng.integers(6, 20)))
+        sentence = " ".join(words).capitalize() + str(rng.choice([".", ".", ".", "!", "?"]))
+        if rng.random() < 0.15:
+            sentence += "\n\n"
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:num_chars]
+
+
+def generate_pdf(path: str, pages: int, chars_per_page: int = 2500, seed: int = 0) -> str:
+    """Write a text-only PDF of `pages` pages of synthetic manual prose."""
+    import fitz  # PyMuPDF, only needed by the PDF benchmarks
+
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        text = synthetic_text(chars_per_page, seed=seed * 100003 + page_number)
+        page.insert_textbox(fitz.Rect(36, 36, page.rect.width - 36, page.rect.height - 36), text, fontsize=7)
+    doc.save(path)
+    doc.close()
+    return path
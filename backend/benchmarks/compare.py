@@ -0,0 +1,89 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare results/base/search.json results/head/search.json --threshold 10
+
+Rows are matched on their non-measurement fields (e.g. `points`, `pages`,
+`mode`). Latency fields (`*_ms`, `*_s`) and token counts (`*_tokens`) regress
+when they grow, throughput fields (`*_per_s`, `qps`), `recall*` and `mrr` when
+they shrink. Exits with status 1 if any change exceeds the threshold, so it can
+gate CI.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+HIGHER_IS_BETTER = ("_per_s", "qps", "recall", "mrr")
+LOWER_IS_BETTER = ("_ms", "_s", "_tokens")
+
+
+def direction(field: str) -> Optional[int]:
+    """+1 if larger values are better, -1 if smaller are, None if not a measurement."""
+    if field.endswith(HIGHER_IS_BETTER) or field.startswith("recall"):
+        return 1
+    if field.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def row_key(row: Dict[str, Any]) -> Tuple:
+    return tuple(sorted(
+        (k, v) for k, v in row.items()
+        if direction(k) is None and isinstance(v, (str, int, bool)) and not isinstance(v, float)
+    ))
+
+
+def compare(base: List[Dict[str, Any]], head: List[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    base_rows = {row_key(row): row for row in base if isinstance(row, dict)}
+    changes = []
+    for row in head:
+        if not isinstance(row, dict):
+            continue
+        before = base_rows.get(row_key(row))
+        if before is None:
+            continue
+        for field, value in row.items():
+            sign = direction(field)
+            old = before.get(field)
+            if sign is None or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / abs(old) * 100
+            changes.append({
+                "row": dict(row_key(row)),
+                "field": field,
+                "base": old,
+                "head": value,
+                "change_pct": change,
+                "regression": change * sign < -threshold,
+            })
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    if base.get("benchmark") != head.get("benchmark"):
+        parser.error(f"Different benchmarks: {base.get('benchmark')} vs {head.get('benchmark')}")
+
+    changes = compare(base["results"], head["results"], args.threshold)
+    print(f"{head['benchmark']}: {base.get('commit')} -> {head.get('commit')}")
+    for change in changes:
+        label = ", ".join(f"{k}={v}" for k, v in change["row"].items())
+        flag = "  REGRESSION" if change["regression"] else ""
+        print(
+            f"  [{label}] {change['field']}: {change['base']:.3f} -> {change['head']:.3f} "
+            f"({change['change_pct']:+.1f}%){flag}"
+        )
+    sys.exit(1 if any(change["regression"] for change in changes) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""Deterministic stand-in for the OpenAI embeddings and chat completions APIs.
+
+    python -m benchmarks.fake_openai --port 8100
+    python -m benchmarks.fake_openai --chat-latency lognormal:800:0.6 --embedding-latency normal:60:15 \
+        --rate-limit-rpm 3000 --error-rate 0.01
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app
+
+Embeddings are feature-hashed bags of words, so identical texts get identical
+vectors and texts sharing words are close, which keeps retrieval meaningful.
+Chat completions echo a fixed template. Both report token usage. Benchmarks
+start it in-process with `FakeOpenAIServer`.
+
+Latency is drawn per request from a distribution given as `kind:params` in
+milliseconds: `fixed:50`, `uniform:20:80`, `normal:100:20` (mean, stddev),
+`lognormal:80:0.5` (median, sigma) or `spike:20:2000:0.05` (20 ms, but 2 s
+for 5% of requests, the stalls that hedging and deadlines are for). Streamed
+completions additionally wait `--stream-token-ms` per token. Rate limiting mimics OpenAI: a per-minute
+request budget answered with 429, `Retry-After` and `x-ratelimit-*` headers,
+plus optional random 429s and 500s.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+_TOKEN = re.compile(r"\w+")
+DEFAULT_DIMENSIONS = 1536
+
+
+class LatencyModel:
+    """Per-request delay distribution, parsed from `kind:param[:param]` (milliseconds)."""
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "spike": 3}
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, *params = spec.split(":")
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"Bad latency spec {spec!r}; expected one of fixed:ms, uniform:lo:hi, "
+                             f"normal:mean:sd, lognormal:median:sigma, spike:base:slow:probability")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self._rng = random.Random()
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = self._rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = self._rng.gauss(*self.params)
+        elif self.kind == "spike":
+            base, slow, probability = self.params
+            value = slow if self._rng.random() < probability else base
+        else:
+            median, sigma = self.params
+            value = median * self._rng.lognormvariate(0.0, sigma)
+        return max(0.0, value)
+
+    def sleep(self):
+        delay = self.sample_ms()
+        if delay:
+            time.sleep(delay / 1000)
+
+
+class RateLimiter:
+    """Fixed one-minute window request budget, like OpenAI's RPM limit."""
+
+    def __init__(self, rpm: int = 0):
+        self.rpm = rpm
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._used = 0
+
+    def acquire(self) -> Dict[str, str]:
+        """Count a request; returns headers, including Retry-After when over budget."""
+        if self.rpm <= 0:
+            return {}
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start = now
+                self._used = 0
+            reset = 60 - (now - self._window_start)
+            allowed = self._used < self.rpm
+            if allowed:
+                self._used += 1
+            headers = {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-remaining-requests": str(max(0, self.rpm - self._used)),
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            }
+        if not allowed:
+            headers["Retry-After"] = str(max(1, int(reset + 0.999)))
+        return headers
+
+
+def count_tokens(text: str) -> int:
+    """Rough OpenAI token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> np.ndarray:
+    """Unit-length signed feature hash of the words in `text`."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in _TOKEN.findall(text.lower()):
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[h % dimensions] += 1.0 if h >> 63 else -1.0
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        vector = np.random.default_rng(seed).normal(size=dimensions).astype(np.float32)
+        norm = float(np.linalg.norm(vector))
+    return vector / norm
+
+
+def fake_completion(messages: List[Dict[str, Any]]) -> str:
+    question = ""
+    for message in messages:
+        if message.get("role") == "user":
+            content = message.get("content")
+            question = content if isinstance(content, str) else json.dumps(content)
+    return f"Based on the documentation: {question.strip()[-120:]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+    _extra_headers: Dict[str, str] = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        headers = {**self._extra_headers, **(headers or {})}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # The model endpoints answer readiness checks; they are never throttled
+        path = self.path.rstrip("/")
+        if "/models" not in path:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        self.server.owner.record("models")
+        model = path.rsplit("/models", 1)[1].lstrip("/")
+        if model:
+            self._send_json(200, {"id": model, "object": "model", "created": 0, "owned_by": "fake-openai"})
+        else:
+            self._send_json(200, {"object": "list", "data": [
+                {"id": name, "object": "model", "created": 0, "owned_by": "fake-openai"}
+                for name in ("text-embedding-3-small", "gpt-3.5-turbo")
+            ]})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON", "type": "invalid_request_error"}})
+            return
+
+        path = self.path.rstrip("/")
+        if path.endswith("/embeddings"):
+            route = "embeddings"
+        elif path.endswith("/chat/completions"):
+            route = "chat"
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        owner = self.server.owner
+        owner.record(route)
+        self._extra_headers = owner.limiter.acquire()
+        if "Retry-After" in self._extra_headers or owner.chance(owner.rate_limit_error_rate):
+            owner.record("rate_limited")
+            self._extra_headers.setdefault("Retry-After", "1")
+            self._send_json(429, {"error": {
+                "message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"
+            }})
+            return
+        if owner.chance(owner.error_rate):
+            owner.record("errors")
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        (owner.embedding_latency if route == "embeddings" else owner.chat_latency).sleep()
+        if route == "embeddings":
+            self._embeddings(body)
+        else:
+            self._chat(body)
+
+    def _embeddings(self, body: Dict[str, Any]):
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        dimensions = int(body.get("dimensions") or self.server.owner.dimensions)
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(texts):
+            vector = fake_embedding(str(text), dimensions)
+            embedding: Any = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii") if as_base64 \
+                else vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(count_tokens(str(text)) for text in texts)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat(self, body: Dict[str, Any]):
+        messages = body.get("messages", [])
+        answer = fake_completion(messages)
+        prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = count_tokens(answer)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "fake-chat")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            for key, value in self._extra_headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            words = answer.split(" ")
+            token_delay = self.server.owner.stream_token_ms / 1000
+            for i, word in enumerate(words):
+                if token_delay and i:
+                    time.sleep(token_delay)
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                                 "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage,
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "FakeOpenAIServer"
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up on slow responses (timeouts, hedged requests) are expected
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeOpenAIServer:
+    """Run the stand-in API on a background thread; use as a context manager.
+
+    The latency models, error rates and limiter are plain attributes and can be
+    swapped while the server runs.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dimensions: int = DEFAULT_DIMENSIONS,
+        embedding_latency: str = "fixed:0",
+        chat_latency: str = "fixed:0",
+        stream_token_ms: float = 0.0,
+        rate_limit_rpm: int = 0,
+        rate_limit_error_rate: float = 0.0,
+        error_rate: float = 0.0
+    ):
+        self.host = host
+        self.port = port
+        self.dimensions = dimensions
+        self.embedding_latency = LatencyModel(embedding_latency)
+        self.chat_latency = LatencyModel(chat_latency)
+        self.stream_token_ms = stream_token_ms
+        self.limiter = RateLimiter(rate_limit_rpm)
+        self.rate_limit_error_rate = rate_limit_error_rate
+        self.error_rate = error_rate
+        self._rng = random.Random()
+        self.requests: Dict[str, int] = {"embeddings": 0, "chat": 0, "models": 0, "rate_limited": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def chance(self, probability: float) -> bool:
+        return probability > 0 and self._rng.random() < probability
+
+    def record(self, route: str):
+        with self._lock:
+            self.requests[route] += 1
+
+    def start(self) -> "FakeOpenAIServer":
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS,
+                        help="embedding size when a request does not ask for one")
+    parser.add_argument("--embedding-latency", default="fixed:0", help="e.g. normal:60:15")
+    parser.add_argument("--chat-latency", default="fixed:0", help="e.g. lognormal:800:0.6")
+    parser.add_argument("--stream-token-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rpm", type=int, default=0, help="requests per minute before 429s (0: off)")
+    parser.add_argument("--rate-limit-error-rate", type=float, default=0.0, help="fraction of random 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of random 500s")
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer(
+        args.host, args.port, args.dimensions,
+        embedding_latency=args.embedding_latency,
+        chat_latency=args.chat_latency,
+        stream_token_ms=args.stream_token_ms,
+        rate_limit_rpm=args.rate_limit_rpm,
+        rate_limit_error_rate=args.rate_limit_error_rate,
+        error_rate=args.error_rate
+    ).start()
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
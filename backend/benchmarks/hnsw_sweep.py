@@ -0,0 +1,125 @@
+"""Sweep HNSW build and search parameters and chart latency against recall.
+
+For every (m, ef_construct) pair a collection is built from a synthetic corpus;
+every search `ef` is then measured against brute-force ground truth.
+
+    python -m benchmarks.hnsw_sweep --url http://localhost:6333 \\
+        --m 8 16 32 --ef-construct 64 128 --ef 16 32 64 128 256 --json results/hnsw.json
+
+Qdrant's local mode has no HNSW index (every search is exact), so without --url
+the sweep only validates the harness.
+"""
+import argparse
+
+from qdrant_client.models import Distance, VectorParams, HnswConfigDiff, OptimizersConfigDiff, SearchParams
+
+from benchmarks.common import (
+    synthetic_corpus, synthetic_queries, exact_top_k, recall_at_k, latency_summary,
+    make_client, upload_corpus, timed, write_results
+)
+from benchmarks.quantization import wait_for_indexing
+
+
+def ascii_chart(rows: list, width: int = 60, height: int = 16) -> str:
+    """Scatter plot of p50 latency (x) against recall (y), one letter per build config."""
+    if not rows:
+        return ""
+    xs = [row["p50_ms"] for row in rows]
+    ys = [row["recall"] for row in rows]
+    x_min, x_max = min(xs), max(xs) or 1.0
+    y_min, y_max = min(ys), max(ys)
+    x_span = (x_max - x_min) or 1.0
+    y_span = (y_max - y_min) or 1.0
+
+    builds = sorted({(row["m"], row["ef_construct"]) for row in rows})
+    marks = {build: chr(ord("A") + i % 26) for i, build in enumerate(builds)}
+
+    grid = [[" "] * width for _ in range(height)]
+    for row in rows:
+        x = int((row["p50_ms"] - x_min) / x_span * (width - 1))
+        y = int((row["recall"] - y_min) / y_span * (height - 1))
+        grid[height - 1 - y][x] = marks[(row["m"], row["ef_construct"])]
+
+    lines = [f"recall {y_max:.3f}"]
+    lines += ["  |" + "".join(line) for line in grid]
+    lines.append(f"recall {y_min:.3f} +" + "-" * width)
+    lines.append(f"        p50 {x_min:.2f} ms" + " " * max(1, width - 28) + f"{x_max:.2f} ms")
+    lines += [f"  {mark}: m={m} ef_construct={ef_c}" for (m, ef_c), mark in marks.items()]
+    return "\n".join(lines)
+
+
+def run(args) -> list:
+    client = make_client(args.url)
+    corpus = synthetic_corpus(args.points, args.dim)
+    queries = synthetic_queries(corpus, args.queries)
+
+    rows = []
+    for m in args.m:
+        for ef_construct in args.ef_construct:
+            collection = f"bench_hnsw_m{m}_ef{ef_construct}"
+            if client.collection_exists(collection):
+                client.delete_collection(collection)
+            client.create_collection(
+                collection_name=collection,
+                vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE),
+                hnsw_config=HnswConfigDiff(m=m, ef_construct=ef_construct),
+                # Index from the first segment so small corpora are searched through HNSW
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=1)
+            )
+            ids = upload_corpus(client, collection, corpus)
+            truth = exact_top_k(corpus, queries, args.k, ids)
+            if args.url:
+                wait_for_indexing(client, collection)
+
+            for ef in args.ef:
+                latencies, found = [], []
+                for query in queries:
+                    response, elapsed = timed(
+                        client.query_points,
+                        collection_name=collection,
+                        query=query.tolist(),
+                        limit=args.k,
+                        search_params=SearchParams(hnsw_ef=ef)
+                    )
+                    latencies.append(elapsed)
+                    found.append([str(point.id) for point in response.points])
+
+                row = {
+                    "m": m,
+                    "ef_construct": ef_construct,
+                    "ef": ef,
+                    "recall": recall_at_k(found, truth),
+                    **latency_summary(latencies),
+                }
+                rows.append(row)
+                print(
+                    f"m={m:<3} ef_construct={ef_construct:<4} ef={ef:<4} "
+                    f"recall@{args.k} {row['recall']:.3f}  p50 {row['p50_ms']:.2f} ms  p99 {row['p99_ms']:.2f} ms"
+                )
+
+            client.delete_collection(collection)
+
+    print()
+    print(ascii_chart(rows))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL (default: local mode)")
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-construct", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args)
+    write_results(args.json, "hnsw_sweep", vars(args), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Time DocumentProcessor.process_document end to end, fully offline.
+
+    python -m benchmarks.ingest --pages 10 50 200 --json results/ingest.json
+
+Embeddings come from the bundled fake OpenAI server, vectors go to Qdrant's
+in-process mode and rows to a temporary SQLite database, so the numbers cover
+the app's own work (extraction, chunking, payload building, upserts, ORM
+writes) plus local HTTP round trips for the embedding calls. Per-stage times
+are read back from the stage histogram.
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import generate_pdf, latency_summary, timed, write_results
+from benchmarks.fake_openai import FakeOpenAIServer
+
+INGEST_STAGES = ("extract", "embed", "upsert", "commit", "db")
+
+
+def stage_totals(registry) -> dict:
+    return {
+        stage: registry.get_sample_value(
+            "synthbot_stage_duration_seconds_sum", {"pipeline": "ingest", "stage": stage}
+        ) or 0.0
+        for stage in INGEST_STAGES
+    }
+
+
+def run(args) -> list:
+    with tempfile.TemporaryDirectory() as directory, FakeOpenAIServer(dimensions=args.dim) as server:
+        # The app reads its configuration at import time, so point it at the stand-ins first
+        os.environ.update({
+            "OPENAI_BASE_URL": server.base_url,
+            "QDRANT_API_URL": ":memory:",
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'ingest.db')}",
+            "EMBEDDING_DIMENSIONS": str(args.dim),
+            "UPLOAD_DIR": directory,
+        })
+        from prometheus_client import REGISTRY
+        from app.db.database import SessionLocal, create_tables
+        from app.ingest.document_processor import document_processor
+        from app.services.vector_store import vector_store
+
+        create_tables()
+        vector_store.initialize_collection()
+
+        results = []
+        for pages in args.pages:
+            path = generate_pdf(os.path.join(directory, f"manual_{pages}.pdf"), pages, args.chars_per_page)
+            latencies = []
+            before = stage_totals(REGISTRY)
+            chunks = 0
+            for i in range(args.repeats):
+                db = SessionLocal()
+                try:
+                    document, elapsed = timed(
+                        document_processor.process_document, path, f"manual_{pages}_{i}.pdf", db
+                    )
+                    chunks = int(document.num_chunks)  # type: ignore
+                finally:
+                    db.close()
+                latencies.append(elapsed)
+            after = stage_totals(REGISTRY)
+            summary = latency_summary(latencies)
+            row = {
+                "pages": pages,
+                "chunks": chunks,
+                **summary,
+                "chunks_per_s": chunks / (summary["p50_ms"] / 1000) if summary["p50_ms"] else 0.0,
+                "stages_ms": {
+                    stage: (after[stage] - before[stage]) / args.repeats * 1000 for stage in INGEST_STAGES
+                },
+            }
+            results.append(row)
+            stages = "  ".join(f"{k} {v:.0f}" for k, v in row["stages_ms"].items())
+            print(
+                f"{pages:>5} pages  {chunks:>6} chunks  p50 {row['p50_ms']:9.1f} ms  "
+                f"{row['chunks_per_s']:7.0f} chunks/s  [{stages} ms]"
+            )
+        results.append({"fake_openai_requests": dict(server.requests)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--chars-per-page", type=int, default=2500)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    write_results(args.json, "ingest", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
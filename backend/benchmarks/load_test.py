@@ -0,0 +1,257 @@
+"""Drive the API at a target request rate and report tail latency and errors.
+
+    # one command: fake OpenAI + the app in a subprocess (Postgres/Qdrant from the environment)
+    python -m benchmarks.load_test --spawn-app --rps 20 --duration 60 --mix chat=9,upload=1 \\
+        --chat-latency lognormal:800:0.6 --embedding-latency normal:60:15 --json results/load.json
+
+    # stalls and a flaky upstream: hedged embeddings, deadlines (504) and open circuits (503)
+    python -m benchmarks.load_test --spawn-app --rps 20 --duration 60 \\
+        --embedding-latency spike:20:3000:0.02 --chat-latency lognormal:800:1.0 --error-rate 0.2
+
+    # against an already running deployment
+    python -m benchmarks.load_test --url http://localhost:8000 --rps 50 --duration 120
+
+Arrivals are open-loop (Poisson at `--rps`), so a slow server shows up as
+latency and errors rather than as a lower offered rate. Requests beyond
+`--max-in-flight` are counted as dropped. Scenarios:
+
+- chat:   POST /chat/ with questions drawn from a pool; `--repeat-ratio` of them
+          repeat earlier questions, to exercise the caches
+- stream: POST /chat/stream, timing the first byte and the full body; this
+          app does not serve a streaming endpoint yet, so expect 404s until it does
+- upload: POST /documents/upload with a generated PDF under a unique name
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import generate_pdf, latency_summary, synthetic_text, write_results
+from benchmarks.fake_openai import FakeOpenAIServer
+
+
+class Recorder:
+    """Per-scenario latencies and outcome counts."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.first_byte: Dict[str, List[float]] = defaultdict(list)
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, scenario: str, outcome: str, elapsed: float, first_byte: Optional[float] = None):
+        self.outcomes[scenario][outcome] += 1
+        if outcome == "200":
+            self.latencies[scenario].append(elapsed)
+            if first_byte is not None:
+                self.first_byte[scenario].append(first_byte)
+
+    def summary(self, duration: float) -> List[Dict[str, Any]]:
+        rows = []
+        for scenario in sorted(self.outcomes):
+            outcomes = self.outcomes[scenario]
+            total = sum(outcomes.values())
+            ok = outcomes.get("200", 0)
+            row = {
+                "scenario": scenario,
+                "requests": total,
+                "ok": ok,
+                "errors": total - ok - outcomes.get("dropped", 0),
+                "dropped": outcomes.get("dropped", 0),
+                "error_rate": (total - ok) / total if total else 0.0,
+                "throughput_per_s": ok / duration if duration else 0.0,
+                "outcomes": dict(outcomes),
+                **latency_summary(self.latencies[scenario]),
+            }
+            if self.first_byte[scenario]:
+                row["first_byte_p50_ms"] = latency_summary(self.first_byte[scenario])["p50_ms"]
+                row["first_byte_p99_ms"] = latency_summary(self.first_byte[scenario])["p99_ms"]
+            rows.append(row)
+        return rows
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("chat", "stream", "upload"):
+            raise ValueError(f"Unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadGenerator:
+    def __init__(self, args, pdf_bytes: bytes):
+        self.args = args
+        self.pdf_bytes = pdf_bytes
+        self.recorder = Recorder()
+        self.rng = random.Random(args.seed)
+        self.asked: List[str] = []
+        self.in_flight = 0
+
+    def question(self) -> str:
+        if self.asked and self.rng.random() < self.args.repeat_ratio:
+            return self.rng.choice(self.asked)
+        question = synthetic_text(self.rng.randint(30, 120), seed=self.rng.randrange(1 << 30)) + "?"
+        self.asked.append(question)
+        return question
+
+    async def _chat(self, client: httpx.AsyncClient):
+        started = time.perf_counter()
+        response = await client.post("/chat/", json={"query": self.question()})
+        self.recorder.record("chat", str(response.status_code), time.perf_counter() - started)
+
+    async def _stream(self, client: httpx.AsyncClient):
+        started = time.perf_counter()
+        first_byte = None
+        async with client.stream("POST", "/chat/stream", json={"query": self.question()}) as response:
+            async for _ in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+        self.recorder.record("stream", str(response.status_code), time.perf_counter() - started, first_byte)
+
+    async def _upload(self, client: httpx.AsyncClient):
+        started = time.perf_counter()
+        files = {"file": (f"load-{uuid.uuid4().hex[:12]}.pdf", self.pdf_bytes, "application/pdf")}
+        response = await client.post("/documents/upload", files=files)
+        self.recorder.record("upload", str(response.status_code), time.perf_counter() - started)
+
+    async def _run_one(self, client: httpx.AsyncClient, scenario: str):
+        self.in_flight += 1
+        try:
+            await getattr(self, f"_{scenario}")(client)
+        except httpx.TimeoutException:
+            self.recorder.record(scenario, "timeout", 0.0)
+        except httpx.HTTPError as e:
+            self.recorder.record(scenario, type(e).__name__, 0.0)
+        finally:
+            self.in_flight -= 1
+
+    async def run(self) -> float:
+        mix = parse_mix(self.args.mix)
+        scenarios, weights = list(mix), list(mix.values())
+        limits = httpx.Limits(max_connections=self.args.max_in_flight, max_keepalive_connections=self.args.max_in_flight)
+        async with httpx.AsyncClient(base_url=self.args.url, timeout=self.args.timeout, limits=limits) as client:
+            tasks = set()
+            started = time.perf_counter()
+            next_at = started
+            while next_at - started < self.args.duration:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                scenario = self.rng.choices(scenarios, weights)[0]
+                if self.in_flight >= self.args.max_in_flight:
+                    self.recorder.record(scenario, "dropped", 0.0)
+                else:
+                    task = asyncio.create_task(self._run_one(client, scenario))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                next_at += self.rng.expovariate(self.args.rps)
+            offered = time.perf_counter() - started
+            if tasks:
+                await asyncio.wait(tasks)
+        return offered
+
+
+def wait_for_health(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App at {url} did not become healthy within {timeout:.0f}s")
+
+
+def run(args) -> list:
+    fake: Optional[FakeOpenAIServer] = None
+    app: Optional[subprocess.Popen] = None
+    try:
+        if args.spawn_app:
+            fake = FakeOpenAIServer(
+                embedding_latency=args.embedding_latency,
+                chat_latency=args.chat_latency,
+                stream_token_ms=args.stream_token_ms,
+                rate_limit_rpm=args.rate_limit_rpm,
+                rate_limit_error_rate=args.rate_limit_error_rate,
+                error_rate=args.error_rate
+            ).start()
+            env = {**os.environ, "OPENAI_BASE_URL": fake.base_url, "LOG_LEVEL": "WARNING"}
+            app = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.app_port),
+                 "--workers", str(args.app_workers), "--log-level", "warning"],
+                env=env
+            )
+            args.url = f"http://127.0.0.1:{args.app_port}"
+            wait_for_health(args.url)
+            print(f"Started app at {args.url} against fake OpenAI at {fake.base_url}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(generate_pdf(os.path.join(directory, "load.pdf"), args.upload_pages), "rb") as f:
+                pdf_bytes = f.read()
+
+        generator = LoadGenerator(args, pdf_bytes)
+        offered = asyncio.run(generator.run())
+        results = generator.recorder.summary(offered)
+        if fake is not None:
+            results.append({"fake_openai_requests": dict(fake.requests)})
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait(timeout=30)
+        if fake is not None:
+            fake.stop()
+
+    print(f"{args.rps:.1f} rps offered for {args.duration:.0f}s ({args.mix})")
+    for row in results:
+        if "scenario" not in row:
+            continue
+        first_byte = f"  ttfb p50 {row['first_byte_p50_ms']:7.1f} ms" if "first_byte_p50_ms" in row else ""
+        print(
+            f"{row['scenario']:>7}  {row['requests']:>6} req  {row['throughput_per_s']:6.1f} ok/s  "
+            f"p50 {row['p50_ms']:8.1f}  p95 {row['p95_ms']:8.1f}  p99 {row['p99_ms']:8.1f} ms  "
+            f"errors {row['errors']} dropped {row['dropped']}{first_byte}  {row['outcomes']}"
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rps", type=float, default=10.0, help="target arrival rate")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of arrivals")
+    parser.add_argument("--mix", default="chat=1", help="scenario weights, e.g. chat=8,stream=1,upload=1")
+    parser.add_argument("--repeat-ratio", type=float, default=0.2, help="fraction of repeated questions")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--upload-pages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    spawn = parser.add_argument_group("spawned app and fake OpenAI server")
+    spawn.add_argument("--spawn-app", action="store_true")
+    spawn.add_argument("--app-port", type=int, default=8765)
+    spawn.add_argument("--app-workers", type=int, default=1)
+    spawn.add_argument("--embedding-latency", default="normal:60:15")
+    spawn.add_argument("--chat-latency", default="lognormal:800:0.5")
+    spawn.add_argument("--stream-token-ms", type=float, default=20.0)
+    spawn.add_argument("--rate-limit-rpm", type=int, default=0)
+    spawn.add_argument("--rate-limit-error-rate", type=float, default=0.0)
+    spawn.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    write_results(args.json, "load_test", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
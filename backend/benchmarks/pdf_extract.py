@@ -0,0 +1,56 @@
+"""Time PDFProcessor.extract_text_from_pdf on generated PDFs.
+
+    python -m benchmarks.pdf_extract --pages 10 100 500 --json results/pdf_extract.json
+
+PDFs of synthetic manual text are generated once per page count in a
+temporary directory; extraction (text plus chunking) is then timed.
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import generate_pdf, latency_summary, timed, write_results
+from app.services.pdf_processor import PDFProcessor
+
+
+def run(args) -> list:
+    processor = PDFProcessor()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            path = generate_pdf(os.path.join(directory, f"manual_{pages}.pdf"), pages, args.chars_per_page)
+            latencies = []
+            chunks = []
+            for _ in range(args.repeats):
+                (chunks, _), elapsed = timed(processor.extract_text_from_pdf, path)
+                latencies.append(elapsed)
+            summary = latency_summary(latencies)
+            row = {
+                "pages": pages,
+                "file_bytes": os.path.getsize(path),
+                "chunks": len(chunks),
+                **summary,
+                "pages_per_s": pages / (summary["p50_ms"] / 1000) if summary["p50_ms"] else 0.0,
+            }
+            results.append(row)
+            print(
+                f"{pages:>5} pages  {row['chunks']:>6} chunks  "
+                f"p50 {row['p50_ms']:9.2f} ms  p99 {row['p99_ms']:9.2f} ms  {row['pages_per_s']:8.0f} pages/s"
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--chars-per-page", type=int, default=2500)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    write_results(args.json, "pdf_extract", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
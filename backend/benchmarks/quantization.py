@@ -0,0 +1,122 @@
+"""Compare unquantized, scalar (int8) and binary quantized collections.
+
+Reports estimated vector RAM, p50/p99 search latency and recall@k against
+brute-force ground truth on a synthetic corpus.
+
+    python -m benchmarks.quantization --points 20000 --dim 512
+    python -m benchmarks.quantization --url http://localhost:6333 --json results/quantization.json
+
+Without --url the benchmark runs in Qdrant's local mode. Local mode always does
+exact search and ignores quantization, so it only validates the harness and the
+baseline; run against a Qdrant server for meaningful quantized numbers.
+"""
+import argparse
+import time
+
+from qdrant_client.models import Distance, VectorParams, SearchParams, QuantizationSearchParams
+
+from benchmarks.common import (
+    synthetic_corpus, synthetic_queries, exact_top_k, recall_at_k, latency_summary,
+    make_client, upload_corpus, timed, write_results
+)
+from app.services.vector_store import quantization_config
+
+
+def estimated_ram_bytes(mode: str, num_points: int, dim: int, on_disk: bool, always_ram: bool) -> int:
+    """Vector memory held in RAM for a storage layout, excluding the HNSW graph."""
+    original = 0 if on_disk else num_points * dim * 4
+    if mode == "scalar":
+        quantized = num_points * dim
+    elif mode == "binary":
+        quantized = num_points * ((dim + 7) // 8)
+    else:
+        quantized = 0
+    return original + (quantized if always_ram else 0)
+
+
+def wait_for_indexing(client, collection: str, timeout: float = 600):
+    """Block until the server reports the collection as fully optimized."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if str(client.get_collection(collection).status).lower().endswith("green"):
+            return
+        time.sleep(0.5)
+
+
+def run(args) -> list:
+    client = make_client(args.url)
+    corpus = synthetic_corpus(args.points, args.dim)
+    queries = synthetic_queries(corpus, args.queries)
+
+    results = []
+    for mode in args.modes:
+        collection = f"bench_quantization_{mode}"
+        if client.collection_exists(collection):
+            client.delete_collection(collection)
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE, on_disk=args.on_disk),
+            quantization_config=quantization_config(mode, always_ram=True)
+        )
+        # Point IDs are random per upload, so ground truth is computed per collection
+        ids = upload_corpus(client, collection, corpus)
+        truth = exact_top_k(corpus, queries, args.k, ids)
+        if args.url:
+            wait_for_indexing(client, collection)
+
+        search_params = None
+        if mode != "none":
+            search_params = SearchParams(quantization=QuantizationSearchParams(
+                rescore=args.rescore, oversampling=args.oversampling
+            ))
+
+        latencies, found = [], []
+        for query in queries:
+            response, elapsed = timed(
+                client.query_points,
+                collection_name=collection,
+                query=query.tolist(),
+                limit=args.k,
+                search_params=search_params
+            )
+            latencies.append(elapsed)
+            found.append([str(point.id) for point in response.points])
+
+        row = {
+            "mode": mode,
+            "estimated_ram_mb": estimated_ram_bytes(mode, args.points, args.dim, args.on_disk, True) / 2**20,
+            f"recall@{args.k}": recall_at_k(found, truth),
+            **latency_summary(latencies),
+        }
+        results.append(row)
+        print(
+            f"{mode:>7}  ram~{row['estimated_ram_mb']:8.1f} MB  "
+            f"p50 {row['p50_ms']:7.2f} ms  p99 {row['p99_ms']:7.2f} ms  "
+            f"recall@{args.k} {row[f'recall@{args.k}']:.3f}"
+        )
+        client.delete_collection(collection)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL (default: local mode)")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["none", "scalar", "binary"],
+                        choices=["none", "scalar", "binary"])
+    parser.add_argument("--on-disk", action="store_true", help="keep original vectors on disk")
+    parser.add_argument("--no-rescore", dest="rescore", action="store_false")
+    parser.add_argument("--oversampling", type=float, default=2.0)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+    write_results(args.json, "quantization", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
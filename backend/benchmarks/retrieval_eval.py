@@ -0,0 +1,221 @@
+"""Score RAGChain.retrieve_relevant_chunks against a golden set of questions.
+
+    python -m benchmarks.retrieval_eval --golden golden.jsonl --k 3 5 10 --json results/retrieval.json
+    python -m benchmarks.retrieval_eval --offline --pages 30 --chunk-size 800 --set QDRANT_SEARCH_HNSW_EF=64
+
+The golden set is JSON Lines, one question per line:
+
+    {"question": "How do I change the filter cutoff?", "document": "manual.pdf", "pages": [12, 13]}
+
+`document` matches a chunk's filename or document ID and `page` / `pages`
+its page number (within --page-tolerance). Without --offline the app's
+configured Qdrant, database and OpenAI account are used as they are.
+
+--offline builds a throwaway corpus instead: synthetic PDFs are ingested
+through the app with embeddings from the bundled fake OpenAI server, Qdrant's
+in-process mode and a temporary SQLite database, and questions are sampled
+from the page text (save them with --save-golden to reuse them elsewhere).
+Fake embeddings are feature hashes, so offline scores measure chunking and
+search settings relative to each other, not real semantic quality.
+
+Settings overrides (--set NAME=VALUE) are applied as environment variables
+before the app is imported. Each row reports, for one k, recall@k (share of
+questions with a relevant chunk in the top k), MRR, the mean token count of
+the prompt that would be sent to the LLM and the retrieval latency.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.common import generate_pdf, latency_summary, synthetic_text, timed, write_results
+from benchmarks.fake_openai import FakeOpenAIServer
+
+
+def load_golden(path: str) -> List[Dict[str, Any]]:
+    """Read a golden set, normalizing `page` / `pages` into a list of page numbers."""
+    questions = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "question" not in item or "document" not in item:
+                raise ValueError(f"{path}:{line_number}: needs `question` and `document`")
+            pages = item.get("pages", [item["page"]] if "page" in item else [])
+            questions.append({"question": item["question"], "document": str(item["document"]), "pages": pages})
+    return questions
+
+
+def golden_digest(questions: List[Dict[str, Any]]) -> str:
+    """Content hash of a golden set, so results are only compared on identical questions."""
+    blob = json.dumps(questions, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def sample_questions(filename: str, pages: int, chars_per_page: int, per_page: int,
+                     words: int, seed: int) -> List[Dict[str, Any]]:
+    """Questions made of word runs taken from the text generate_pdf wrote on each page."""
+    rng = np.random.default_rng(seed)
+    questions = []
+    for page_number in range(pages):
+        tokens = synthetic_text(chars_per_page, seed=seed * 100003 + page_number).split()
+        for _ in range(per_page):
+            start = int(rng.integers(0, max(len(tokens) - words, 1)))
+            questions.append({
+                "question": " ".join(tokens[start:start + words]),
+                "document": filename,
+                "pages": [page_number + 1],
+            })
+    return questions
+
+
+def is_relevant(chunk: Dict[str, Any], expected: Dict[str, Any], tolerance: int) -> bool:
+    payload = chunk.get("payload") or {}
+    if expected["document"] not in (payload.get("filename"), payload.get("document_id")):
+        return False
+    if not expected["pages"]:
+        return True
+    page = payload.get("page_number")
+    return page is not None and any(abs(int(page) - int(p)) <= tolerance for p in expected["pages"])
+
+
+def first_relevant_rank(chunks: List[Dict[str, Any]], expected: Dict[str, Any], tolerance: int) -> Optional[int]:
+    for rank, chunk in enumerate(chunks, 1):
+        if is_relevant(chunk, expected, tolerance):
+            return rank
+    return None
+
+
+def evaluate(questions: List[Dict[str, Any]], ks: List[int], tolerance: int) -> List[Dict[str, Any]]:
+    from app.core.tokens import count_tokens
+    from app.rag.chain import rag_chain
+    from app.services.embedding_cache import get_query_embedding_cache
+
+    results = []
+    for k in ks:
+        # Every pass pays for its own query embeddings
+        get_query_embedding_cache().clear()
+        latencies = []
+        reciprocal_ranks = []
+        prompt_tokens = []
+        for item in questions:
+            chunks, elapsed = timed(rag_chain.retrieve_relevant_chunks, item["question"], limit=k)
+            latencies.append(elapsed)
+            rank = first_relevant_rank(chunks, item, tolerance)
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+            prompt_tokens.append(count_tokens(rag_chain.build_prompt(item["question"], chunks), rag_chain.model))
+
+        row = {
+            "k": k,
+            "questions": len(questions),
+            "recall_at_k": sum(1 for r in reciprocal_ranks if r > 0) / len(questions),
+            "mrr": sum(reciprocal_ranks) / len(questions),
+            "mean_prompt_tokens": sum(prompt_tokens) / len(questions),
+            **latency_summary(latencies),
+        }
+        results.append(row)
+        print(
+            f"k={k:<3} recall {row['recall_at_k']:.3f}  MRR {row['mrr']:.3f}  "
+            f"prompt {row['mean_prompt_tokens']:7.0f} tokens  "
+            f"p50 {row['p50_ms']:7.2f} ms  p95 {row['p95_ms']:7.2f} ms"
+        )
+    return results
+
+
+def run_offline(args, overrides: Dict[str, str]) -> tuple:
+    with tempfile.TemporaryDirectory() as directory, FakeOpenAIServer(dimensions=args.dim) as server:
+        os.environ.update({
+            "OPENAI_BASE_URL": server.base_url,
+            "QDRANT_API_URL": ":memory:",
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'eval.db')}",
+            "EMBEDDING_DIMENSIONS": str(args.dim),
+            "UPLOAD_DIR": directory,
+        })
+        os.environ.update(overrides)
+        from app.db.database import SessionLocal, create_tables
+        from app.ingest.document_processor import document_processor
+        from app.services.pdf_processor import pdf_processor
+        from app.services.vector_store import vector_store
+
+        create_tables()
+        vector_store.initialize_collection()
+        if args.chunk_size is not None:
+            pdf_processor.chunk_size = args.chunk_size
+        if args.chunk_overlap is not None:
+            pdf_processor.chunk_overlap = args.chunk_overlap
+
+        questions = []
+        for doc in range(args.documents):
+            filename = f"manual_{doc}.pdf"
+            path = generate_pdf(os.path.join(directory, filename), args.pages, args.chars_per_page, seed=doc)
+            db = SessionLocal()
+            try:
+                document_processor.process_document(path, filename, db)
+            finally:
+                db.close()
+            questions += sample_questions(
+                filename, args.pages, args.chars_per_page, args.questions_per_page, args.question_words, seed=doc
+            )
+
+        if args.save_golden:
+            with open(args.save_golden, "w") as f:
+                for item in questions:
+                    f.write(json.dumps(item) + "\n")
+            print(f"Golden set written to {args.save_golden}")
+        if args.golden:
+            # Score a supplied golden set against the generated corpus instead
+            questions = load_golden(args.golden)
+
+        return questions, evaluate(questions, args.k, args.page_tolerance)
+
+
+def parse_overrides(pairs: List[str]) -> Dict[str, str]:
+    overrides = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Expected NAME=VALUE, got {pair!r}")
+        overrides[name.upper()] = value
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--golden", help="golden set (JSON Lines)")
+    parser.add_argument("--offline", action="store_true", help="evaluate on a generated corpus with stand-in services")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--page-tolerance", type=int, default=0, help="pages a hit may be off by")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="settings override")
+    parser.add_argument("--chunk-size", type=int, help="offline: characters per chunk")
+    parser.add_argument("--chunk-overlap", type=int, help="offline: characters of overlap between chunks")
+    parser.add_argument("--documents", type=int, default=2, help="offline: number of generated PDFs")
+    parser.add_argument("--pages", type=int, default=20, help="offline: pages per PDF")
+    parser.add_argument("--chars-per-page", type=int, default=2500)
+    parser.add_argument("--questions-per-page", type=int, default=2)
+    parser.add_argument("--question-words", type=int, default=12)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--save-golden", help="offline: write the sampled questions here")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+    if not args.offline and not args.golden:
+        parser.error("pass --golden, --offline or both")
+
+    overrides = parse_overrides(args.set)
+    if args.offline:
+        questions, results = run_offline(args, overrides)
+    else:
+        os.environ.update(overrides)
+        questions = load_golden(args.golden)
+        results = evaluate(questions, args.k, args.page_tolerance)
+
+    params = {**vars(args), "golden_sha256": golden_digest(questions), "overrides": overrides}
+    write_results(args.json, "retrieval_eval", params, results)
+
+
+if __name__ == "__main__":
+    main()
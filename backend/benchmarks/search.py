@@ -0,0 +1,76 @@
+"""Time VectorStore.search_similar against collections of increasing size.
+
+    python -m benchmarks.search --sizes 10000 100000 1000000 --dim 384 --json results/search.json
+
+Each size gets a fresh in-process Qdrant (local mode) behind the app's
+VectorStore, so the numbers include the app's query path (vector fitting,
+search params, result conversion). Local mode searches exhaustively, which
+makes this a worst case for large collections; pass --url to measure a server.
+At 1M points x 384 dimensions expect a few GB of RAM.
+"""
+import argparse
+import os
+
+from benchmarks.common import latency_summary, synthetic_corpus, synthetic_queries, timed, upload_corpus, write_results
+
+
+def run(args) -> list:
+    os.environ.update({
+        "QDRANT_API_URL": args.url or ":memory:",
+        "EMBEDDING_DIMENSIONS": str(args.dim),
+        "QDRANT_COLLECTION": "bench_search",
+    })
+    from app.services.vector_store import VectorStore, physical_collection_name
+
+    results = []
+    for size in args.sizes:
+        store = VectorStore()
+        store.initialize_collection()
+        corpus = synthetic_corpus(size, args.dim)
+        queries = synthetic_queries(corpus, args.queries)
+        _, upload_seconds = timed(upload_corpus, store.client, store.collection_name, corpus)
+
+        for query in queries[:5]:
+            store.search_similar(query.tolist(), limit=args.k)
+        latencies = []
+        for query in queries:
+            _, elapsed = timed(store.search_similar, query.tolist(), limit=args.k)
+            latencies.append(elapsed)
+
+        summary = latency_summary(latencies)
+        row = {
+            "points": size,
+            "dim": args.dim,
+            "upload_s": upload_seconds,
+            **summary,
+            "qps": 1000 / summary["mean_ms"] if summary["mean_ms"] else 0.0,
+        }
+        results.append(row)
+        print(
+            f"{size:>8} points  upload {upload_seconds:7.1f} s  "
+            f"p50 {row['p50_ms']:8.2f} ms  p95 {row['p95_ms']:8.2f} ms  p99 {row['p99_ms']:8.2f} ms  "
+            f"{row['qps']:7.1f} qps"
+        )
+        # Dropping the collection drops its alias, so the next size starts empty
+        store.client.delete_collection(physical_collection_name(store.collection_name, args.dim))
+        del corpus
+        store.client.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL (default: local mode)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    write_results(args.json, "search", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Run the offline benchmark suite and store results per commit.
+
+    python -m benchmarks.suite                 # full sizes
+    python -m benchmarks.suite --quick         # small sizes, for a smoke run
+    python -m benchmarks.compare results/<old>/search.json results/<new>/search.json
+
+Each benchmark runs in its own process (the app reads its configuration at
+import time) and writes `<output>/<commit>/<name>.json`.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.common import git_commit
+
+FULL = {
+    "chunking": [],
+    "pdf_extract": [],
+    "ingest": [],
+    "search": [],
+}
+QUICK = {
+    "chunking": ["--sizes", "10000", "100000", "--repeats", "5"],
+    "pdf_extract": ["--pages", "5", "20", "--repeats", "2"],
+    "ingest": ["--pages", "5", "20", "--dim", "256", "--repeats", "1"],
+    "search": ["--sizes", "1000", "10000", "--dim", "128", "--queries", "50"],
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="results")
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--only", nargs="+", choices=sorted(FULL), help="run a subset")
+    args = parser.parse_args(argv)
+
+    directory = os.path.join(args.output, git_commit() or "working-tree")
+    plan = QUICK if args.quick else FULL
+    failed = []
+    for name, extra in plan.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"== {name}")
+        command = [sys.executable, "-m", f"benchmarks.{name}", *extra, "--json", os.path.join(directory, f"{name}.json")]
+        if subprocess.run(command).returncode != 0:
+            failed.append(name)
+    if failed:
+        sys.exit(f"Failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Compare REST and gRPC latency for upserts and searches at several batch sizes.
+
+    python -m benchmarks.transport --url http://localhost:6333
+    python -m benchmarks.transport --url http://localhost:6333 --batch-sizes 1 16 64 256 --json results/transport.json
+
+Each transport gets its own collection. Upserts are timed per batch of points
+and searches per batch of queries (query_batch_points). Without --url the
+benchmark runs once against Qdrant's in-process local mode, which has no wire
+transport; that only validates the harness and gives a floor for the
+client-side overhead.
+"""
+import argparse
+import uuid
+
+from qdrant_client.models import Distance, VectorParams, PointStruct, QueryRequest
+
+from benchmarks.common import (
+    synthetic_corpus, synthetic_queries, latency_summary, make_client, upload_corpus, timed, write_results
+)
+from benchmarks.quantization import wait_for_indexing
+
+
+def bench_upserts(client, collection: str, corpus, batch_size: int, repeats: int) -> list:
+    latencies = []
+    for r in range(repeats):
+        start = (r * batch_size) % max(len(corpus) - batch_size, 1)
+        points = [
+            PointStruct(id=str(uuid.uuid4()), vector=corpus[i].tolist(), payload={"chunk_index": i})
+            for i in range(start, start + batch_size)
+        ]
+        _, elapsed = timed(client.upsert, collection_name=collection, points=points, wait=True)
+        latencies.append(elapsed)
+    return latencies
+
+
+def bench_searches(client, collection: str, queries, batch_size: int, repeats: int, k: int) -> list:
+    latencies = []
+    for r in range(repeats):
+        start = (r * batch_size) % max(len(queries) - batch_size, 1)
+        batch = queries[start:start + batch_size]
+        if batch_size == 1:
+            _, elapsed = timed(
+                client.query_points, collection_name=collection, query=batch[0].tolist(), limit=k
+            )
+        else:
+            _, elapsed = timed(
+                client.query_batch_points,
+                collection_name=collection,
+                requests=[QueryRequest(query=q.tolist(), limit=k) for q in batch]
+            )
+        latencies.append(elapsed)
+    return latencies
+
+
+def run(args) -> list:
+    corpus = synthetic_corpus(args.points, args.dim)
+    queries = synthetic_queries(corpus, max(args.batch_sizes) * 4)
+    transports = [("rest", False), ("grpc", True)] if args.url else [("local", False)]
+
+    results = []
+    for name, prefer_grpc in transports:
+        client = make_client(
+            args.url, prefer_grpc=prefer_grpc, grpc_port=args.grpc_port,
+            timeout=args.timeout, pool_size=args.pool_size
+        )
+        collection = f"bench_transport_{name}"
+        if client.collection_exists(collection):
+            client.delete_collection(collection)
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE)
+        )
+        upload_corpus(client, collection, corpus)
+        if args.url:
+            wait_for_indexing(client, collection)
+
+        # Warm up connections (and gRPC channels) before timing
+        for _ in range(5):
+            client.query_points(collection_name=collection, query=queries[0].tolist(), limit=args.k)
+
+        for batch_size in args.batch_sizes:
+            for operation in ("upsert", "search"):
+                if operation == "upsert":
+                    latencies = bench_upserts(client, collection, corpus, batch_size, args.repeats)
+                else:
+                    latencies = bench_searches(client, collection, queries, batch_size, args.repeats, args.k)
+                summary = latency_summary(latencies)
+                row = {
+                    "transport": name,
+                    "operation": operation,
+                    "batch_size": batch_size,
+                    **summary,
+                    "per_item_ms": summary["mean_ms"] / batch_size,
+                }
+                results.append(row)
+                print(
+                    f"{name:>5} {operation:>6} batch {batch_size:>4}  "
+                    f"p50 {row['p50_ms']:8.2f} ms  p99 {row['p99_ms']:8.2f} ms  "
+                    f"per item {row['per_item_ms']:7.3f} ms"
+                )
+
+        client.delete_collection(collection)
+        client.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL (default: local mode)")
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--pool-size", type=int)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 256])
+    parser.add_argument("--repeats", type=int, default=50, help="timed calls per operation and batch size")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+    write_results(args.json, "transport", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Export every point of the Qdrant collection to an archive directory.
+
+Usage (from the backend directory):
+
+    python -m scripts.export_vectors backups/2026-10-19
+
+The archive holds the vectors as .npy plus the payloads as JSON lines, enough to
+rebuild the collection with scripts.import_vectors without re-embedding.
+"""
+import argparse
+
+from app.core.config import settings
+from app.services.vector_archive import export_collection
+from app.services.vector_store import vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="archive directory to write")
+    parser.add_argument("--collection", default=settings.qdrant_collection, help="collection or alias to export")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    export_collection(vector_store.client, args.collection, args.path, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Rebuild a Qdrant collection from an archive made by scripts.export_vectors.
+
+Usage (from the backend directory):
+
+    python -m scripts.import_vectors backups/2026-10-19 --switch-alias
+
+Points are loaded into a fresh collection and checked against the
+document_chunks table. With --switch-alias the app's collection alias is
+pointed at the new collection once loading completes.
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.collection_migration import CollectionMigrator
+from app.services.vector_archive import import_collection, read_manifest
+from app.services.vector_store import physical_collection_name, vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="archive directory to read")
+    parser.add_argument("--collection", help="name of the collection to create (default: derived from the alias)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4, help="parallel upsert batches")
+    parser.add_argument("--skip-orphans", action="store_true", help="drop points that have no DocumentChunk")
+    parser.add_argument("--no-reconcile", action="store_true", help="skip the DocumentChunk check")
+    parser.add_argument("--switch-alias", action="store_true", help=f"point {settings.qdrant_collection} at the import")
+    args = parser.parse_args()
+
+    manifest = read_manifest(args.path)
+    collection = args.collection or physical_collection_name(
+        settings.qdrant_collection, manifest["vector_size"], time.strftime("%Y%m%d%H%M%S")
+    )
+
+    db = None if args.no_reconcile else SessionLocal()
+    try:
+        import_collection(
+            vector_store.client, args.path, collection, db=db,
+            skip_orphans=args.skip_orphans, batch_size=args.batch_size, workers=args.workers
+        )
+    finally:
+        if db is not None:
+            db.close()
+
+    if args.switch_alias:
+        CollectionMigrator(vector_store.client, settings.qdrant_collection).switch_alias(collection)
+
+
+if __name__ == "__main__":
+    main()
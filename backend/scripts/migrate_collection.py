@@ -0,0 +1,53 @@
+"""Migrate the Qdrant collection to a new embedding size without downtime.
+
+Usage (from the backend directory):
+
+    python -m scripts.migrate_collection --dimensions 512 --mode truncate
+
+The app keeps serving from the current collection while the new one is built;
+the `QDRANT_COLLECTION` alias is switched over once the copy is complete. Set
+EMBEDDING_DIMENSIONS to the new size afterwards so new embeddings are requested
+at that size.
+
+Points added, changed or deleted during the copy are carried over before the
+switch, but writes in the moment between the last catch-up pass and the switch
+are not: pause uploads and deletions while migrating, or run
+`python -m scripts.reconcile_vectors` afterwards.
+"""
+import argparse
+
+from app.core.config import settings
+from app.services.chunk_content import get_chunk_content_store
+from app.services.collection_migration import CollectionMigrator
+from app.services.embeddings import embedding_service
+from app.services.vector_store import vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dimensions", type=int, required=True, help="vector size of the new collection")
+    parser.add_argument(
+        "--mode", choices=["truncate", "reembed"], default="truncate",
+        help="truncate and renormalize existing vectors, or re-embed the stored content"
+    )
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--drop-legacy", action="store_true",
+        help="allow replacing a pre-alias collection named like the alias (brief unavailability)"
+    )
+    args = parser.parse_args()
+
+    migrator = CollectionMigrator(
+        vector_store.client,
+        settings.qdrant_collection,
+        embed=lambda texts, dims: embedding_service.get_embeddings(texts, dimensions=dims),
+        contents=get_chunk_content_store().get_contents
+    )
+    target = migrator.migrate(
+        args.dimensions, mode=args.mode, batch_size=args.batch_size, drop_legacy=args.drop_legacy
+    )
+    print(f"Migration complete: {settings.qdrant_collection} now serves {target}")
+
+
+if __name__ == "__main__":
+    main()
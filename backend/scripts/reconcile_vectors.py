@@ -0,0 +1,48 @@
+"""Find and repair drift between Qdrant points and the document_chunks table.
+
+Usage (from the backend directory):
+
+    python -m scripts.reconcile_vectors                      # report only
+    python -m scripts.reconcile_vectors --delete-orphans     # drop points without a chunk
+    python -m scripts.reconcile_vectors --reembed-dangling   # recreate missing points
+
+Both sides are streamed, so this is safe to run against large collections.
+Can be scheduled periodically (e.g. from cron).
+"""
+import argparse
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.embeddings import embedding_service
+from app.services.reconciler import VectorReconciler
+from app.services.vector_store import vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delete-orphans", action="store_true", help="delete points that have no chunk row")
+    parser.add_argument("--reembed-dangling", action="store_true", help="re-embed chunks that have no point")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--grace-seconds", type=float, default=60.0,
+        help="minimum age of an orphan before deletion, to spare in-progress uploads"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        reconciler = VectorReconciler(
+            vector_store.client,
+            settings.qdrant_collection,
+            db,
+            batch_size=args.batch_size,
+            grace_seconds=args.grace_seconds,
+            embed=embedding_service.get_embeddings
+        )
+        reconciler.run(delete_orphans=args.delete_orphans, reembed_dangling=args.reembed_dangling)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Rewrite existing Qdrant payloads to the slim (or back to the full) layout.
+
+Usage (from the backend directory):
+
+    python -m scripts.slim_payloads                # drop content, add document_id
+    python -m scripts.slim_payloads --mode full    # restore content from Postgres
+
+Set QDRANT_PAYLOAD_MODE=slim first so new uploads are written the same way;
+search results are hydrated from document_chunks whichever layout a point has,
+so the rewrite can run while the app is serving.
+"""
+import argparse
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.payload_migration import rewrite_payloads
+from app.services.vector_store import vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["slim", "full"], default="slim")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rewrite_payloads(
+            vector_store.client, settings.qdrant_collection, db, mode=args.mode, batch_size=args.batch_size
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,44 @@ import pytest
 import os
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
-from app.main import app
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
-# Set test environment variables
+# Set test environment variables; settings are read on first use, after this
 os.environ["OPENAI_API_KEY"] = "test_key_for_testing"
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 os.environ["QDRANT_API_URL"] = "http://localhost:6333"
 os.environ["DEBUG"] = "True"
 
+from app.main import app
+from app.db.database import engine_options, get_db
+from app.db.models import Base
+
 @pytest.fixture
 def client():
     """Test client fixture."""
     return TestClient(app)
 
+@pytest.fixture
+def db_session_factory(tmp_path):
+    """Serve the API's database sessions from a fresh SQLite file; returns its session factory."""
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(url, **engine_options(url))
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield factory
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
 @pytest.fixture
 def mock_rag_chain():
     """Mock the RAG chain for testing."""
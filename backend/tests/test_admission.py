@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.core.admission import AdmissionController, Overloaded, PriorityClass, current_priority, get_admission
+
+
+def make_controller(limit=1, chat_queue=4, ingest_active=1, ingest_queue=4, max_wait=1.0):
+    return AdmissionController(
+        limit=limit,
+        classes={
+            "chat": PriorityClass("chat", priority=0, max_active=limit, max_queue=chat_queue),
+            "ingest": PriorityClass("ingest", priority=1, max_active=ingest_active, max_queue=ingest_queue),
+        },
+        max_wait=max_wait
+    )
+
+
+class TestAdmissionController:
+    """Test the prioritized concurrency limiter."""
+
+    def test_slot_sets_priority_and_releases(self):
+        """A slot marks the work's class and frees itself on exit."""
+        controller = make_controller()
+
+        async def run():
+            async with controller.slot("chat"):
+                assert current_priority.get() == "chat"
+                assert controller.stats()["chat"]["active"] == 1
+            assert current_priority.get() is None
+
+        asyncio.run(run())
+        assert controller.active == 0
+
+    def test_chat_waiters_go_before_ingest(self):
+        """A freed slot goes to queued chat before queued ingestion."""
+        controller = make_controller(limit=1)
+        order = []
+
+        async def work(name):
+            async with controller.slot(name):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await controller.acquire("ingest")
+            tasks = [asyncio.create_task(work("ingest")), asyncio.create_task(work("chat"))]
+            await asyncio.sleep(0.01)
+            controller.release("ingest", 0.01)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order == ["chat", "ingest"]
+
+    def test_full_queue_rejects_immediately(self):
+        """With the queue full a request gets 429 and a Retry-After at once."""
+        controller = make_controller(limit=1, chat_queue=1)
+
+        async def run():
+            await controller.acquire("chat")
+            waiting = asyncio.create_task(controller.acquire("chat"))
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded) as info:
+                await controller.acquire("chat")
+            controller.release("chat", 0.5)
+            await waiting
+            return info.value
+
+        error = asyncio.run(run())
+        assert error.status_code == 429
+        assert error.retry_after >= 1
+
+    def test_wait_timeout_returns_503(self):
+        """A request queued longer than max_wait gives up with 503 and leaves the queue."""
+        controller = make_controller(limit=1, max_wait=0.05)
+
+        async def run():
+            await controller.acquire("chat")
+            with pytest.raises(Overloaded) as info:
+                await controller.acquire("chat")
+            return info.value
+
+        error = asyncio.run(run())
+        assert error.status_code == 503
+        assert controller.stats()["chat"] == {"active": 1, "queued": 0, "max_active": 1}
+
+    def test_ingest_cannot_take_every_slot(self):
+        """Ingestion is capped below the total so chat always finds room."""
+        controller = make_controller(limit=3, ingest_active=1, ingest_queue=0)
+
+        async def run():
+            await controller.acquire("ingest")
+            with pytest.raises(Overloaded):
+                await controller.acquire("ingest")
+            await controller.acquire("chat")
+            await controller.acquire("chat")
+
+        asyncio.run(run())
+        assert controller.stats()["chat"]["active"] == 2
+        assert controller.stats()["ingest"]["active"] == 1
+
+
+class TestAdmissionEndpoints:
+    """Test admission control on the API."""
+
+    def test_saturated_chat_returns_429_with_retry_after(self, client):
+        """A full chat queue is answered with 429 before any work is done."""
+        controller = make_controller(limit=1, chat_queue=0)
+        controller.active = controller.classes["chat"].active = 1
+        with patch.object(get_admission, "_instance", controller), \
+                patch("app.api.chat.rag_chain") as mock_chain:
+            response = client.post("/chat/", json={"query": "What is a filter?"})
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        mock_chain.generate_response.assert_not_called()
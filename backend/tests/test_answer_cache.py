@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.services.answer_cache import SemanticAnswerCache
+
+
+def _result(embedding_id="vec-1", filename="minilogue.pdf"):
+    return {
+        "response": "Hold WRITE and pick a program slot.",
+        "relevant_chunks": [
+            {"id": embedding_id, "score": 0.9, "payload": {"filename": filename, "page_number": 12}}
+        ]
+    }
+
+
+class TestSemanticAnswerCache:
+    """Test cases for SemanticAnswerCache."""
+
+    @pytest.fixture
+    def cache(self):
+        return SemanticAnswerCache(threshold=0.95, ttl_seconds=3600, max_entries=2)
+
+    def test_similar_query_hits(self, cache):
+        """Test that a near-identical embedding in the same scope returns the cached answer."""
+        cache.store([1.0, 0.0, 0.0], "*:5", _result())
+
+        result = cache.lookup([0.99, 0.05, 0.0], "*:5")
+
+        assert result is not None
+        assert result["response"] == "Hold WRITE and pick a program slot."
+        assert cache.stats()["hits"] == 1
+
+    def test_dissimilar_query_misses(self, cache):
+        """Test that an embedding below the threshold misses."""
+        cache.store([1.0, 0.0, 0.0], "*:5", _result())
+
+        assert cache.lookup([0.0, 1.0, 0.0], "*:5") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_scope_is_respected(self, cache):
+        """Test that entries are only returned for the scope they were stored in."""
+        cache.store([1.0, 0.0, 0.0], "doc-1:5", _result())
+
+        assert cache.lookup([1.0, 0.0, 0.0], "doc-2:5") is None
+
+    def test_invalidate_by_embedding_id(self, cache):
+        """Test that deleting a cited chunk drops the entry."""
+        cache.store([1.0, 0.0, 0.0], "*:5", _result(embedding_id="vec-1"))
+
+        assert cache.invalidate_embeddings(["vec-1"]) == 1
+        assert cache.lookup([1.0, 0.0, 0.0], "*:5") is None
+
+    def test_invalidate_by_filename(self, cache):
+        """Test that replacing a cited document drops the entry."""
+        cache.store([1.0, 0.0, 0.0], "*:5", _result(filename="minilogue.pdf"))
+
+        assert cache.invalidate_filename("other.pdf") == 0
+        assert cache.invalidate_filename("minilogue.pdf") == 1
+        assert cache.stats()["entries"] == 0
+
+    def test_upload_drops_every_scope(self, cache):
+        """Test that a new document invalidates answers in every scope, including ones citing nothing."""
+        cache.store([1.0, 0.0, 0.0], "*:5", {"response": "I don't have enough information.", "relevant_chunks": []})
+        cache.store([0.0, 1.0, 0.0], "doc-1:5", _result(filename="minilogue.pdf"))
+
+        assert cache.invalidate_upload() == 2
+        assert cache.lookup([1.0, 0.0, 0.0], "*:5") is None
+        assert cache.lookup([0.0, 1.0, 0.0], "doc-1:5") is None
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test that the cache stays within max_entries."""
+        cache.store([1.0, 0.0, 0.0], "*:5", _result("a"))
+        cache.store([0.0, 1.0, 0.0], "*:5", _result("b"))
+        cache.lookup([1.0, 0.0, 0.0], "*:5")
+        cache.store([0.0, 0.0, 1.0], "*:5", _result("c"))
+
+        assert cache.stats()["entries"] == 2
+        assert cache.lookup([1.0, 0.0, 0.0], "*:5") is not None
+        assert cache.lookup([0.0, 1.0, 0.0], "*:5") is None
+
+    def test_zero_vector_is_not_cached(self, cache):
+        """Test that zero vectors (embeddings disabled) are never cached."""
+        cache.store([0.0, 0.0, 0.0], "*:5", _result())
+
+        assert cache.stats()["entries"] == 0
+
+
+class TestChainAnswerCaching:
+    """Test the answer cache as used by the RAG chain."""
+
+    def run_query(self, cache, document_id):
+        from app.rag.chain import RAGChain
+        from app.core.metrics import StageTimer
+
+        chain = RAGChain()
+        chain.generate_response = MagicMock(return_value="Hold WRITE.")
+        with patch("app.rag.chain.get_answer_cache", return_value=cache), \
+                patch("app.rag.chain.embedding_service") as embedding_service, \
+                patch("app.rag.chain.vector_store") as vector_store, \
+                patch("app.rag.chain.get_chunk_content_store") as get_chunk_content_store:
+            embedding_service.get_query_embedding.return_value = [1.0, 0.0]
+            get_chunk_content_store.return_value.hydrate.return_value = _result()["relevant_chunks"]
+            return chain._run_stages(StageTimer("rag"), "How do I save a patch?", 5, document_id)
+
+    def test_upload_after_document_scoped_query_misses(self):
+        """Test that an upload invalidates answers cached for a single document."""
+        cache = SemanticAnswerCache(threshold=0.95)
+        assert self.run_query(cache, "doc-1")["cache_hit"] is False
+        assert self.run_query(cache, "doc-1")["cache_hit"] is True
+
+        cache.invalidate_upload()
+
+        assert self.run_query(cache, "doc-1")["cache_hit"] is False
@@ -0,0 +1,239 @@
+import fnmatch
+import os
+import sqlite3
+import time
+
+import pytest
+
+from app.core.providers import Provider
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.cache_backends import CacheBackend, InMemoryLRUBackend, RedisBackend, SQLiteBackend
+from app.services.embedding_cache import QueryEmbeddingCache
+
+
+class FakeRedis:
+    """Local stand-in for the subset of the redis-py client the backend uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        if key in self.expiry and self.expiry[key] < time.monotonic():
+            self.delete(key)
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        if ex is not None:
+            self.expiry[key] = time.monotonic() + ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def dbsize(self):
+        return len(self.data)
+
+
+class BrokenRedis(FakeRedis):
+    def get(self, key):
+        raise ConnectionError("connection refused")
+
+    def set(self, key, value, ex=None):
+        raise ConnectionError("connection refused")
+
+    def scan_iter(self, match="*", count=None):
+        raise ConnectionError("connection refused")
+
+    def dbsize(self):
+        raise ConnectionError("connection refused")
+
+
+def in_child(fn) -> int:
+    """Run `fn` in a forked child; returns its exit status."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os._exit(0 if fn() else 1)
+        except BaseException:
+            os._exit(2)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+class TestCacheBackend:
+    """Test the backend interface."""
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class GetOnly(CacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError, match="abstract"):
+            GetOnly()
+
+
+class TestSQLiteBackend:
+    """Test the cache shared by workers on one host."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "cache" / "embeddings.sqlite3")
+
+    def test_round_trip_and_stats(self, path):
+        """Values written are read back and counted."""
+        backend = SQLiteBackend(path)
+        backend.set("a", b"\x00\x01")
+        assert backend.get("a") == b"\x00\x01"
+        assert backend.get("missing") is None
+        assert backend.stats() == {"entries": 1, "bytes": 3}
+        backend.clear()
+        assert backend.get("a") is None
+
+    def test_stats_follow_overwrites_and_deletes(self, path):
+        """The running totals match the table after replacing, evicting and clearing entries."""
+        backend = SQLiteBackend(path)
+        backend.set("a", b"1")
+        backend.set("a", b"1234")
+        backend.set("b", b"12")
+        assert backend.stats() == {"entries": 2, "bytes": 8}
+        backend.clear()
+        assert backend.stats() == {"entries": 0, "bytes": 0}
+
+    def test_stats_counted_for_existing_file(self, path):
+        """A cache file written before the totals table existed is counted once on open."""
+        os.makedirs(os.path.dirname(path))
+        with sqlite3.connect(path) as connection:
+            connection.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL)")
+            connection.execute("INSERT INTO cache VALUES ('a', x'0001', 0)")
+        backend = SQLiteBackend(path)
+        assert backend.stats() == {"entries": 1, "bytes": 3}
+        backend.set("b", b"1")
+        assert backend.stats() == {"entries": 2, "bytes": 5}
+
+    def test_unopenable_file_degrades_to_misses(self, path):
+        """A cache file that cannot be opened behaves like an empty cache."""
+        os.makedirs(path)  # a directory where the file should be
+        backend = SQLiteBackend(path)
+        backend.set("a", b"1")
+        assert backend.get("a") is None
+        backend.clear()
+        assert backend.stats() == {}
+
+    def test_shared_between_instances(self, path):
+        """Separate backends on the same file (as in separate workers) share entries."""
+        SQLiteBackend(path).set("a", b"1")
+        assert SQLiteBackend(path).get("a") == b"1"
+
+    def test_ttl_expires_entries(self, path):
+        """Entries older than the TTL are misses."""
+        backend = SQLiteBackend(path, ttl_seconds=0.01)
+        backend.set("a", b"1")
+        time.sleep(0.02)
+        assert backend.get("a") is None
+
+    def test_evicts_oldest_beyond_max_entries(self, path, monkeypatch):
+        """The oldest writes are evicted down to the size limit."""
+        monkeypatch.setattr("app.services.cache_backends.EVICT_EVERY_SETS", 1)
+        backend = SQLiteBackend(path, max_entries=2)
+        for key in ("a", "b", "c"):
+            backend.set(key, b"1")
+            time.sleep(0.001)
+        assert backend.get("a") is None
+        assert backend.stats()["entries"] == 2
+
+    def test_usable_after_fork(self, path):
+        """A forked worker opens its own connection and sees the parent's writes."""
+        backend = SQLiteBackend(path)
+        backend.set("parent", b"1")
+
+        def child():
+            backend.set("child", b"2")
+            return backend.get("parent") == b"1"
+
+        assert in_child(child) == 0
+        assert backend.get("child") == b"2"
+
+
+class TestRedisBackend:
+    """Test the Redis backend against a local stand-in."""
+
+    def test_prefixed_keys_with_ttl(self):
+        """Keys are namespaced and carry the TTL."""
+        client = FakeRedis()
+        backend = RedisBackend(client, "synthbot:answers:", ttl_seconds=60)
+        backend.set("a", b"1")
+        assert client.data == {"synthbot:answers:a": b"1"}
+        assert backend.get("a") == b"1"
+        assert backend.stats()["entries"] == 1
+
+    def test_clear_only_touches_own_namespace(self):
+        """Clearing one cache leaves other prefixes alone."""
+        client = FakeRedis()
+        RedisBackend(client, "x:").set("a", b"1")
+        backend = RedisBackend(client, "y:")
+        backend.set("a", b"1")
+        backend.clear()
+        assert list(client.data) == ["x:a"]
+
+    def test_errors_degrade_to_misses(self):
+        """An unreachable server behaves like an empty cache."""
+        backend = RedisBackend(BrokenRedis(), "x:")
+        backend.set("a", b"1")
+        assert backend.get("a") is None
+        backend.clear()
+        assert backend.stats() == {}
+
+    def test_query_embeddings_shared_between_workers(self):
+        """A query embedded by one worker is a hit for another."""
+        client = FakeRedis()
+        first = QueryEmbeddingCache(RedisBackend(client, "q:"))
+        second = QueryEmbeddingCache(RedisBackend(client, "q:"))
+        first.get_or_compute("m", "save a patch", lambda text: [0.5, 0.25])
+        assert second.get_or_compute("m", "Save a patch", lambda text: pytest.fail("recomputed")) == [0.5, 0.25]
+
+
+class TestSharedAnswerCache:
+    """Test answers shared between workers through a backend."""
+
+    RESULT = {"response": "Hold WRITE.", "relevant_chunks": [{"id": "vec-1", "payload": {"filename": "a.pdf"}}]}
+
+    def test_answer_stored_by_one_worker_hits_in_another(self):
+        """The same query embedding is answered from the shared tier."""
+        shared = InMemoryLRUBackend()
+        first, second = SemanticAnswerCache(shared=shared), SemanticAnswerCache(shared=shared)
+        first.store([1.0, 0.0], "*:5", self.RESULT)
+
+        assert second.lookup([1.0, 0.0], "*:5") == self.RESULT
+        assert second.stats()["shared_hits"] == 1
+        # Copied into the local index, so similar queries now hit locally too
+        assert second.lookup([0.99, 0.05], "*:5") == self.RESULT
+        assert second.stats()["shared_hits"] == 1
+
+    def test_invalidation_reaches_other_workers(self):
+        """An invalidation in one worker drops answers everywhere."""
+        shared = InMemoryLRUBackend()
+        first, second = SemanticAnswerCache(shared=shared), SemanticAnswerCache(shared=shared)
+        first.store([1.0, 0.0], "*:5", self.RESULT)
+        assert second.lookup([1.0, 0.0], "*:5") is not None
+
+        first.invalidate_filename("a.pdf")
+
+        assert second.lookup([1.0, 0.0], "*:5") is None
+        assert first.lookup([1.0, 0.0], "*:5") is None
+
+
+class TestProviderFork:
+    """Test that lazily built clients are not shared with forked workers."""
+
+    def test_child_builds_its_own_instance(self):
+        provider = Provider(object)
+        parent_instance = provider()
+
+        assert in_child(lambda: provider() is not parent_instance) == 0
+        assert provider() is parent_instance
@@ -121,4 +121,16 @@ def test_chat_history_endpoint(mock_get_db, client):
     assert response.status_code == 200
     data = response.json()
     assert "chats" in data
-    assert "total" in data 
\ No newline at end of file
+    assert "total" in data 
+
+
+def test_cache_stats_schema(client):
+    """Test that the cache stats endpoint returns the documented sections and counters."""
+    response = client.get("/chat/cache/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"answers", "single_flight", "query_embeddings"}
+    assert set(data["answers"]) == {"entries", "hits", "shared_hits", "misses", "hit_ratio", "invalidations"}
+    assert set(data["single_flight"]) == {"in_flight", "executions", "coalesced"}
+    assert set(data["query_embeddings"]) == {"hits", "misses", "hit_ratio", "entries", "bytes", "coalesced"}
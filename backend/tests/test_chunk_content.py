@@ -0,0 +1,120 @@
+import threading
+import uuid
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.database import engine_options
+from app.db.models import Base, Conversation, Document, DocumentChunk
+from app.services.chunk_content import ChunkContentStore
+from app.services.embedding_cache import InMemoryLRUBackend
+from app.services.payload_migration import rewrite_payloads
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def chunks(session_factory):
+    """Three stored chunks; returns (document_id, embedding_ids)."""
+    db = session_factory()
+    document = Document(filename="f.pdf", original_filename="f.pdf", file_size=1, num_pages=1, num_chunks=3)
+    db.add(document)
+    db.flush()
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    for i, embedding_id in enumerate(ids):
+        db.add(DocumentChunk(
+            document_id=document.id, chunk_index=i, content=f"chunk {i}",
+            page_number=1, embedding_id=embedding_id
+        ))
+    db.commit()
+    document_id = str(document.id)
+    db.close()
+    return document_id, ids
+
+
+class TestChunkContentStore:
+    """Test cases for ChunkContentStore."""
+
+    def test_hydrate_fills_missing_content_only(self, session_factory, chunks):
+        """Test that slim results get their content and full results are untouched."""
+        _, ids = chunks
+        store = ChunkContentStore(session_factory, InMemoryLRUBackend(max_entries=10, ttl_seconds=0))
+        results = [
+            {"id": ids[0], "score": 0.9, "payload": {"chunk_index": 0}},
+            {"id": ids[1], "score": 0.8, "payload": {"content": "from payload"}},
+        ]
+
+        store.hydrate(results)
+
+        assert results[0]["payload"]["content"] == "chunk 0"
+        assert results[1]["payload"]["content"] == "from payload"
+
+    def test_cached_contents_skip_the_database(self, session_factory, chunks):
+        """Test that a second lookup is served from the cache."""
+        _, ids = chunks
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return session_factory()
+
+        store = ChunkContentStore(factory, InMemoryLRUBackend(max_entries=10, ttl_seconds=0))
+
+        assert store.get_contents(ids) == {ids[0]: "chunk 0", ids[1]: "chunk 1", ids[2]: "chunk 2"}
+        assert store.get_contents(ids[:2]) == {ids[0]: "chunk 0", ids[1]: "chunk 1"}
+        assert len(calls) == 1
+
+    def test_lookup_on_a_worker_thread_keeps_request_writes(self, tmp_path):
+        """Test that the RAG thread's session does not roll back a request's open transaction."""
+        url = f"sqlite:///{tmp_path / 'app.db'}"
+        engine = create_engine(url, **engine_options(url))
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        store = ChunkContentStore(session_factory, InMemoryLRUBackend(max_entries=10, ttl_seconds=0))
+
+        with session_factory() as session:
+            session.add(Conversation(title="Patch backup"))
+            session.flush()
+            worker = threading.Thread(target=store.get_contents, args=(["missing"],))
+            worker.start()
+            worker.join()
+            session.commit()
+
+        with session_factory() as session:
+            assert session.query(Conversation).count() == 1
+        engine.dispose()
+
+
+class TestRewritePayloads:
+    """Test cases for rewrite_payloads."""
+
+    def test_slim_and_back(self, session_factory, chunks):
+        """Test that content is dropped, document_id added, and both can be restored."""
+        document_id, ids = chunks
+        client = QdrantClient(":memory:")
+        client.create_collection("chunks", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+        orphan = str(uuid.uuid4())
+        client.upsert("chunks", points=[
+            PointStruct(id=embedding_id, vector=[1.0, 0.0], payload={"content": "x", "chunk_index": 0})
+            for embedding_id in ids + [orphan]
+        ])
+        db = session_factory()
+
+        stats = rewrite_payloads(client, "chunks", db, mode="slim", batch_size=2, log=lambda msg: None)
+
+        assert (stats["updated"], stats["unknown"]) == (3, 1)
+        payload = client.retrieve("chunks", [ids[0]])[0].payload
+        assert payload == {"chunk_index": 0, "document_id": document_id}
+        assert client.retrieve("chunks", [orphan])[0].payload["content"] == "x"
+
+        rewrite_payloads(client, "chunks", db, mode="full", log=lambda msg: None)
+
+        assert client.retrieve("chunks", [ids[2]])[0].payload["content"] == "chunk 2"
+        db.close()
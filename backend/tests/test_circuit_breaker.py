@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpen, is_failure
+from app.core.deadlines import DeadlineExceeded
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def fail(error=None):
+    raise error or ConnectionError("upstream down")
+
+
+class TestCircuitBreaker:
+    """Test failing fast on an unhealthy dependency."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Enough failures in a row open the circuit; later calls are not attempted."""
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30)
+        calls = []
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(lambda: calls.append(1) or fail())
+        with pytest.raises(CircuitOpen) as info:
+            breaker.call(lambda: calls.append(1))
+        assert len(calls) == 2
+        assert breaker.state == "open"
+        assert int(info.value.retry_after_header) >= 29
+
+    def test_success_resets_the_count(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        assert breaker.call(lambda: "ok") == "ok"
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        assert breaker.state == "closed"
+
+    def test_half_open_trial(self):
+        """After the reset period one trial call decides whether the circuit closes."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        time.sleep(0.06)
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        assert breaker.state == "open"
+        time.sleep(0.06)
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == "closed"
+
+    def test_client_errors_do_not_count(self):
+        """Bad requests say nothing about the dependency's health; timeouts and 429s do."""
+        assert not is_failure(StatusError(400))
+        assert is_failure(StatusError(429))
+        assert is_failure(StatusError(503))
+        assert is_failure(TimeoutError())
+
+        breaker = CircuitBreaker("test", failure_threshold=1)
+        with pytest.raises(StatusError):
+            breaker.call(fail, StatusError(400))
+        assert breaker.state == "closed"
+
+    def test_deadlines_and_interruptions_do_not_count(self):
+        """Running out of our own time budget, or being interrupted, does not open the circuit."""
+        assert not is_failure(DeadlineExceeded("llm"))
+        assert not is_failure(KeyboardInterrupt())
+
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+        for error in (DeadlineExceeded("embed"), KeyboardInterrupt()):
+            with pytest.raises(type(error)):
+                breaker.call(fail, error)
+        assert breaker.state == "closed"
+
+        # A half-open trial cut short by the deadline lets the next call try again
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+        time.sleep(0.06)
+        with pytest.raises(DeadlineExceeded):
+            breaker.call(fail, DeadlineExceeded("embed"))
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == "closed"
+
+    def test_disabled(self):
+        breaker = CircuitBreaker("test", failure_threshold=0)
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+        assert breaker.state == "closed"
@@ -0,0 +1,131 @@
+import hashlib
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.db.models import Chat, ChatCitation, Conversation, Document, DocumentChunk
+
+LONG_CONTENT = "Hold WRITE, then turn the PROGRAM knob to choose the slot to save into."
+
+
+@pytest.fixture
+def history(db_session_factory):
+    """Two chats citing three chunks, one of them twice; returns the conversation and chunk IDs."""
+    with db_session_factory() as db:
+        document = Document(filename="minilogue.pdf", original_filename="minilogue.pdf", file_size=1, num_pages=40)
+        conversation = Conversation(title="Saving patches")
+        db.add_all([document, conversation])
+        db.flush()
+        chunks = [
+            DocumentChunk(document_id=document.id, chunk_index=0, content=LONG_CONTENT, page_number=12,
+                          embedding_id="vec-0"),
+            DocumentChunk(document_id=document.id, chunk_index=1, content="Press EXIT.", page_number=13,
+                          embedding_id="vec-1"),
+            DocumentChunk(document_id=document.id, chunk_index=2, content="Names are 12 characters.",
+                          page_number=14, embedding_id="vec-2"),
+        ]
+        db.add_all(chunks)
+        db.flush()
+        started = datetime(2026, 1, 1)
+        for i, cited in enumerate([chunks[:2], [chunks[0], chunks[2]]]):
+            chat = Chat(user_query=f"q{i}", ai_response=f"a{i}", response_time=0.1, conversation_id=conversation.id,
+                        created_at=started + timedelta(minutes=i))
+            chat.citations = [ChatCitation(chunk_id=chunk.id, relevance_score=0.9) for chunk in cited]
+            db.add(chat)
+        db.commit()
+        return conversation.id, [chunk.id for chunk in chunks]
+
+
+def citation_contents(chats):
+    return [[citation["content"] for citation in chat["citations"]] for chat in chats]
+
+
+class TestCitationModes:
+    """Test how history and conversation endpoints render cited chunks."""
+
+    @pytest.fixture(params=["history", "conversation"])
+    def fetch(self, request, client, history):
+        conversation_id, _ = history
+
+        def fetch(**params):
+            if request.param == "history":
+                response = client.get("/chat/history", params={"conversation_id": conversation_id, **params})
+            else:
+                response = client.get(f"/conversations/{conversation_id}", params=params)
+            assert response.status_code == 200
+            data = response.json()
+            # History lists newest first, conversations oldest first
+            chats = sorted(data["chats"], key=lambda chat: chat["created_at"])
+            return chats, data["chunks"]
+
+        return fetch
+
+    def test_full(self, fetch):
+        chats, chunks = fetch()
+        assert citation_contents(chats) == [
+            [LONG_CONTENT, "Press EXIT."], [LONG_CONTENT, "Names are 12 characters."]
+        ]
+        assert chunks is None
+
+    def test_ref_lists_each_chunk_once(self, fetch, history):
+        _, chunk_ids = history
+        chats, chunks = fetch(citations="ref")
+        assert citation_contents(chats) == [[None, None], [None, None]]
+        assert [c["chunk_id"] for c in chats[1]["citations"]] == [chunk_ids[0], chunk_ids[2]]
+        assert sorted(chunks) == sorted(chunk_ids)
+        assert chunks[chunk_ids[0]]["content"] == LONG_CONTENT
+        assert chunks[chunk_ids[0]]["page_number"] == 12
+
+    def test_ref_without_chunks(self, fetch):
+        chats, chunks = fetch(citations="ref", include_chunks=False)
+        assert citation_contents(chats) == [[None, None], [None, None]]
+        assert chunks is None
+
+    def test_snippet_truncates_long_content(self, fetch):
+        with patch.object(settings, "citation_snippet_chars", 11):
+            chats, chunks = fetch(citations="snippet")
+        assert citation_contents(chats) == [
+            ["Hold WRITE,…", "Press EXIT."], ["Hold WRITE,…", "Names are 1…"]
+        ]
+        assert chunks is None
+
+
+class TestGetChunk:
+    """Test fetching a single chunk with HTTP caching."""
+
+    def expected_etag(self, db_session_factory, chunk_id):
+        with db_session_factory() as db:
+            chunk = db.get(DocumentChunk, chunk_id)
+            fields = (chunk.id, chunk.document_id, chunk.chunk_index, chunk.page_number, chunk.content)
+        digest = hashlib.sha256(b"".join(str(value).encode("utf-8") + b"\0" for value in fields))
+        return f'"{digest.hexdigest()[:32]}"'
+
+    def test_returns_chunk_with_etag(self, client, db_session_factory, history):
+        _, chunk_ids = history
+        response = client.get(f"/chunks/{chunk_ids[0]}")
+        assert response.status_code == 200
+        assert response.json()["content"] == LONG_CONTENT
+        assert response.headers["ETag"] == self.expected_etag(db_session_factory, chunk_ids[0])
+        assert "max-age" in response.headers["Cache-Control"]
+        # Stable across requests, distinct between chunks
+        assert client.get(f"/chunks/{chunk_ids[0]}").headers["ETag"] == response.headers["ETag"]
+        assert client.get(f"/chunks/{chunk_ids[1]}").headers["ETag"] != response.headers["ETag"]
+
+    def test_if_none_match(self, client, history):
+        _, chunk_ids = history
+        etag = client.get(f"/chunks/{chunk_ids[0]}").headers["ETag"]
+
+        for header in (etag, f'"other", {etag}', f'"other",W/{etag}', "*"):
+            response = client.get(f"/chunks/{chunk_ids[0]}", headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["ETag"] == etag
+
+        for header in ('"other"', 'W/"other"'):
+            response = client.get(f"/chunks/{chunk_ids[0]}", headers={"If-None-Match": header})
+            assert response.status_code == 200
+
+    def test_unknown_chunk(self, client, history):
+        assert client.get("/chunks/missing").status_code == 404
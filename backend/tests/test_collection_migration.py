@@ -0,0 +1,69 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import CreateAlias, CreateAliasOperation, Distance, PointStruct, VectorParams
+
+from app.services.collection_migration import CollectionMigrator
+
+
+def vector(i):
+    return [1.0, float(i), 0.5, 0.25]
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(":memory:")
+    client.create_collection("chunks_4d", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    client.update_collection_aliases(change_aliases_operations=[
+        CreateAliasOperation(create_alias=CreateAlias(collection_name="chunks_4d", alias_name="chunks"))
+    ])
+    return client
+
+
+class TestCollectionMigrator:
+    """Test rebuilding the aliased collection while it is written to."""
+
+    def test_writes_during_the_copy_are_carried_over(self, client):
+        """Points added, updated in place or deleted while copying end up as in the source."""
+        ids = [str(uuid.uuid4()) for _ in range(12)]
+        client.upsert("chunks_4d", points=[
+            PointStruct(id=point_id, vector=vector(i), payload={"chunk_index": i}) for i, point_id in enumerate(ids)
+        ])
+        added = str(uuid.uuid4())
+
+        migrator = CollectionMigrator(client, "chunks", log=lambda message: None)
+        bulk_copy = migrator._copy
+
+        def copy_then_write(*args):
+            copied = bulk_copy(*args)
+            client.upsert("chunks_4d", points=[
+                PointStruct(id=ids[0], vector=vector(40), payload={"chunk_index": 0, "page_number": 9}),
+                PointStruct(id=added, vector=vector(50), payload={"chunk_index": 50}),
+            ])
+            client.delete("chunks_4d", points_selector=[ids[1]])
+            return copied
+
+        with patch.object(migrator, "_copy", copy_then_write):
+            target = migrator.migrate(3, batch_size=5)
+
+        assert migrator.resolve_alias() == target
+        assert client.count(target).count == 12
+        assert client.retrieve(target, [ids[1]]) == []
+        assert client.retrieve(target, [added])[0].payload == {"chunk_index": 50}
+        updated = client.retrieve(target, [ids[0]], with_vectors=True)[0]
+        assert updated.payload == {"chunk_index": 0, "page_number": 9}
+        original = client.retrieve(target, [ids[2]], with_vectors=True)[0]
+        assert len(updated.vector) == 3
+        assert updated.vector != pytest.approx(original.vector, abs=1e-3)
+
+    def test_catch_up_is_a_no_op_for_an_exact_copy(self, client):
+        client.upsert("chunks_4d", points=[
+            PointStruct(id=str(uuid.uuid4()), vector=vector(i), payload={"chunk_index": i}) for i in range(7)
+        ])
+        client.create_collection("copy", vectors_config=VectorParams(size=3, distance=Distance.COSINE))
+        migrator = CollectionMigrator(client, "chunks", log=lambda message: None)
+        migrator._copy("chunks_4d", "copy", 3, "truncate", 3)
+
+        assert migrator._catch_up("chunks_4d", "copy", 3, "truncate", 3) == 0
@@ -0,0 +1,97 @@
+import importlib.util
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import func, text
+
+from app.db.models import Chat, Conversation
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def send_chat(client, query, conversation_id=None):
+    response = client.post("/chat/", json={"query": query, "conversation_id": conversation_id})
+    assert response.status_code == 200
+    return response.json()["conversation_id"]
+
+
+class TestConversationCounters:
+    """Test the denormalized message_count and last_message_at columns."""
+
+    def test_counts_and_ordering_follow_chats(self, client, db_session_factory, mock_rag_chain):
+        """Each chat bumps its conversation's counter and moves it to the top of the list."""
+        first = send_chat(client, "How do I save a patch?")
+        second = send_chat(client, "What does the filter cutoff do?")
+        send_chat(client, "And the resonance?", conversation_id=second)
+        send_chat(client, "Where is the WRITE button?", conversation_id=first)
+        send_chat(client, "Can I rename a patch?", conversation_id=first)
+
+        data = client.get("/conversations/").json()
+        assert [c["id"] for c in data["conversations"]] == [first, second]
+        assert [c["message_count"] for c in data["conversations"]] == [3, 2]
+        assert data["total"] == 2
+
+        with db_session_factory() as db:
+            for summary in data["conversations"]:
+                conversation = db.get(Conversation, summary["id"])
+                chats = db.query(Chat).filter(Chat.conversation_id == summary["id"])
+                assert conversation.message_count == chats.count()
+                assert conversation.last_message_at == db.query(func.max(Chat.created_at)).filter(
+                    Chat.conversation_id == summary["id"]
+                ).scalar()
+
+    def test_history_total_uses_the_counter(self, client, db_session_factory, mock_rag_chain):
+        conversation_id = send_chat(client, "How do I save a patch?")
+        send_chat(client, "Where is the WRITE button?", conversation_id=conversation_id)
+
+        data = client.get("/chat/history", params={"conversation_id": conversation_id}).json()
+        assert data["total"] == 2
+        assert len(data["chats"]) == 2
+
+    def test_unknown_conversation_is_404_without_counting(self, client, db_session_factory, mock_rag_chain):
+        response = client.post("/chat/", json={"query": "Hello?", "conversation_id": "missing"})
+        assert response.status_code == 404
+        with db_session_factory() as db:
+            assert db.query(Conversation).count() == 0
+
+
+class TestCounterBackfill:
+    """Test the migration that adds and backfills the counters."""
+
+    def run_upgrade(self, connection):
+        spec = importlib.util.spec_from_file_location(
+            "add_conversation_counters", MIGRATIONS / "c3d4e5f6a7b8_add_conversation_counters.py"
+        )
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+
+    def test_backfill_matches_chat_counts(self, db_session_factory):
+        with db_session_factory() as db:
+            busy, quiet, empty = Conversation(title="busy"), Conversation(title="quiet"), Conversation(title="empty")
+            db.add_all([busy, quiet, empty])
+            db.flush()
+            for i in range(3):
+                db.add(Chat(user_query=f"q{i}", ai_response="a", response_time=0.1, conversation_id=busy.id))
+            db.add(Chat(user_query="q", ai_response="a", response_time=0.1, conversation_id=quiet.id))
+            db.commit()
+            engine = db.get_bind()
+
+        # Back to the schema before the migration
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE conversations DROP COLUMN message_count"))
+            connection.execute(text("ALTER TABLE conversations DROP COLUMN last_message_at"))
+            self.run_upgrade(connection)
+
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT c.message_count, c.last_message_at, COUNT(chats.id), MAX(chats.created_at) "
+                "FROM conversations c LEFT JOIN chats ON chats.conversation_id = c.id GROUP BY c.id"
+            )).all()
+        assert len(rows) == 3
+        for message_count, last_message_at, count, latest in rows:
+            assert message_count == count
+            assert last_message_at == latest
+        assert sorted(row[0] for row in rows) == [0, 1, 3]
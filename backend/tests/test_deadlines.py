@@ -0,0 +1,193 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.circuit_breaker import CircuitOpen
+from app.core.config import settings
+from app.core.deadlines import DeadlineExceeded, current_deadline, request_deadline, stage_deadline
+from app.core.metrics import StageTimer
+from app.services.answer_cache import SemanticAnswerCache
+from benchmarks.fake_openai import FakeOpenAIServer
+
+
+class TestDeadlines:
+    """Test request and stage deadlines."""
+
+    def test_no_deadline_by_default(self):
+        with request_deadline(0) as deadline, stage_deadline("embed") as stage:
+            assert deadline is None and stage is None
+        assert current_deadline.get() is None
+
+    def test_stage_gets_its_share(self):
+        """A stage is bounded by its share of the budget and by the time left."""
+        with request_deadline(10):
+            with stage_deadline("embed") as embed:
+                assert embed.remaining() == pytest.approx(1.5, abs=0.1)
+                assert current_deadline.get() is embed
+            with stage_deadline("llm") as llm:
+                assert llm.remaining() == pytest.approx(10, abs=0.1)
+
+    def test_expired_request_does_not_start_a_stage(self):
+        with request_deadline(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceeded):
+                with stage_deadline("search"):
+                    pass
+
+    def test_clamp(self):
+        """httpx timeouts are cut to the time left."""
+        with request_deadline(1) as deadline:
+            timeouts = deadline.clamp({"connect": 5.0, "read": 0.5, "write": None, "pool": 5.0})
+        assert timeouts["connect"] <= 1 and timeouts["write"] <= 1
+        assert timeouts["read"] == 0.5
+
+
+class TestOpenAIDeadlines:
+    """Test deadlines, hedging and circuit breaking against the fake OpenAI server's latency injection."""
+
+    @pytest.fixture
+    def server(self):
+        with FakeOpenAIServer(dimensions=8) as server, \
+                patch.object(settings, "openai_base_url", server.base_url), \
+                patch.object(settings, "embedding_dimensions", 8):
+            yield server
+
+    def test_slow_llm_is_cut_off_at_the_deadline(self, server):
+        """A slow completion fails with DeadlineExceeded when the deadline passes, without retries."""
+        from app.rag.chain import RAGChain
+
+        server.chat_latency.params = [2000.0]
+        chain = RAGChain()
+        chain.llm  # built outside the deadline
+        started = time.monotonic()
+        with request_deadline(0.3), pytest.raises(DeadlineExceeded):
+            chain.generate_response("What is a filter?", [])
+        assert time.monotonic() - started < 1.0
+        assert server.requests["chat"] == 1
+
+    def test_slow_query_embedding_is_hedged(self, server):
+        """A query embedding stalled far beyond the usual latency is answered by the backup request."""
+        from app.services.embeddings import EmbeddingService
+
+        service = EmbeddingService()
+        for _ in range(service.hedger.tracker.min_samples):
+            service.hedger.tracker.record(0.01)
+        # The first request stalls, the backup comes back at once
+        with patch.object(server.embedding_latency, "sample_ms", side_effect=[1500.0, 0.0]):
+            started = time.monotonic()
+            embedding = service._get_hedged_embedding("filter cutoff")
+        assert len(embedding) == 8
+        assert time.monotonic() - started < 1.0
+        assert server.requests["embeddings"] == 2
+        service.hedger._executor().shutdown(wait=True)
+
+    def test_breaker_opens_on_upstream_errors(self, server):
+        """Once OpenAI keeps failing, calls fail fast instead of reaching it."""
+        from app.services.embeddings import EmbeddingService
+
+        server.error_rate = 1.0
+        service = EmbeddingService()
+        service.breaker.failure_threshold = 2
+        client = service.client.with_options(max_retries=0)
+        with patch.object(EmbeddingService, "client", client):
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    service.get_embeddings(["filter"])
+            with pytest.raises(CircuitOpen):
+                service.get_embeddings(["filter"])
+        assert server.requests["embeddings"] == 2
+
+    def test_ingest_failures_leave_chat_circuit_closed(self):
+        """Each admission class has its own embeddings circuit."""
+        from app.core.admission import current_priority
+        from app.services.embeddings import EmbeddingService
+
+        service = EmbeddingService()
+        client = MagicMock()
+        client.embeddings.create.side_effect = ConnectionError("upstream down")
+        with patch.object(EmbeddingService, "client", client), \
+                patch.object(service.breakers["ingest"], "failure_threshold", 1):
+            token = current_priority.set("ingest")
+            try:
+                with pytest.raises(ConnectionError):
+                    service.get_embeddings(["filter"])
+                with pytest.raises(CircuitOpen):
+                    service.get_embeddings(["filter"])
+            finally:
+                current_priority.reset(token)
+            token = current_priority.set("chat")
+            try:
+                with pytest.raises(ConnectionError):
+                    service.get_embeddings(["filter"])
+            finally:
+                current_priority.reset(token)
+        assert service.breakers["chat"].state == "closed"
+
+
+class TestDegradedAnswers:
+    """Test serving cached answers while the LLM is unavailable."""
+
+    def run_query(self, cache, embedding, error=None):
+        from app.rag.chain import RAGChain
+
+        chain = RAGChain()
+        chain.breaker._before_call = MagicMock(side_effect=CircuitOpen("openai_chat", 10))
+        if error is not None:
+            chain.generate_response = MagicMock(side_effect=error)
+        with patch("app.rag.chain.get_answer_cache", return_value=cache), \
+                patch("app.rag.chain.embedding_service") as embedding_service, \
+                patch("app.rag.chain.vector_store") as vector_store, \
+                patch("app.rag.chain.get_chunk_content_store") as get_chunk_content_store:
+            embedding_service.get_query_embedding.return_value = embedding
+            vector_store.search_similar.return_value = []
+            get_chunk_content_store.return_value.hydrate.return_value = []
+            return chain._run_stages(StageTimer("rag"), "How do I save a patch?", 5, None)
+
+    def test_similar_cached_answer_is_served(self):
+        cache = SemanticAnswerCache(threshold=0.99)
+        cache.store([1.0, 0.0], "*:5", {"response": "Hold WRITE.", "relevant_chunks": []})
+        result = self.run_query(cache, [0.95, 0.3])  # similarity ~0.95
+        assert result["response"] == "Hold WRITE."
+        assert result["degraded"] and result["cache_hit"]
+
+    def test_no_match_raises(self):
+        with pytest.raises(CircuitOpen):
+            self.run_query(SemanticAnswerCache(threshold=0.99), [0.0, 1.0])
+
+    def test_deadline_is_served_from_cache(self):
+        cache = SemanticAnswerCache(threshold=0.99)
+        cache.store([1.0, 0.0], "*:5", {"response": "Hold WRITE.", "relevant_chunks": []})
+        result = self.run_query(cache, [0.95, 0.3], error=DeadlineExceeded("llm"))
+        assert result["degraded"]
+
+    def test_bugs_are_not_hidden(self):
+        """Errors of our own, and requests OpenAI rejects, are raised even when a cached answer is close."""
+        import httpx
+        import openai
+
+        cache = SemanticAnswerCache(threshold=0.99)
+        cache.store([1.0, 0.0], "*:5", {"response": "Hold WRITE.", "relevant_chunks": []})
+        bad_request = openai.BadRequestError(
+            "context too long", response=httpx.Response(400, request=httpx.Request("POST", "http://x")), body=None
+        )
+        for error in (KeyError("context"), bad_request):
+            with pytest.raises(type(error)):
+                self.run_query(cache, [0.95, 0.3], error=error)
+
+
+class TestChatErrors:
+    """Test how the chat endpoint reports unavailable upstreams."""
+
+    def test_circuit_open_is_503_with_retry_after(self, client):
+        with patch("app.api.chat.rag_chain") as mock_chain:
+            mock_chain.process_query.side_effect = CircuitOpen("openai_chat", 12.5)
+            response = client.post("/chat/", json={"query": "What is a filter?"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "13"
+
+    def test_deadline_is_504(self, client):
+        with patch("app.api.chat.rag_chain") as mock_chain:
+            mock_chain.process_query.side_effect = DeadlineExceeded("llm")
+            response = client.post("/chat/", json={"query": "What is a filter?"})
+        assert response.status_code == 504
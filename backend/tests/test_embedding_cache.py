@@ -0,0 +1,56 @@
+import time
+from app.services.embedding_cache import InMemoryLRUBackend, QueryEmbeddingCache
+
+
+class TestQueryEmbeddingCache:
+    """Test cases for QueryEmbeddingCache."""
+
+    def test_normalized_query_hits(self):
+        """Test that case and whitespace differences share a cache entry."""
+        cache = QueryEmbeddingCache(InMemoryLRUBackend(max_entries=10))
+        calls = []
+
+        def compute(text):
+            calls.append(text)
+            return [0.5, 0.25]
+
+        first = cache.get_or_compute("model-a", "Save a patch", compute)
+        second = cache.get_or_compute("model-a", "  save   a PATCH ", compute)
+
+        assert first == second == [0.5, 0.25]
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+
+    def test_model_is_part_of_key(self):
+        """Test that embeddings from different models are kept apart."""
+        cache = QueryEmbeddingCache(InMemoryLRUBackend(max_entries=10))
+
+        cache.get_or_compute("model-a", "query", lambda text: [1.0])
+        result = cache.get_or_compute("model-b", "query", lambda text: [2.0])
+
+        assert result == [2.0]
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        backend = InMemoryLRUBackend(max_entries=2)
+        backend.set("a", b"1")
+        backend.set("b", b"2")
+        backend.get("a")
+        backend.set("c", b"3")
+
+        assert backend.get("a") == b"1"
+        assert backend.get("b") is None
+        assert backend.stats()["entries"] == 2
+
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are not returned."""
+        backend = InMemoryLRUBackend(max_entries=2, ttl_seconds=0.01)
+        backend.set("a", b"1")
+        time.sleep(0.02)
+
+        assert backend.get("a") is None
+        assert backend.stats() == {"entries": 0, "bytes": 0}
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from app.core.hedging import Hedger, LatencyTracker
+
+
+def warmed_hedger(latency=0.01, samples=20, **kwargs):
+    hedger = Hedger("test", min_delay=0.01, **kwargs)
+    for _ in range(samples):
+        hedger.tracker.record(latency)
+    return hedger
+
+
+class TestLatencyTracker:
+    """Test the recent-latency window."""
+
+    def test_needs_enough_samples(self):
+        tracker = LatencyTracker(window=10, min_samples=3)
+        tracker.record(1.0)
+        assert tracker.quantile(0.5) is None
+        tracker.record(2.0)
+        tracker.record(3.0)
+        assert tracker.quantile(0.5) == 2.0
+
+
+class TestHedger:
+    """Test hedged calls."""
+
+    def test_no_hedge_without_history(self):
+        hedger = Hedger("test")
+        assert hedger.delay() is None
+        assert hedger.call(lambda: 42) == 42
+        assert hedger.tracker.quantile(0.5) is None  # one sample only
+
+    def test_slow_call_is_hedged(self):
+        """A call outliving the delay gets a backup, and the faster answer wins."""
+        hedger = warmed_hedger()
+        attempts = []
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                attempts.append(1)
+                first = len(attempts) == 1
+            time.sleep(1.0 if first else 0.0)
+            return "slow" if first else "fast"
+
+        started = time.monotonic()
+        assert hedger.call(call) == "fast"
+        assert time.monotonic() - started < 0.5
+        assert len(attempts) == 2
+
+    def test_fast_call_is_not_hedged(self):
+        hedger = warmed_hedger(latency=0.2)
+        attempts = []
+        assert hedger.call(lambda: attempts.append(1) or "ok") == "ok"
+        assert len(attempts) == 1
+
+    def test_failed_attempt_waits_for_the_other(self):
+        """An error only surfaces once every attempt has failed."""
+        hedger = warmed_hedger()
+        attempts = []
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                attempts.append(1)
+                first = len(attempts) == 1
+            if first:
+                time.sleep(0.05)
+                raise ConnectionError("reset")
+            time.sleep(0.1)
+            return "ok"
+
+        assert hedger.call(call) == "ok"
+
+        def always_fails():
+            time.sleep(0.05)
+            raise ConnectionError("down")
+
+        with pytest.raises(ConnectionError):
+            hedger.call(always_fails)
@@ -0,0 +1,62 @@
+import json
+import logging
+import sys
+from app.core.logging_config import JsonFormatter, RequestIdFilter, SamplingFilter, _RecordQueueHandler, request_id_var
+
+
+def make_record(msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestStructuredLogging:
+    """Test cases for the logging helpers."""
+
+    def test_json_line_with_extra_and_request_id(self):
+        """Test that records render as JSON with extra fields and the request ID."""
+        token = request_id_var.set("req-1")
+        try:
+            record = make_record(size=42)
+            RequestIdFilter().filter(record)
+        finally:
+            request_id_var.reset(token)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "hello world"
+        assert entry["level"] == "INFO"
+        assert entry["request_id"] == "req-1"
+        assert entry["size"] == 42
+
+    def test_exception_survives_the_queue(self):
+        """Test that tracebacks are carried in their own field after enqueueing."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "failed", None, None)
+            record.exc_info = sys.exc_info()
+
+        prepared = _RecordQueueHandler(None).prepare(record)  # type: ignore[arg-type]
+        entry = json.loads(JsonFormatter().format(prepared))
+
+        assert entry["message"] == "failed"
+        assert "ValueError: boom" in entry["exc_info"]
+
+    def test_sampling(self):
+        """Test that sampled records are dropped at rate 0 and unsampled ones kept."""
+        sampler = SamplingFilter()
+
+        assert sampler.filter(make_record())
+        assert not sampler.filter(make_record(sample_rate=0.0))
+        assert sampler.filter(make_record(sample_rate=1.0))
+
+
+def test_request_id_header(client):
+    """Test that request IDs are generated or propagated in X-Request-ID."""
+    generated = client.get("/health")
+    supplied = client.get("/health", headers={"X-Request-ID": "abc123"})
+
+    assert len(generated.headers["X-Request-ID"]) == 32
+    assert supplied.headers["X-Request-ID"] == "abc123"
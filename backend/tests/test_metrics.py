@@ -0,0 +1,68 @@
+from sqlalchemy import create_engine, text
+from app.core.metrics import CacheStatsCollector, StageTimer, current_timer, instrument_engine, merge_breakdowns, track
+
+
+class TestStageTimer:
+    """Test cases for StageTimer and database timing."""
+
+    def test_stages_accumulate(self):
+        """Test that repeated stages add up in the breakdown."""
+        timer = StageTimer("test")
+        timer.add("search", 0.002)
+        timer.add("search", 0.003)
+        with timer.stage("llm"):
+            pass
+
+        breakdown = timer.breakdown()
+
+        assert breakdown["search"] == 5.0
+        assert set(breakdown) == {"search", "llm"}
+
+    def test_db_statements_charged_to_tracked_timer(self):
+        """Test that statements only count against the timer while it is tracked."""
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        timer = StageTimer("test")
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert "db" not in timer.stages
+            with track(timer):
+                assert current_timer() is timer
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+        assert current_timer() is None
+        assert timer.stages["db"] > 0
+
+    def test_merge_breakdowns(self):
+        """Test that breakdowns from several timers are summed per stage."""
+        assert merge_breakdowns({"db": 1.5, "llm": 10.0}, {"db": 2.0}) == {"db": 3.5, "llm": 10.0}
+
+
+def test_metrics_endpoint(client):
+    """Test that /metrics serves the Prometheus exposition format."""
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "synthbot_http_request_duration_seconds" in response.text
+    assert 'synthbot_cache_hit_ratio{cache="answers"}' in response.text
+
+
+class TestCacheStatsCollector:
+    """Test the cache gauges read at scrape time."""
+
+    def test_failing_source_is_skipped(self):
+        """A cache whose stats raise leaves the other caches' gauges intact."""
+        def broken():
+            raise ConnectionError("connection refused")
+
+        collector = CacheStatsCollector({"answers": lambda: {"entries": 3, "hit_ratio": 0.5}, "embeddings": broken})
+
+        families = {family.name: family for family in collector.collect()}
+
+        assert [sample.labels["cache"] for sample in families["synthbot_cache_entries"].samples] == ["answers"]
+        assert families["synthbot_cache_hit_ratio"].samples[0].value == 0.5
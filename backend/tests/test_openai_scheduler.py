@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.core.openai_scheduler import OpenAIScheduler, SchedulingTransport, estimate_tokens, parse_reset
+
+
+class TestParseReset:
+    """Test x-ratelimit-reset-* durations."""
+
+    @pytest.mark.parametrize("value,seconds", [
+        ("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1.5s", 1.5), ("2", 2.0), ("", None), ("soon", None)
+    ])
+    def test_durations(self, value, seconds):
+        assert parse_reset(value) == seconds
+
+
+class TestOpenAIScheduler:
+    """Test request and token pacing."""
+
+    def test_within_budget_does_not_wait(self):
+        """Calls inside the budget go at once and draw it down."""
+        scheduler = OpenAIScheduler(rpm=60, tpm=1000)
+        assert scheduler.acquire("m", 100, priority="chat") < 0.05
+        stats = scheduler.stats()["m"]
+        assert stats["requests_available"] == 59
+        assert stats["tokens_available"] == 900
+
+    def test_token_budget_paces_calls(self):
+        """A call that does not fit waits for the bucket to refill."""
+        scheduler = OpenAIScheduler(rpm=0, tpm=6000)  # 100 tokens a second
+        scheduler.acquire("m", 5950, priority="chat")
+        waited = scheduler.acquire("m", 100, priority="chat")
+        assert 0.3 < waited < 1.5
+
+    def test_timeout(self):
+        """Budget that cannot be had in time raises TimeoutError."""
+        scheduler = OpenAIScheduler(rpm=1, tpm=0)
+        scheduler.acquire("m", 1, priority="chat")
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("m", 1, priority="chat", timeout=0.05)
+
+    def test_background_keeps_out_of_chat_reserve(self):
+        """Ingestion stops at the reserve; chat may still use it."""
+        scheduler = OpenAIScheduler(rpm=0, tpm=1000, background_reserve=0.2)
+        scheduler.acquire("m", 750, priority="ingest")
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("m", 100, priority="ingest", timeout=0.05)
+        assert scheduler.acquire("m", 200, priority="chat", timeout=0.05) < 0.05
+
+    def test_chat_waiter_goes_first(self):
+        """While chat waits for budget, ingestion holds back."""
+        scheduler = OpenAIScheduler(rpm=0, tpm=600, background_reserve=0.0)  # 10 tokens a second
+        scheduler.acquire("m", 600, priority="chat")
+        order = []
+
+        def call(priority):
+            scheduler.acquire("m", 3, priority=priority)
+            order.append(priority)
+
+        chat = threading.Thread(target=call, args=("chat",))
+        chat.start()
+        time.sleep(0.05)
+        ingest = threading.Thread(target=call, args=("ingest",))
+        ingest.start()
+        chat.join(5)
+        ingest.join(5)
+        assert order == ["chat", "ingest"]
+
+    def test_headers_lower_budget_and_429_pauses(self):
+        """Remaining counts from OpenAI cap the local view; a 429 pauses the model."""
+        scheduler = OpenAIScheduler(rpm=100, tpm=10000)
+        scheduler.observe("m", 200, {"x-ratelimit-remaining-requests": "3", "x-ratelimit-limit-tokens": "5000"})
+        stats = scheduler.stats()["m"]
+        assert stats["requests_available"] == 3
+        assert stats["tokens_available"] == 5000
+
+        scheduler.observe("m", 429, {"retry-after": "2"})
+        assert scheduler.stats()["m"]["paused_seconds"] > 1
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("m", 1, priority="chat", timeout=0.05)
+        # Other models have their own budget
+        assert scheduler.acquire("other", 1, priority="chat", timeout=0.05) < 0.05
+
+    def test_disabled(self):
+        scheduler = OpenAIScheduler(rpm=0, tpm=0)
+        for _ in range(10):
+            assert scheduler.acquire("m", 10 ** 9) == 0.0
+
+
+class TestSchedulingTransport:
+    """Test the scheduler under an HTTP client."""
+
+    def test_estimates(self):
+        """Embedding inputs count as prompt; chat adds message overhead and the completion."""
+        assert estimate_tokens("/v1/embeddings", {"input": ["abcd" * 10, "abcd"]}) >= 2
+        assert estimate_tokens("/v1/embeddings", {"input": [1, 2, 3]}) == 3
+        chat = {"messages": [{"role": "user", "content": "hi"}], "max_tokens": 100}
+        assert estimate_tokens("/v1/chat/completions", chat) > 100
+
+    def test_schedules_api_calls_only(self):
+        """Embedding calls draw on the budget and feed back headers; other paths pass through."""
+        scheduler = OpenAIScheduler(rpm=100, tpm=0)
+
+        def handler(request):
+            return httpx.Response(200, json={}, headers={"x-ratelimit-remaining-requests": "10"})
+
+        transport = SchedulingTransport(scheduler, httpx.MockTransport(handler))
+        with httpx.Client(transport=transport, base_url="http://api/v1") as client:
+            client.get("/models")
+            assert scheduler.stats() == {}
+            client.post("/embeddings", content=json.dumps({"model": "emb", "input": ["hello"]}))
+        assert scheduler.stats()["emb"]["requests_available"] == 10
+
+    def test_budget_timeout_is_pool_timeout(self):
+        """Waiting past the request's pool timeout fails like a connection-pool timeout."""
+        scheduler = OpenAIScheduler(rpm=1, tpm=0)
+        scheduler.acquire("emb", 1, priority="chat")
+        transport = SchedulingTransport(scheduler, httpx.MockTransport(lambda request: httpx.Response(200)))
+        with httpx.Client(transport=transport, base_url="http://api/v1", timeout=0.05) as client:
+            with pytest.raises(httpx.PoolTimeout):
+                client.post("/embeddings", content=json.dumps({"model": "emb", "input": ["hello"]}))
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.pagination import encode_cursor, decode_cursor, decode_datetime_cursor
+from app.db.models import Chat, Conversation
+
+
+def test_cursor_round_trip():
+    """Test that a (datetime, id) cursor decodes to the values it was built from."""
+    created_at = datetime(2024, 1, 1, 12, 30, 5, 123456)
+    cursor = encode_cursor(created_at, "chat-1")
+
+    assert "=" not in cursor
+    assert decode_datetime_cursor(cursor) == (created_at, "chat-1")
+
+
+def test_integer_cursor_round_trip():
+    """Test that a single-value cursor decodes to its value."""
+    assert decode_cursor(encode_cursor(42), 1) == [42]
+
+
+def test_decode_cursor_rejects_garbage():
+    """Test that malformed cursors raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!", 1)
+
+
+def test_decode_cursor_rejects_wrong_size():
+    """Test that a cursor with the wrong number of values raises ValueError."""
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(1, 2), 1)
+
+
+# Seven rows over four timestamps, three of them sharing one
+ROW_TIMES = [datetime(2026, 1, 1) + timedelta(minutes=m) for m in (0, 1, 1, 1, 2, 3, 3)]
+
+
+@pytest.fixture
+def rows(db_session_factory):
+    """Conversations and chats with tied timestamps; returns the IDs of each in listing order."""
+    with db_session_factory() as db:
+        conversations = [Conversation(title=f"c{i}", created_at=t, updated_at=t) for i, t in enumerate(ROW_TIMES)]
+        db.add_all(conversations)
+        db.flush()
+        chats = [
+            Chat(user_query=f"q{i}", ai_response="a", conversation_id=conversations[0].id, created_at=t)
+            for i, t in enumerate(ROW_TIMES)
+        ]
+        db.add_all(chats)
+        db.commit()
+
+        def newest_first(items, timestamp):
+            return [item.id for item in sorted(items, key=lambda item: (timestamp(item), item.id), reverse=True)]
+
+        return {
+            "/conversations/": newest_first(conversations, lambda c: c.updated_at),
+            "/chat/history": newest_first(chats, lambda c: c.created_at),
+        }
+
+
+def list_key(path):
+    return "conversations" if path.startswith("/conversations") else "chats"
+
+
+class TestCursorPagination:
+    """Test walking the listing endpoints page by page."""
+
+    @pytest.mark.parametrize("path", ["/conversations/", "/chat/history"])
+    def test_following_next_cursor_visits_every_row_once(self, client, rows, path):
+        """Pages follow one another without duplicates or gaps, even across tied timestamps."""
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = client.get(path, params=params).json()
+            seen.extend(item["id"] for item in data[list_key(path)])
+            pages += 1
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == rows[path]
+        assert pages == 4
+
+    @pytest.mark.parametrize("path", ["/conversations/", "/chat/history"])
+    def test_total(self, client, rows, path):
+        assert client.get(path, params={"limit": 2}).json()["total"] == 7
+        data = client.get(path, params={"limit": 2, "include_total": False}).json()
+        assert data["total"] is None
+        assert len(data[list_key(path)]) == 2
+
+    @pytest.mark.parametrize("path", ["/conversations/", "/chat/history"])
+    @pytest.mark.parametrize("cursor", ["not-a-cursor!", encode_cursor(1), encode_cursor("yesterday", "id")])
+    def test_malformed_cursor_is_400(self, client, rows, path, cursor):
+        assert client.get(path, params={"cursor": cursor}).status_code == 400
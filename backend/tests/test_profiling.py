@@ -0,0 +1,120 @@
+import contextvars
+import os
+import threading
+import time
+from unittest.mock import patch
+from app.core.profiling import RequestProfiler, StackSampler, format_profile, profiled_in_thread
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def loop_work():
+    return sum(i for i in range(20000))
+
+
+class TestRequestProfiler:
+    """Test cases for RequestProfiler."""
+
+    def test_profiles_worker_threads_only(self, tmp_path):
+        """Test that work handed to another thread is profiled and the activating (event loop) thread is not."""
+        profiler = RequestProfiler(str(tmp_path))
+        profile = profiler.start()
+
+        with profiler.activate(profile):
+            loop_work()
+            # Threads don't inherit contexts; run_in_threadpool copies it explicitly
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(profiled_in_thread(busy_work),))
+            worker.start()
+            worker.join()
+        path = profiler.finish(profile)
+
+        assert profiler.list() == [profile.id]
+        assert profiler.path(profile.id) == path
+        report = format_profile(path)
+        assert "busy_work" in report
+        assert "loop_work" not in report
+
+    def test_no_thread_work_writes_no_profile(self, tmp_path):
+        profiler = RequestProfiler(str(tmp_path))
+        profile = profiler.start()
+        with profiler.activate(profile):
+            loop_work()
+        assert profiler.finish(profile) is None
+        assert profiler.list() == []
+
+    def test_one_profile_at_a_time(self, tmp_path):
+        """Test that a second profile is refused until the first finishes."""
+        profiler = RequestProfiler(str(tmp_path))
+        first = profiler.start()
+
+        assert profiler.start() is None
+        profiler.finish(first)
+        assert profiler.start() is not None
+
+    def test_rejects_path_traversal(self, tmp_path):
+        """Test that profile IDs cannot escape the profile directory."""
+        assert RequestProfiler(str(tmp_path)).path("../secrets") is None
+
+
+class TestStackSampler:
+    """Test cases for StackSampler."""
+
+    def test_samples_only_watched_threads(self, tmp_path):
+        """Test that folded stacks are recorded for watched threads only."""
+        sampler = StackSampler(str(tmp_path / "stacks-{pid}.folded"), interval=0.001)
+        sampler.start()
+        try:
+            with sampler.watching():
+                deadline = time.monotonic() + 0.2
+                while time.monotonic() < deadline:
+                    busy_work()
+            watched = sum(sampler.samples.values())
+            time.sleep(0.05)
+            assert sum(sampler.samples.values()) == watched
+        finally:
+            sampler.stop()
+
+        assert watched > 0
+        assert sampler.path == str(tmp_path / f"stacks-{os.getpid()}.folded")
+        with open(sampler.path) as f:
+            line = f.readline()
+        assert "test_samples_only_watched_threads" in line
+        assert line.rsplit(" ", 1)[1].strip().isdigit()
+
+    def test_watching_is_noop_when_stopped(self, tmp_path):
+        """Test that nothing is tracked when the sampler is not running."""
+        sampler = StackSampler(str(tmp_path / "stacks.folded"), interval=0.001)
+        with sampler.watching():
+            sampler.sample()
+        assert not sampler.samples
+
+
+def test_profile_header_requires_configured_token(client):
+    """Test that the profiling header is ignored unless a token is configured."""
+    response = client.get("/health", headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_profile_header_and_admin_report(client, tmp_path, db_session_factory, mock_rag_chain):
+    """Test that a profiled request's report can be fetched from the admin API."""
+    profiler = RequestProfiler(str(tmp_path))
+    with patch("app.main.settings.profiling_token", "secret"), \
+            patch("app.main.request_profiler", profiler), \
+            patch("app.api.admin.request_profiler", profiler):
+        assert client.get("/health", headers={"X-Profile-Token": "wrong"}).status_code == 403
+        # Nothing runs on a worker thread, so there is nothing to report
+        assert "X-Profile-Id" not in client.get("/health", headers={"X-Profile-Token": "secret"}).headers
+        response = client.post("/chat/", json={"query": "How do I save a patch?"}, headers={"X-Profile-Token": "secret"})
+        profile_id = response.headers["X-Profile-Id"]
+
+        assert client.get("/admin/profiles").status_code == 403
+        listing = client.get("/admin/profiles", headers={"X-Profile-Token": "secret"})
+        report = client.get(f"/admin/profiles/{profile_id}", headers={"X-Profile-Token": "secret"})
+
+    assert listing.json()["profiles"] == [profile_id]
+    assert report.status_code == 200
+    assert "function calls" in report.text
@@ -0,0 +1,71 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import Settings, get_settings, settings
+from app.core.providers import Provider
+
+
+class TestProvider:
+    """Test lazily built shared instances."""
+
+    def test_builds_once_on_first_call(self):
+        """The factory runs on first use and its result is reused."""
+        calls = []
+        provider = Provider(lambda: calls.append(1) or object())
+        assert not provider.built
+        assert calls == []
+
+        first = provider()
+        assert provider() is first
+        assert calls == [1]
+        assert provider.built
+
+    def test_concurrent_first_calls_share_instance(self):
+        """Callers racing on first use all get the same instance."""
+        def slow_factory():
+            time.sleep(0.05)
+            return object()
+
+        provider = Provider(slow_factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(provider())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(r) for r in results}) == 1
+
+    def test_override_and_reset(self):
+        """Overrides replace the instance; reset rebuilds from the factory."""
+        provider = Provider(object)
+        stand_in = object()
+        provider.override(stand_in)
+        assert provider() is stand_in
+
+        provider.reset()
+        assert provider() is not stand_in
+
+    def test_shared_after_fork(self):
+        """Only providers marked share_after_fork keep their instance in a forked child."""
+        private, shared = Provider(object), Provider(object, share_after_fork=True)
+        private_instance, shared_instance = private(), shared()
+        private._after_fork()
+        shared._after_fork()
+        assert private() is not private_instance
+        assert shared() is shared_instance
+
+
+class TestLazySettings:
+    """Test that settings are read on first use."""
+
+    def test_proxy_reads_and_writes_the_shared_instance(self):
+        with patch.object(settings, "workers", 3):
+            assert get_settings().workers == 3
+        assert settings.workers == get_settings().workers != 3
+
+    def test_missing_required_setting(self):
+        with pytest.raises(RuntimeError, match="DATABASE_URL"):
+            Settings(database_url=None).require("database_url")
@@ -0,0 +1,143 @@
+import threading
+import time
+from unittest.mock import patch
+
+from app.core.readiness import DependencyCheck, ReadinessMonitor
+
+
+def failing():
+    raise ConnectionError("refused")
+
+
+class TestReadinessMonitor:
+    """Test cached dependency checks."""
+
+    def test_pending_until_checked_and_warmed_up(self):
+        """Nothing is ready before warm-up and the first round of checks."""
+        monitor = ReadinessMonitor([DependencyCheck("db", lambda: None)])
+        ready, checks = monitor.snapshot()
+        assert not ready
+        assert checks["db"]["status"] == "pending"
+
+        monitor.run_checks()
+        assert not monitor.snapshot()[0]
+        monitor.warmed_up = True
+        ready, checks = monitor.snapshot()
+        assert ready
+        assert checks["db"]["status"] == "ok"
+
+    def test_critical_failure_makes_unready(self):
+        """A failing critical check is reported with its error."""
+        monitor = ReadinessMonitor([DependencyCheck("db", lambda: None), DependencyCheck("qdrant", failing)])
+        monitor.warmed_up = True
+        monitor.run_checks()
+        ready, checks = monitor.snapshot()
+        assert not ready
+        assert checks["qdrant"]["status"] == "error"
+        assert "refused" in checks["qdrant"]["error"]
+
+    def test_non_critical_failure_is_reported_only(self):
+        """Non-critical dependencies do not gate readiness."""
+        monitor = ReadinessMonitor([DependencyCheck("db", lambda: None), DependencyCheck("openai", failing, critical=False)])
+        monitor.warmed_up = True
+        monitor.run_checks()
+        ready, checks = monitor.snapshot()
+        assert ready
+        assert checks["openai"]["status"] == "error"
+
+    def test_slow_check_times_out(self):
+        """A hanging probe fails after the timeout instead of blocking."""
+        release = threading.Event()
+        monitor = ReadinessMonitor([DependencyCheck("db", release.wait)], timeout=0.05)
+        monitor.warmed_up = True
+        started = time.monotonic()
+        monitor.run_checks()
+        release.set()
+        assert time.monotonic() - started < 1
+        assert "timed out" in monitor.snapshot()[1]["db"]["error"]
+        monitor.stop()
+
+    def test_stale_results_make_unready(self):
+        """Results older than stale_after no longer count as passing."""
+        monitor = ReadinessMonitor([DependencyCheck("db", lambda: None)], stale_after=0.01)
+        monitor.warmed_up = True
+        monitor.run_checks()
+        time.sleep(0.02)
+        ready, checks = monitor.snapshot()
+        assert not ready
+        assert checks["db"]["status"] == "stale"
+
+    def test_start_warms_up_then_checks(self):
+        """The background thread runs warm-up before the first checks."""
+        order = []
+        monitor = ReadinessMonitor(
+            [DependencyCheck("db", lambda: order.append("check"))],
+            warm_up=lambda: order.append("warm_up"),
+            interval=60
+        )
+        monitor.start()
+        try:
+            deadline = time.monotonic() + 2
+            while not monitor.snapshot()[0] and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            monitor.stop()
+        assert order[:2] == ["warm_up", "check"]
+        assert monitor.warmed_up
+
+
+class TestReadyEndpoint:
+    """Test the /ready endpoint."""
+
+    def test_reports_status_code_from_snapshot(self, client):
+        """503 with per-dependency details while unready, 200 once ready."""
+        monitor = ReadinessMonitor([DependencyCheck("qdrant", failing)])
+        monitor.warmed_up = True
+        monitor.run_checks()
+        with patch("app.main.readiness", monitor):
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["checks"]["qdrant"]["status"] == "error"
+
+            monitor.checks = [DependencyCheck("qdrant", lambda: None)]
+            monitor.run_checks()
+            response = client.get("/ready")
+            assert response.status_code == 200
+            assert response.json()["status"] == "ready"
+        monitor.stop()
+
+
+class TestDatabaseCheck:
+    """Test that the database probe leaves request transactions alone."""
+
+    def test_probe_keeps_open_writes(self, tmp_path):
+        from sqlalchemy import create_engine, func, select
+        from sqlalchemy.orm import sessionmaker
+
+        from app.db.database import engine_options
+        from app.db.models import Base, Conversation
+        from app.services import warmup
+
+        url = f"sqlite:///{tmp_path / 'app.db'}"
+        engine = create_engine(url, **engine_options(url))
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with patch.object(warmup, "get_engine", lambda: engine), Session() as session:
+            session.add(Conversation(title="Patch backup"))
+            session.flush()
+            warmup.check_database()
+            session.commit()
+        with Session() as session:
+            assert session.scalar(select(func.count()).select_from(Conversation)) == 1
+        engine.dispose()
+
+    def test_shared_connection_is_not_probed(self):
+        from sqlalchemy import create_engine
+
+        from app.db.database import engine_options
+        from app.services import warmup
+
+        engine = create_engine("sqlite://", **engine_options("sqlite://"))
+        with patch.object(warmup, "get_engine", lambda: engine), patch.object(engine, "connect") as connect:
+            warmup.check_database()
+        connect.assert_not_called()
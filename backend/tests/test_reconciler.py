@@ -0,0 +1,71 @@
+import uuid
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Base, Document, DocumentChunk
+from app.services.reconciler import VectorReconciler
+
+
+class TestVectorReconciler:
+    """Test cases for VectorReconciler."""
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def client(self):
+        client = QdrantClient(":memory:")
+        client.create_collection("chunks", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+        return client
+
+    @pytest.fixture
+    def drift(self, db, client):
+        """Five matching chunks, two orphaned points and one dangling chunk."""
+        document = Document(filename="f.pdf", original_filename="f.pdf", file_size=1, num_pages=1, num_chunks=6)
+        db.add(document)
+        db.flush()
+        shared = [str(uuid.uuid4()) for _ in range(5)]
+        orphans = [str(uuid.uuid4()) for _ in range(2)]
+        dangling = str(uuid.uuid4())
+        for i, embedding_id in enumerate(shared + [dangling]):
+            db.add(DocumentChunk(
+                document_id=document.id, chunk_index=i, content=f"chunk {i}",
+                page_number=1, embedding_id=embedding_id
+            ))
+        db.commit()
+        client.upsert("chunks", points=[PointStruct(id=i, vector=[1.0, 0.0]) for i in shared + orphans])
+        return orphans, dangling
+
+    def test_diff_finds_both_kinds(self, db, client, drift):
+        """Test that orphaned points and dangling chunks are reported."""
+        orphans, dangling = drift
+        reconciler = VectorReconciler(client, "chunks", db, batch_size=2, log=lambda msg: None)
+
+        found = list(reconciler.diff())
+
+        assert sorted(v for k, v in found if k == "orphan") == sorted(orphans)
+        assert [v for k, v in found if k == "dangling"] == [dangling]
+
+    def test_repair(self, db, client, drift):
+        """Test that orphans are deleted and dangling chunks are re-embedded."""
+        orphans, dangling = drift
+        reconciler = VectorReconciler(
+            client, "chunks", db, batch_size=2, grace_seconds=0,
+            embed=lambda texts: [[0.0, 1.0] for _ in texts], log=lambda msg: None
+        )
+
+        stats = reconciler.run(delete_orphans=True, reembed_dangling=True)
+
+        assert stats["deleted"] == 2
+        assert stats["restored"] == 1
+        assert client.retrieve("chunks", orphans) == []
+        restored = client.retrieve("chunks", [dangling], with_payload=True)[0]
+        assert restored.payload["content"] == "chunk 5"
+        assert list(reconciler.diff()) == []
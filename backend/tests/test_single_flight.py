@@ -0,0 +1,81 @@
+import threading
+import time
+import pytest
+from app.core.deadlines import DeadlineExceeded, request_deadline
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that callers arriving while a call is running get its result."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return {"response": "shared"}
+
+    results = []
+
+    def worker():
+        results.append(flight.do("key", slow))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(result == {"response": "shared"} for result, _ in results)
+    assert sorted(coalesced for _, coalesced in results) == [False, True, True, True, True]
+
+
+def test_sequential_calls_are_not_cached():
+    """Test that a finished call is not reused."""
+    flight = SingleFlight()
+    counter = iter(range(10))
+
+    assert flight.do("key", lambda: next(counter)) == (0, False)
+    assert flight.do("key", lambda: next(counter)) == (1, False)
+
+
+def test_errors_propagate_to_caller():
+    """Test that an exception from the call is raised to the caller."""
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("upstream failed")
+
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        flight.do("key", boom)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_follower_wait_is_bounded_by_its_deadline():
+    """Test that a follower gives up when its deadline passes while the leader keeps running."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    leader = threading.Thread(target=lambda: flight.do("key", slow))
+    leader.start()
+    started.wait(5)
+    try:
+        began = time.monotonic()
+        with request_deadline(0.1), pytest.raises(DeadlineExceeded):
+            flight.do("key", slow)
+        assert time.monotonic() - began < 1.0
+    finally:
+        release.set()
+        leader.join()
+    assert flight.stats()["in_flight"] == 0
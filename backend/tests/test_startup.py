@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that must only be imported when first used
+DEFERRED_MODULES = ("langchain_openai", "langchain_core", "fitz", "pymupdf", "qdrant_client", "openai", "tiktoken")
+
+# Upper bound for `import app.main`; override on slow machines
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2500"))
+
+
+def import_app(configured: bool = True):
+    """Import app.main in a fresh interpreter; returns (deferred modules loaded, import time in ms).
+
+    Unless `configured`, OPENAI_API_KEY and DATABASE_URL are left unset.
+    """
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "test_key_for_testing",
+        "DATABASE_URL": "sqlite:///./test.db",
+        "QDRANT_API_URL": "http://localhost:6333",
+    }
+    if not configured:
+        del env["OPENAI_API_KEY"], env["DATABASE_URL"]
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    cumulative_us = next(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.split("|")[2].strip() == "app.main"
+    )
+    return loaded, cumulative_us / 1000
+
+
+class TestStartup:
+    """Test that importing the app stays cheap."""
+
+    def test_heavy_imports_are_deferred(self):
+        """Clients and heavy libraries are not loaded by importing the app."""
+        loaded, _ = import_app()
+        assert loaded == []
+
+    def test_import_time_budget(self):
+        """`import app.main` stays within the start-up budget."""
+        _, elapsed_ms = import_app()
+        assert elapsed_ms < IMPORT_TIME_BUDGET_MS, f"import app.main took {elapsed_ms:.0f} ms"
+
+    def test_imports_without_configuration(self):
+        """The app imports without OpenAI or database settings; they are needed on first use."""
+        loaded, _ = import_app(configured=False)
+        assert loaded == []
+
+    def test_import_builds_nothing(self):
+        """Importing the app starts no threads and builds no caches or schedulers."""
+        code = (
+            "import threading, app.main; "
+            "from app.core.admission import get_admission; "
+                        "from app.core.openai_scheduler import get_openai_scheduler; "
+            "from app.services.answer_cache import get_answer_cache; "
+            "from app.services.chunk_content import get_chunk_content_store; "
+            "from app.services.embedding_cache import get_query_embedding_cache; "
+            "providers = (get_admission, get_openai_scheduler, get_answer_cache, "
+            "get_chunk_content_store, get_query_embedding_cache); "
+            "print(threading.active_count(), sum(p.built for p in providers))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        assert result.stdout.split() == ["1", "0"]
@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+from app.core import tokens
+
+
+class TestCountTokens:
+    """Test token counting and its offline fallback."""
+
+    def test_fallback_estimates_from_length(self):
+        """Without an encoding, tokens are estimated at four characters each."""
+        with patch.object(tokens, "_encoding", return_value=None):
+            assert tokens.count_tokens("") == 0
+            assert tokens.count_tokens("abcd") == 1
+            assert tokens.count_tokens("abcde") == 2
+
+    def test_uses_encoding_when_available(self):
+        """A loaded encoding is used for the count."""
+        class Encoding:
+            def encode(self, text, disallowed_special=()):
+                return text.split()
+
+        with patch.object(tokens, "_encoding", return_value=Encoding()):
+            assert tokens.count_tokens("one two three", "gpt-3.5-turbo") == 3
+
+    def test_failed_load_is_not_retried(self):
+        """An encoding that cannot be loaded is tried once, whichever models map to it."""
+        tokens._encoding.cache_clear()
+        tokens._named_encoding.cache_clear()
+        try:
+            with patch("tiktoken.get_encoding", side_effect=OSError("offline")) as get_encoding:
+                tokens.warm_encodings("gpt-3.5-turbo", "text-embedding-3-small")
+                assert tokens.count_tokens("abcd", "gpt-3.5-turbo") == 1
+                assert tokens.count_tokens("abcd", "gpt-4") == 1
+            get_encoding.assert_called_once_with("cl100k_base")
+        finally:
+            tokens._encoding.cache_clear()
+            tokens._named_encoding.cache_clear()
@@ -0,0 +1,89 @@
+import json
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Base, Document, DocumentChunk
+from app.services.vector_archive import MANIFEST_FILE, export_collection, import_collection, read_manifest
+
+
+def test_export_import_round_trip(tmp_path):
+    """Test that an exported collection is rebuilt with the same vectors and payloads."""
+    client = QdrantClient(":memory:")
+    client.create_collection("source", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    ids = [str(uuid.uuid4()) for _ in range(25)]
+    client.upsert("source", points=[
+        PointStruct(id=point_id, vector=[1.0, float(i), 0.5, 0.25], payload={"chunk_index": i})
+        for i, point_id in enumerate(ids)
+    ])
+
+    archive = str(tmp_path / "archive")
+    manifest = export_collection(client, "source", archive, batch_size=10, log=lambda msg: None)
+    assert manifest["count"] == 25
+    assert read_manifest(archive)["vector_size"] == 4
+
+    stats = import_collection(client, archive, "restored", batch_size=10, workers=1, log=lambda msg: None)
+    assert stats["imported"] == 25
+
+    original = client.retrieve("source", [ids[7]], with_vectors=True, with_payload=True)[0]
+    restored = client.retrieve("restored", [ids[7]], with_vectors=True, with_payload=True)[0]
+    assert restored.payload == {"chunk_index": 7}
+    assert restored.vector == pytest.approx(original.vector, abs=1e-6)
+
+
+def test_import_reconciles_with_database(tmp_path):
+    """Test that points without a chunk and chunks without a point are counted, and orphans can be skipped."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    document = Document(filename="f.pdf", original_filename="f.pdf", file_size=1, num_pages=1, num_chunks=4)
+    db.add(document)
+    db.flush()
+    shared = [str(uuid.uuid4()) for _ in range(3)]
+    extra = [str(uuid.uuid4()) for _ in range(2)]  # points whose chunk row is gone
+    missing = str(uuid.uuid4())  # a chunk row whose point is not in the archive
+    for i, embedding_id in enumerate(shared + [missing]):
+        db.add(DocumentChunk(
+            document_id=document.id, chunk_index=i, content=f"chunk {i}", page_number=1, embedding_id=embedding_id
+        ))
+    db.commit()
+
+    client = QdrantClient(":memory:")
+    client.create_collection("source", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    client.upsert("source", points=[PointStruct(id=i, vector=[1.0, 0.0]) for i in shared + extra])
+    archive = str(tmp_path / "archive")
+    export_collection(client, "source", archive, batch_size=2, log=lambda msg: None)
+
+    stats = import_collection(
+        client, archive, "restored", db=db, skip_orphans=True, batch_size=2, workers=1, log=lambda msg: None
+    )
+
+    assert (stats["orphans"], stats["skipped"], stats["missing"]) == (2, 2, 1)
+    assert stats["imported"] == 3
+    assert client.retrieve("restored", extra) == []
+    db.close()
+
+
+def test_import_restores_indexing_threshold_from_manifest(tmp_path):
+    """Test that the source collection's indexing threshold is restored after the bulk load."""
+    client = QdrantClient(":memory:")
+    client.create_collection("source", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    client.upsert("source", points=[PointStruct(id=str(uuid.uuid4()), vector=[1.0, 0.0])])
+    archive = str(tmp_path / "archive")
+    export_collection(client, "source", archive, log=lambda msg: None)
+    manifest_path = os.path.join(archive, MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["indexing_threshold"] = 50000
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with patch.object(client, "update_collection") as update_collection:
+        import_collection(client, archive, "restored", workers=1, log=lambda msg: None)
+
+    assert update_collection.call_args.kwargs["optimizers_config"].indexing_threshold == 50000
@@ -10,7 +10,7 @@ class TestVectorStore:
     @pytest.fixture
     def mock_qdrant_client(self):
         """Mock QdrantClient for testing."""
-        with patch('app.services.vector_store.QdrantClient') as mock_client:
+        with patch('qdrant_client.QdrantClient') as mock_client:
             mock_instance = MagicMock()
             mock_client.return_value = mock_instance
             yield mock_instance
@@ -32,8 +32,14 @@ class TestVectorStore:
         # Assert create_collection was called with correct parameters
         mock_qdrant_client.create_collection.assert_called_once()
         call_args = mock_qdrant_client.create_collection.call_args
-        assert call_args[1]['collection_name'] == "synthesizer_manuals"
+        assert call_args[1]['collection_name'] == "synthesizer_manuals_1536d"
         assert call_args[1]['vectors_config'].size == 1536
+
+        # Assert the alias the app uses points at the new collection
+        mock_qdrant_client.update_collection_aliases.assert_called_once()
+        operations = mock_qdrant_client.update_collection_aliases.call_args[1]['change_aliases_operations']
+        assert operations[0].create_alias.alias_name == "synthesizer_manuals"
+        assert operations[0].create_alias.collection_name == "synthesizer_manuals_1536d"
     
     def test_initialize_collection_exists(self, vector_store, mock_qdrant_client):
         """Test initializing when collection already exists."""
@@ -49,6 +55,36 @@ class TestVectorStore:
         # Assert create_collection was NOT called
         mock_qdrant_client.create_collection.assert_not_called()
     
+    def test_initialize_collection_alias_exists(self, vector_store, mock_qdrant_client):
+        """Test initializing when the alias already points at a collection."""
+        mock_collections = MagicMock()
+        mock_collections.collections = []
+        mock_qdrant_client.get_collections.return_value = mock_collections
+        mock_alias = MagicMock()
+        mock_alias.alias_name = "synthesizer_manuals"
+        mock_aliases = MagicMock()
+        mock_aliases.aliases = [mock_alias]
+        mock_qdrant_client.get_aliases.return_value = mock_aliases
+        
+        vector_store.initialize_collection()
+        
+        mock_qdrant_client.create_collection.assert_not_called()
+        mock_qdrant_client.update_collection_aliases.assert_not_called()
+    
+    def test_search_similar_truncates_to_collection_size(self, vector_store, mock_qdrant_client):
+        """Test that longer query vectors are shortened to the served collection's size."""
+        mock_collection_info = MagicMock()
+        mock_collection_info.config.params.vectors.size = 2
+        mock_qdrant_client.get_collection.return_value = mock_collection_info
+        mock_query_response = MagicMock()
+        mock_query_response.points = []
+        mock_qdrant_client.query_points.return_value = mock_query_response
+        
+        vector_store.search_similar([3.0, 4.0, 12.0])
+        
+        query = mock_qdrant_client.query_points.call_args[1]['query']
+        assert query == pytest.approx([0.6, 0.8])
+    
     def test_add_embeddings(self, vector_store, mock_qdrant_client):
         """Test adding embeddings to vector store."""
         # Test data
@@ -163,6 +199,19 @@ class TestVectorStore:
             with_payload=True
         )
     
+    def test_search_similar_per_query_params(self, vector_store, mock_qdrant_client):
+        """Test that per-query HNSW overrides are passed as search params."""
+        mock_query_response = MagicMock()
+        mock_query_response.points = []
+        mock_qdrant_client.query_points.return_value = mock_query_response
+
+        vector_store.search_similar([0.1, 0.2, 0.3], hnsw_ef=256, exact=True)
+
+        search_params = mock_qdrant_client.query_points.call_args[1]['search_params']
+        assert search_params.hnsw_ef == 256
+        assert search_params.exact is True
+        assert search_params.quantization is None
+    
     def test_delete_embeddings(self, vector_store, mock_qdrant_client):
         """Test deleting embeddings by IDs."""
         embedding_ids = ["id-1", "id-2", "id-3"]
@@ -220,4 +269,104 @@ class TestVectorStore:
         
         results = vector_store.search_similar([0.1, 0.2, 0.3])
         
-        assert results == [] 
\ No newline at end of file
+        assert results == []
+
+    def test_client_transport_options(self):
+        """Test that the client is built with the configured transport and pool size."""
+        with patch('qdrant_client.QdrantClient') as mock_client, \
+                patch('app.services.vector_store.settings') as mock_settings:
+            mock_settings.qdrant_prefer_grpc = True
+            mock_settings.qdrant_grpc_port = 6334
+            mock_settings.qdrant_timeout_seconds = 5
+            mock_settings.qdrant_pool_size = 8
+            VectorStore().client
+        
+        kwargs = mock_client.call_args[1]
+        assert kwargs["prefer_grpc"] is True
+        assert kwargs["grpc_port"] == 6334
+        assert kwargs["timeout"] == 5
+        assert kwargs["pool_size"] == 8
+    
+    def test_client_in_memory_location(self):
+        """Test that ":memory:" selects Qdrant's in-process mode."""
+        with patch('qdrant_client.QdrantClient') as mock_client, \
+                patch('app.services.vector_store.settings') as mock_settings:
+            mock_settings.qdrant_api_url = ":memory:"
+            VectorStore().client
+        
+        assert mock_client.call_args[1] == {"location": ":memory:"}
+    
+    def test_client_built_lazily(self):
+        """Test that constructing a VectorStore does not connect to Qdrant."""
+        with patch('qdrant_client.QdrantClient') as mock_client:
+            store = VectorStore()
+            mock_client.assert_not_called()
+            assert store.client is store.client
+        
+        mock_client.assert_called_once()
+
+
+def server_collection_info(quantization_config, on_disk=None, m=16, ef_construct=100):
+    """Collection info as the server reports it, with its defaults filled in and unset flags as None."""
+    from qdrant_client.models import Distance, HnswConfig, VectorParams
+
+    info = MagicMock()
+    info.config.params.vectors = VectorParams(size=8, distance=Distance.COSINE, on_disk=on_disk)
+    info.config.quantization_config = quantization_config
+    info.config.hnsw_config = HnswConfig(
+        m=m, ef_construct=ef_construct, full_scan_threshold=10000, max_indexing_threads=0, on_disk=False
+    )
+    return info
+
+
+class TestSyncCollectionConfig:
+    """Test aligning an existing collection with the configured storage settings."""
+
+    @pytest.fixture
+    def client(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def store(self, client):
+        store = VectorStore()
+        store._client.override(client)
+        return store
+
+    def test_matching_collection_is_left_alone(self, store, client):
+        """A collection already in line with the settings needs no update, so restarts are no-ops."""
+        from qdrant_client.models import ScalarQuantization, ScalarQuantizationConfig, ScalarType
+
+        # The server leaves the quantile unset where the configuration sets it
+        client.get_collection.return_value = server_collection_info(ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+        ))
+        with patch('app.services.vector_store.settings.qdrant_quantization', "scalar"):
+            store.sync_collection_config()
+        client.update_collection.assert_not_called()
+
+    def test_second_sync_is_a_no_op(self, store, client):
+        """Changed settings are applied once; syncing again against the updated collection does nothing."""
+        from qdrant_client.models import BinaryQuantization, BinaryQuantizationConfig
+
+        client.get_collection.return_value = server_collection_info(None)
+        with patch('app.services.vector_store.settings.qdrant_quantization', "binary"), \
+                patch('app.services.vector_store.settings.qdrant_hnsw_m', 32):
+            store.sync_collection_config()
+            changes = client.update_collection.call_args[1]
+            assert set(changes) == {"collection_name", "quantization_config", "hnsw_config"}
+            assert changes["hnsw_config"].m == 32
+
+            client.get_collection.return_value = server_collection_info(
+                BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)), m=32
+            )
+            store.sync_collection_config()
+        assert client.update_collection.call_count == 1
+
+    def test_turning_quantization_off(self, store, client):
+        from qdrant_client.models import Disabled, ScalarQuantization, ScalarQuantizationConfig, ScalarType
+
+        client.get_collection.return_value = server_collection_info(ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ))
+        store.sync_collection_config()
+        assert client.update_collection.call_args[1]["quantization_config"] == Disabled.DISABLED